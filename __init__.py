@@ -2,12 +2,8 @@
 Lux Spiral Cosmos - HDR Mathematical Animation Generator
 """
 
-from .cosmic_generator import CosmicSpiralGenerator
-from .config_manager import ConfigManager
-from .jit_core import (
-    compute_mathematical_system_16bit,
-    compute_mathematical_system_8bit,
-)
+import importlib
+from typing import Any, List
 
 __version__ = "1.0.0"
 __author__ = "Luxardo Labs"
@@ -15,9 +11,31 @@ __description__ = (
     "Professional HDR cosmic spiral animation generator with JIT optimization"
 )
 
-__all__ = [
-    "CosmicSpiralGenerator",
-    "ConfigManager",
-    "compute_mathematical_system_16bit",
-    "compute_mathematical_system_8bit",
-]
+# Public names and the submodule providing each; submodules (and with them
+# OpenCV and Numba) are only imported when a name is first used
+_EXPORTS = {
+    "CosmicSpiralGenerator": "cosmic_generator",
+    "ConfigManager": "config_manager",
+    "compute_mathematical_system": "jit_core",
+    "compute_mathematical_system_16bit": "jit_core",
+    "compute_mathematical_system_8bit": "jit_core",
+    "compute_mathematical_system_parallel": "jit_core",
+    "compute_state_trajectory": "jit_core",
+    "build_color_phase_table": "jit_core",
+    "build_pq_table": "jit_core",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,95 @@
+"""
+Batch render jobs: preset lists and parameter sweeps
+"""
+
+import itertools
+import json
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+import numpy as np
+
+from config_manager import ConfigManager
+
+# A sweep: preset field ("section.key" or a bare key) and its values
+Sweep = Tuple[str, List[Any]]
+
+
+class BatchJob(NamedTuple):
+    """One animation of a batch: a preset with optional field overrides"""
+
+    name: str
+    preset_name: str
+    overrides: Dict[str, Any]
+
+    @property
+    def tag(self) -> str:
+        """Output directory suffix naming the overrides ("" for none)"""
+        return "_".join(
+            f"{field.split('.')[-1]}-{_format_value(value)}"
+            for field, value in self.overrides.items()
+        )
+
+
+def _format_value(value: Any) -> str:
+    """Format a swept value for job and directory names"""
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def parse_sweep(spec: str) -> Sweep:
+    """Parse a FIELD=VALUE,VALUE,... sweep spec
+
+    Values are JSON scalars, e.g. "mathematical.r_denominator=50,125,300"
+    or "colors.speed=1,2.5".
+    """
+    field, separator, values_text = spec.partition("=")
+    if not separator or not field.strip() or not values_text.strip():
+        raise ValueError(f"Invalid sweep '{spec}' (expected FIELD=VALUE,VALUE,...)")
+
+    values = []
+    for text in values_text.split(","):
+        try:
+            values.append(json.loads(text))
+        except json.JSONDecodeError:
+            raise ValueError(f"Invalid value '{text}' in sweep '{spec}'")
+    return field.strip(), values
+
+
+def expand_batch_jobs(
+    config_manager: ConfigManager,
+    preset_names: Sequence[str],
+    sweeps: Sequence[Sweep] = (),
+) -> List[BatchJob]:
+    """Get one job per preset and combination of swept values"""
+    jobs = []
+    for preset_name in preset_names:
+        preset = config_manager.get_preset(preset_name)
+        fields = [config_manager.resolve_field(preset, field) for field, _ in sweeps]
+
+        for values in itertools.product(*(values for _, values in sweeps)):
+            job = BatchJob(preset_name, preset_name, dict(zip(fields, values)))
+            if job.tag:
+                job = job._replace(name=f"{preset_name}_{job.tag}")
+            jobs.append(job)
+
+    names = [job.name for job in jobs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate batch jobs: {', '.join(duplicates)}")
+    return jobs
+
+
+def thumbnail_statistics(thumbnail: np.ndarray, bins: int = 16) -> Dict[str, Any]:
+    """Get the coverage and brightness histogram of an 8-bit BGR thumbnail
+
+    Coverage is the fraction of lit pixels; the histogram counts lit pixels
+    by their brightest channel in equal-width bins over 1-255.
+    """
+    brightness = thumbnail.max(axis=2)
+    lit = brightness[brightness > 0]
+    histogram, _ = np.histogram(lit, bins=bins, range=(1, 256))
+    return {
+        "coverage": lit.size / brightness.size,
+        "mean_brightness": float(lit.mean()) if lit.size else 0.0,
+        "brightness_histogram": histogram.tolist(),
+    }
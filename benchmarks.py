@@ -0,0 +1,558 @@
+"""
+Benchmark suite for the JIT kernels and the frame pipeline
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import numba
+
+import jit_core
+from cosmic_generator import CosmicSpiralGenerator
+from frame_buffers import get_peak_rss_mb
+from parameter_sweep import sweep_parameters
+from render_plan import RenderPlan
+
+# Kernel variants: (bit depth, chunked multi-threaded kernel, precision,
+# accumulation)
+KERNELS: Dict[str, Tuple[bool, bool, str, bool]] = {
+    "16bit": (True, False, "float64", False),
+    "8bit": (False, False, "float64", False),
+    "16bit_float32": (True, False, "float32", False),
+    "8bit_float32": (False, False, "float32", False),
+    "16bit_parallel": (True, True, "float64", False),
+    "8bit_parallel": (False, True, "float64", False),
+    "16bit_accumulate": (True, False, "float64", True),
+}
+
+# Start-up paths timed by the import benchmark: (name, python arguments)
+IMPORT_COMMANDS: List[Tuple[str, List[str]]] = [
+    ("import config_manager", ["-c", "import config_manager"]),
+    ("import cosmic_generator", ["-c", "import cosmic_generator"]),
+    ("import jit_core", ["-c", "import jit_core"]),
+    ("cli list presets", ["cosmic_generator.py"]),
+    ("cli validate", ["cosmic_generator.py", "--validate"]),
+]
+
+# Modules the lightweight start-up paths must not import
+HEAVY_MODULES = ("cv2", "numba", "jit_core")
+
+logger = logging.getLogger(__name__)
+
+
+def summarize_timings(timings: List[float]) -> Dict[str, float]:
+    """Get median, percentiles and extremes of repeated timings in seconds"""
+    values = np.asarray(timings, dtype=np.float64)
+    return {
+        "runs": len(values),
+        "min": float(values.min()),
+        "median": float(np.median(values)),
+        "p90": float(np.percentile(values, 90)),
+        "p95": float(np.percentile(values, 95)),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+    }
+
+
+def parse_resolution(value: str) -> Tuple[int, int]:
+    """Parse a WIDTHxHEIGHT resolution"""
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid resolution '{value}'")
+    return width, height
+
+
+def make_benchmark_preset(
+    preset: Dict[str, Any],
+    resolution: Optional[Tuple[int, int]],
+    scale: float,
+    num_frames: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Copy a preset at another resolution, with n and the resolution scaled
+
+    scale_factor follows the frame height so the framing is unchanged.
+    """
+    preset = copy.deepcopy(preset)
+    video_config = preset["video"]
+    math_config = preset["mathematical"]
+    width, height = resolution or (video_config["width"], video_config["height"])
+    width = max(2, int(width * scale) // 2 * 2)
+    height = max(2, int(height * scale) // 2 * 2)
+
+    math_config["scale_factor"] *= height / video_config["height"]
+    math_config["n"] = max(1, int(math_config["n"] * scale))
+    video_config["width"], video_config["height"] = width, height
+    if num_frames is not None:
+        video_config["num_frames"] = num_frames
+    return preset
+
+
+def benchmark_imports(repeats: int) -> List[Dict[str, Any]]:
+    """Time fresh interpreter start-up for imports and light CLI commands
+
+    Each command runs in a new process with -X importtime, which also
+    shows whether it imported any of the heavy modules.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for name, arguments in IMPORT_COMMANDS:
+        timings = []
+        heavy_modules = set()
+        for _ in range(repeats):
+            start = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, "-X", "importtime", *arguments],
+                cwd=package_dir,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=True,
+            )
+            timings.append(time.perf_counter() - start)
+
+            for line in completed.stderr.splitlines():
+                if line.startswith("import time:"):
+                    module = line.rsplit("|", 1)[-1].strip().split(".")[0]
+                    if module in HEAVY_MODULES:
+                        heavy_modules.add(module)
+
+        results.append(
+            {
+                "command": name,
+                "seconds": summarize_timings(timings),
+                "heavy_modules": sorted(heavy_modules),
+            }
+        )
+    return results
+
+
+def get_system_info() -> Dict[str, Any]:
+    """Describe the machine and library versions a benchmark ran on"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "numba": numba.__version__,
+        "numba_threads": numba.get_num_threads(),
+        "numba_threading_layer": numba.config.THREADING_LAYER,
+    }
+
+
+def _use_preset(
+    generator: CosmicSpiralGenerator,
+    preset_name: str,
+    preset: Dict[str, Any],
+    use_16bit: bool,
+) -> None:
+    """Load a modified preset and bit depth into the generator"""
+    generator.config_manager.config["presets"][preset_name] = preset
+    generator.config_manager.config["output"]["use_tiff_16bit"] = use_16bit
+    generator.load_preset(preset_name)
+
+
+def benchmark_kernel(
+    generator: CosmicSpiralGenerator,
+    kernel: str,
+    frame_number: int,
+    warmup: int,
+    repeats: int,
+) -> Dict[str, Any]:
+    """Time one kernel on one frame of the loaded preset
+
+    The first call (which includes JIT compilation, or loading it from the
+    cache) is reported separately, followed by untimed warm-up runs and
+    the timed repeats. Each run renders into the same preallocated buffer.
+    """
+    generator.use_parallel_kernel = KERNELS[kernel][1]
+    generator.compute_precision = KERNELS[kernel][2]
+    generator.accumulate = KERNELS[kernel][3]
+    video_config = generator.current_preset["video"]
+    n = generator.current_preset["mathematical"]["n"]
+    dtype = np.uint16 if KERNELS[kernel][0] else np.uint8
+    out = np.empty((video_config["height"], video_config["width"], 3), dtype=dtype)
+    state = (0.0, 0.0, 0.0)
+
+    first_start = time.perf_counter()
+    pixels_processed = generator._compute_frame(frame_number, *state, out)[1]
+    first_call = time.perf_counter() - first_start
+
+    for _ in range(warmup):
+        generator._compute_frame(frame_number, *state, out)
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        generator._compute_frame(frame_number, *state, out)
+        timings.append(time.perf_counter() - start)
+
+    stats = summarize_timings(timings)
+    return {
+        "kernel": kernel,
+        "preset": generator.current_preset_name,
+        "n": n,
+        "width": video_config["width"],
+        "height": video_config["height"],
+        "iterations": n * n,
+        "pixels_processed": int(pixels_processed),
+        "first_call_seconds": first_call,
+        "seconds": stats,
+        "iterations_per_second": n * n / stats["median"],
+    }
+
+
+def benchmark_sweep(
+    generator: CosmicSpiralGenerator,
+    num_candidates: int,
+    frame_number: int,
+    warmup: int,
+    repeats: int,
+) -> Dict[str, Any]:
+    """Time the lockstep sweep kernel against separate renders of K candidates
+
+    The candidates are the loaded preset with hdr_boost spread over
+    0.5x-1.5x, so they share n and the frame size like an exploration
+    group. Each run draws one 8-bit frame of every candidate: once with
+    compute_sweep_frames_8bit, and once with K compute_mathematical_system_8bit
+    calls into a reused buffer.
+    """
+    base_plan = generator._get_plan()
+    output_config = generator.config_manager.get_output_config()
+    plans = []
+    for k in range(num_candidates):
+        preset = base_plan.to_preset()
+        preset["hdr"]["hdr_boost"] *= 0.5 + k / max(1, num_candidates - 1)
+        plans.append(RenderPlan(preset, output_config, base_plan.preset_name))
+
+    n, width, height = base_plan.n, base_plan.width, base_plan.height
+    params = sweep_parameters(plans, frame_number)
+    states = np.zeros((3, num_candidates), dtype=np.float64)
+    thumbnails = np.zeros((num_candidates, height, width, 3), dtype=np.uint8)
+    out = np.empty((height, width, 3), dtype=np.uint8)
+
+    def run_sweep():
+        states[:] = 0.0
+        jit_core.compute_sweep_frames_8bit(n, frame_number, params, states, thumbnails)
+
+    def run_separate():
+        for plan in plans:
+            t, spiral_size_multiplier = plan.frame_parameters(frame_number)
+            jit_core.compute_mathematical_system_8bit(
+                n,
+                plan.r,
+                t,
+                0.0,
+                0.0,
+                0.0,
+                width,
+                height,
+                plan.scale_factor,
+                spiral_size_multiplier,
+                frame_number,
+                plan.color_speed,
+                plan.red_base,
+                plan.red_variation,
+                plan.green_base,
+                plan.green_variation,
+                plan.blue_base,
+                plan.blue_variation,
+                plan.saturation,
+                plan.hdr_boost,
+                plan.cosmic_core_boost,
+                out,
+            )
+
+    timings = {}
+    for name, run in (("sweep", run_sweep), ("separate", run_separate)):
+        for _ in range(1 + warmup):
+            run()
+        runs = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            runs.append(time.perf_counter() - start)
+        timings[name] = summarize_timings(runs)
+
+    return {
+        "preset": base_plan.preset_name,
+        "candidates": num_candidates,
+        "block_candidates": jit_core.SWEEP_BLOCK_CANDIDATES,
+        "n": n,
+        "width": width,
+        "height": height,
+        "sweep_seconds": timings["sweep"],
+        "separate_seconds": timings["separate"],
+        "speedup": timings["separate"]["median"] / timings["sweep"]["median"],
+    }
+
+
+def benchmark_pipeline(
+    generator: CosmicSpiralGenerator, num_frames: int, output_root: str
+) -> Dict[str, Any]:
+    """Time rendering and writing frames of the loaded preset end to end
+
+    Frames go through the same buffer pool and asynchronous writer as
+    generate_animation. Per-frame times cover render plus hand-off to the
+    writer; the final flush of pending writes is reported separately.
+    """
+    output_config = generator.config_manager.get_output_config()
+    generator.use_parallel_kernel = output_config.get("parallel_kernel", False)
+    generator.compute_precision = output_config.get("compute_precision", "float64")
+    generator.accumulate = output_config.get("accumulate", False)
+    generator._setup_output_directory(create=False)
+    generator.output_dir = os.path.join(output_root, generator.output_dir)
+    os.makedirs(generator.output_dir, exist_ok=True)
+
+    # Compile (or load) the kernel outside the timed frames
+    video_config = generator.current_preset["video"]
+    generator._compute_frame(0, 0.0, 0.0, 0.0)
+
+    generator.x = generator.u = generator.v = 0.0
+    frame_times = []
+    start = time.perf_counter()
+    with generator._frame_outputs(stream=False, workers=1):
+        for frame in range(num_frames):
+            frame_start = time.perf_counter()
+            generator.render_frame(frame)
+            frame_times.append(time.perf_counter() - frame_start)
+        flush_start = time.perf_counter()
+    total = time.perf_counter() - start
+    flush = total - (flush_start - start)
+
+    bytes_written = sum(
+        entry.stat().st_size for entry in os.scandir(generator.output_dir)
+    )
+    return {
+        "preset": generator.current_preset_name,
+        "n": generator.current_preset["mathematical"]["n"],
+        "width": video_config["width"],
+        "height": video_config["height"],
+        "frames": num_frames,
+        "frame_seconds": summarize_timings(frame_times),
+        "flush_seconds": flush,
+        "total_seconds": total,
+        "frames_per_second": num_frames / total,
+        "bytes_written": bytes_written,
+        "peak_rss_mb": get_peak_rss_mb(),
+    }
+
+
+def run_benchmarks(
+    config_file: str = "config_presets.json",
+    preset_names: Optional[List[str]] = None,
+    resolutions: Optional[List[Tuple[int, int]]] = None,
+    kernels: Optional[List[str]] = None,
+    scale: float = 1.0,
+    warmup: int = 1,
+    repeats: int = 5,
+    pipeline_frames: int = 3,
+    import_repeats: int = 5,
+    sweep_candidates: int = 8,
+) -> Dict[str, Any]:
+    """Run the kernel, sweep and pipeline benchmarks and return the results
+
+    Every preset is benchmarked at each resolution (default: its own),
+    with n and the resolution multiplied by scale for quicker runs.
+    """
+    config_file = os.path.abspath(config_file)
+    generator = CosmicSpiralGenerator(config_file)
+    generator.logger.setLevel(logging.WARNING)
+    original_presets = copy.deepcopy(generator.config_manager.config["presets"])
+    use_16bit = generator.config_manager.get_output_config()["use_tiff_16bit"]
+
+    if preset_names is None:
+        preset_names = list(original_presets)
+    kernels = kernels or list(KERNELS)
+    for kernel in kernels:
+        if kernel not in KERNELS:
+            raise ValueError(f"Unknown kernel '{kernel}'")
+    if not 0 < scale <= 1:
+        raise ValueError("Benchmark scale must be in (0, 1]")
+
+    results: Dict[str, Any] = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "system": get_system_info(),
+        "settings": {
+            "config_file": config_file,
+            "scale": scale,
+            "warmup": warmup,
+            "repeats": repeats,
+            "pipeline_frames": pipeline_frames,
+            "import_repeats": import_repeats,
+            "sweep_candidates": sweep_candidates,
+        },
+        "imports": [],
+        "kernels": [],
+        "sweeps": [],
+        "pipeline": [],
+    }
+
+    if import_repeats > 0:
+        results["imports"] = benchmark_imports(import_repeats)
+        for result in results["imports"]:
+            heavy = ", ".join(result["heavy_modules"]) or "none"
+            logger.info(
+                f"{result['command']:25} median {result['seconds']['median']:.3f}s "
+                f"(heavy modules: {heavy})"
+            )
+
+    for preset_name in preset_names:
+        if preset_name not in original_presets:
+            raise ValueError(f"Preset '{preset_name}' not found")
+
+        for resolution in resolutions or [None]:
+            preset = make_benchmark_preset(
+                original_presets[preset_name],
+                resolution,
+                scale,
+                max(1, pipeline_frames),
+            )
+            for kernel in kernels:
+                _use_preset(generator, preset_name, preset, KERNELS[kernel][0])
+                result = benchmark_kernel(generator, kernel, 0, warmup, repeats)
+                results["kernels"].append(result)
+                logger.info(
+                    f"{kernel:16} {preset_name:18} n={result['n']:<5} "
+                    f"{result['width']}x{result['height']}: "
+                    f"median {result['seconds']['median']:.3f}s, "
+                    f"p95 {result['seconds']['p95']:.3f}s, "
+                    f"{result['iterations_per_second']:,.0f} it/s "
+                    f"(first call {result['first_call_seconds']:.2f}s)"
+                )
+
+            if sweep_candidates > 0:
+                _use_preset(generator, preset_name, preset, False)
+                result = benchmark_sweep(
+                    generator, sweep_candidates, 0, warmup, repeats
+                )
+                results["sweeps"].append(result)
+                logger.info(
+                    f"{'sweep':16} {preset_name:18} n={result['n']:<5} "
+                    f"{result['width']}x{result['height']}: "
+                    f"{result['candidates']} candidates "
+                    f"median {result['sweep_seconds']['median']:.3f}s, "
+                    f"separate {result['separate_seconds']['median']:.3f}s, "
+                    f"speedup {result['speedup']:.2f}x"
+                )
+
+            if pipeline_frames > 0:
+                _use_preset(generator, preset_name, preset, use_16bit)
+                with tempfile.TemporaryDirectory() as output_root:
+                    result = benchmark_pipeline(generator, pipeline_frames, output_root)
+                results["pipeline"].append(result)
+                logger.info(
+                    f"{'pipeline':16} {preset_name:18} n={result['n']:<5} "
+                    f"{result['width']}x{result['height']}: "
+                    f"median {result['frame_seconds']['median']:.3f}s per frame, "
+                    f"{result['frames_per_second']:.2f} frames/s"
+                )
+
+    return results
+
+
+def main():
+    """Benchmark entry point"""
+    parser = argparse.ArgumentParser(
+        description="Lux Spiral Cosmos - kernel and pipeline benchmarks"
+    )
+    parser.add_argument(
+        "--config", default="config_presets.json", help="Preset configuration file"
+    )
+    parser.add_argument(
+        "--presets", nargs="+", help="Presets to benchmark (default: all)"
+    )
+    parser.add_argument(
+        "--resolutions",
+        nargs="+",
+        type=parse_resolution,
+        help="Resolutions such as 1920x1080 (default: each preset's own)",
+    )
+    parser.add_argument(
+        "--kernels",
+        nargs="+",
+        choices=list(KERNELS),
+        help="Kernels to benchmark (default: all)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Scale n and the resolution for quicker runs (default: 1.0)",
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Untimed runs after the first call"
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=5, help="Timed runs per kernel (default: 5)"
+    )
+    parser.add_argument(
+        "--pipeline-frames",
+        type=int,
+        default=3,
+        help="Frames per end-to-end pipeline benchmark (0 to skip, default: 3)",
+    )
+    parser.add_argument(
+        "--import-repeats",
+        type=int,
+        default=5,
+        help="Runs per start-up path in the import benchmark (0 to skip)",
+    )
+    parser.add_argument(
+        "--sweep-candidates",
+        type=int,
+        default=8,
+        help="Candidates per lockstep sweep benchmark (0 to skip, default: 8)",
+    )
+    parser.add_argument(
+        "--imports-only",
+        action="store_true",
+        help="Only run the import-time benchmark",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark_results.json",
+        help="JSON results file (default: benchmark_results.json)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+
+    try:
+        results = run_benchmarks(
+            args.config,
+            [] if args.imports_only else args.presets,
+            args.resolutions,
+            args.kernels,
+            args.scale,
+            args.warmup,
+            args.repeats,
+            args.pipeline_frames,
+            args.import_repeats,
+            args.sweep_candidates,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Error: {e}")
+        sys.exit(1)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info("")
+    logger.info(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
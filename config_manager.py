@@ -2,18 +2,39 @@
 Configuration management for cosmic spiral generator
 """
 
+import copy
+import hashlib
 import json
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+# Preset fields used as integers; every other number is passed as a float
+INTEGER_PRESET_FIELDS = {
+    ("video", "width"),
+    ("video", "height"),
+    ("video", "num_frames"),
+    ("video", "fps"),
+    ("mathematical", "n"),
+}
+
+
+def _is_number(value: Any) -> bool:
+    """Check for an int or float preset value (JSON true/false are not numbers)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
 
 
 class ConfigManager:
     """Manages preset configurations and validation"""
 
-    def __init__(self, config_file: str = "config_presets.json"):
+    def __init__(
+        self,
+        config_file: str = "config_presets.json",
+        config: Optional[Dict[str, Any]] = None,
+    ):
         self.config_file = config_file
-        self.config = self._load_config()
+        # An already loaded config (e.g. sent to a worker) is used as is
+        self.config = config if config is not None else self._load_config()
         self.logger = logging.getLogger(__name__)
 
     def _load_config(self) -> Dict[str, Any]:
@@ -34,10 +55,80 @@ class ConfigManager:
             raise ValueError(f"Preset '{preset_name}' not found")
         return self.config["presets"][preset_name]
 
+    def normalize_preset(self, preset: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a preset with consistent number types
+
+        JSON does not distinguish 700 from 700.0, but the JIT kernels are
+        compiled per argument type, so mixed types across presets would
+        compile (and cache) separate kernel variants.
+        """
+        normalized: Dict[str, Any] = {}
+        for section, values in preset.items():
+            if not isinstance(values, dict):
+                normalized[section] = values
+                continue
+            normalized[section] = {
+                key: (
+                    value
+                    if isinstance(value, bool)
+                    or not isinstance(value, (int, float))
+                    or (section, key) in INTEGER_PRESET_FIELDS
+                    else float(value)
+                )
+                for key, value in values.items()
+            }
+        return normalized
+
     def get_output_config(self) -> Dict[str, Any]:
         """Get output configuration"""
         return self.config["output"]
 
+    def resolve_field(self, preset: Dict[str, Any], field: str) -> str:
+        """Resolve a preset field to "section.key" form
+
+        A bare key (e.g. "time_speed") is accepted if exactly one section
+        of the preset has it.
+        """
+        if "." in field:
+            section, key = field.split(".", 1)
+            if not isinstance(preset.get(section), dict) or key not in preset[section]:
+                raise ValueError(f"Unknown preset field '{field}'")
+            return field
+
+        sections = [
+            section
+            for section, values in preset.items()
+            if isinstance(values, dict) and field in values
+        ]
+        if len(sections) != 1:
+            raise ValueError(
+                f"Preset field '{field}' is "
+                f"{'ambiguous' if sections else 'unknown'}; use section.{field}"
+            )
+        return f"{sections[0]}.{field}"
+
+    def apply_overrides(
+        self, preset: Dict[str, Any], overrides: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Copy a preset with some fields replaced, given as {"section.key": value}"""
+        preset = copy.deepcopy(preset)
+        for field, value in overrides.items():
+            section, key = self.resolve_field(preset, field).split(".", 1)
+            if _is_number(preset[section][key]) and not _is_number(value):
+                raise ValueError(
+                    f"Preset field '{field}' needs a number, got {value!r}"
+                )
+            preset[section][key] = value
+        return preset
+
+    def get_preset_hash(
+        self, preset_name: str, settings: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Get a stable SHA-256 hash of a preset and optional render settings"""
+        content = {"preset": self.get_preset(preset_name), "settings": settings or {}}
+        encoded = json.dumps(content, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
     def list_presets(self) -> None:
         """Display available presets"""
         self.logger.info("Available presets:")
@@ -46,29 +137,35 @@ class ConfigManager:
             self.logger.info(f"{name:20} - {preset['description']}")
 
     def validate_preset(self, preset: Dict[str, Any]) -> bool:
-        """Validate preset configuration structure"""
-        required_sections = ["video", "hdr", "mathematical", "spiral_pulse", "colors"]
-
-        for section in required_sections:
-            if section not in preset:
-                self.logger.error(f"Missing required section: {section}")
-                return False
-
-        # Validate video section
-        video_required = ["width", "height", "num_frames", "fps"]
-        for key in video_required:
-            if key not in preset["video"]:
-                self.logger.error(f"Missing video parameter: {key}")
-                return False
-
-        # Validate mathematical section
-        math_required = ["n", "r_denominator", "time_speed", "scale_factor"]
-        for key in math_required:
-            if key not in preset["mathematical"]:
-                self.logger.error(f"Missing mathematical parameter: {key}")
-                return False
-
-        return True
+        """Validate preset structure, number types and ranges"""
+        # Imported here: render plans need NumPy, which reading presets does not
+        from render_plan import find_preset_problems
+
+        problems = find_preset_problems(preset)
+        for problem in problems:
+            self.logger.error(problem)
+        return not problems
+
+    def get_ffmpeg_encode_args(self) -> list[str]:
+        """Get FFmpeg HDR10 x265 encoding arguments"""
+        return [
+            "-c:v",
+            "libx265",
+            "-pix_fmt",
+            "yuv420p10le",
+            "-color_primaries",
+            "bt2020",
+            "-color_trc",
+            "smpte2084",
+            "-colorspace",
+            "bt2020nc",
+            "-x265-params",
+            "hdr-opt=1:repeat-headers=1:colorprim=bt2020:transfer=smpte2084:colormatrix=bt2020nc",
+        ]
+
+    def get_video_filename(self, preset_name: str, timestamp: str) -> str:
+        """Get the encoded video filename for a render"""
+        return f"hdr_animation_{preset_name}_{timestamp}.mp4"
 
     def get_ffmpeg_command(
         self, preset_name: str, output_dir: str, timestamp: str
@@ -79,15 +176,56 @@ class ConfigManager:
         extension = "tiff" if use_16bit else "png"
         fps = preset["video"]["fps"]
 
-        command_parts = [
-            f"ffmpeg -r {fps} -i {output_dir}/frame_%04d.{extension}",
-            "-c:v libx265",
-            "-pix_fmt yuv420p10le",
-            "-color_primaries bt2020",
-            "-color_trc smpte2084",
-            "-colorspace bt2020nc",
-            "-x265-params 'hdr-opt=1:repeat-headers=1:colorprim=bt2020:transfer=smpte2084:colormatrix=bt2020nc'",
-            f"hdr_animation_{preset_name}_{timestamp}.mp4",
-        ]
+        command_parts = [f"ffmpeg -r {fps} -i {output_dir}/frame_%04d.{extension}"]
+
+        encode_args = self.get_ffmpeg_encode_args()
+        for flag, value in zip(encode_args[::2], encode_args[1::2]):
+            if flag == "-x265-params":
+                value = f"'{value}'"
+            command_parts.append(f"{flag} {value}")
+
+        command_parts.append(self.get_video_filename(preset_name, timestamp))
 
         return " \\\n  ".join(command_parts)
+
+    def get_ffmpeg_stream_args(
+        self,
+        preset_name: str,
+        timestamp: str,
+        video_config: Optional[Dict[str, Any]] = None,
+        use_16bit: Optional[bool] = None,
+    ) -> list[str]:
+        """Generate FFmpeg arguments for encoding raw frames piped to stdin
+
+        video_config overrides the preset's video section (e.g. previews),
+        use_16bit the configured bit depth (e.g. for stored frames).
+        """
+        video = video_config or self.get_preset(preset_name)["video"]
+        output_config = self.get_output_config()
+        if use_16bit is None:
+            use_16bit = output_config["use_tiff_16bit"]
+        pixel_format = "bgr48le" if use_16bit else "bgr24"
+        # A path, or a command prefix such as ["nice", "ffmpeg"]
+        ffmpeg_binary = output_config.get("ffmpeg_binary", "ffmpeg")
+        if isinstance(ffmpeg_binary, str):
+            ffmpeg_binary = [ffmpeg_binary]
+
+        return [
+            *ffmpeg_binary,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            pixel_format,
+            "-s",
+            f"{video['width']}x{video['height']}",
+            "-r",
+            str(video["fps"]),
+            "-i",
+            "-",
+            *self.get_ffmpeg_encode_args(),
+            self.get_video_filename(preset_name, timestamp),
+        ]
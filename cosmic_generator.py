@@ -4,29 +4,185 @@ Main cosmic spiral animation generator
 
 import os
 import sys
+import json
 import time
 import logging
+import argparse
+import tempfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
-from math import pi, sin
-from typing import Dict, Any
-import cv2
+from contextlib import contextmanager
+from typing import (
+    AbstractSet,
+    Callable,
+    Dict,
+    Any,
+    Deque,
+    Iterator,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+import numpy as np
 
-from jit_core import compute_mathematical_system_16bit, compute_mathematical_system_8bit
+from batch_queue import expand_batch_jobs, parse_sweep
 from config_manager import ConfigManager
+from delta_archive import DeltaArchiveReader, DeltaArchiveWriter
+from lazy_imports import lazy_import
+from ffmpeg_encoder import FFmpegStreamEncoder
+from frame_cache import FrameGeometry, FrameGeometryCache
+from frame_store import FrameStore, get_shared_memory_dir
+from frame_writer import FrameWriterPipeline
+from frame_buffers import FrameBufferPool, get_peak_rss_mb, get_rss_mb
+from live_server import DEFAULT_LIVE_WIDTH, LiveFrameServer, encode_preview
+from parameter_sweep import explore_parameters, generate_batch, sweep_parameters
+from preview import generate_preview
+from sparse_frame import SparseFrame
+from render_budget import (
+    MemoryGovernor,
+    ResourcePlan,
+    estimate_render_cost,
+    plan_resources,
+)
+from render_manifest import RenderManifest
+from render_plan import RenderPlan
+from telemetry import RenderTelemetry
+
+# Heavy modules load on first use, so listing presets etc. starts fast
+cv2 = lazy_import("cv2")
+numba = lazy_import("numba")
+jit_core = lazy_import("jit_core")
+jit_cache = lazy_import("jit_cache")
+
+FrameSink = Union[FFmpegStreamEncoder, FrameWriterPipeline, DeltaArchiveWriter]
+
+# Compute precisions of the serial kernels, by name
+COMPUTE_PRECISIONS = {"float64": float, "float32": np.float32}
+
+# Memory-mapped file of a raw frame render, one slot per frame
+RAW_FRAMES_FILENAME = "frames.raw"
+
+# Keyframe/delta archive of a delta frame render
+DELTA_ARCHIVE_FILENAME = "frames.delta"
+
+# Empty PQ table: the chunked 16-bit kernel evaluates the exact pow() curve
+_EXACT_PQ_TABLE = np.empty((0, 0), dtype=np.float64)
 
 
 class CosmicSpiralGenerator:
     """Main generator class for cosmic spiral animations"""
 
-    def __init__(self, config_file: str = "config_presets.json"):
-        """Initialize the generator"""
-        self.config_manager = ConfigManager(config_file)
+    def __init__(
+        self,
+        config_file: str = "config_presets.json",
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        """Initialize the generator from a config file, or an already loaded config"""
+        self.config_manager = ConfigManager(config_file, config)
         self.current_preset: Dict[str, Any] = {}
         self.current_preset_name: str = ""
+        self.preset_overrides: Dict[str, Any] = {}
         self.output_dir: str = ""
         self.timestamp: str = ""
         self._preset_loaded = False
 
+        # Compiled plan of the current preset and output settings
+        self._plan: Optional[RenderPlan] = None
+
+        # Compiled kernel cache location (None: NUMBA_CACHE_DIR or next
+        # to jit_core.py); configuring it loads Numba, so only when set
+        self.jit_cache_dir: Optional[str] = self.config_manager.get_output_config().get(
+            "jit_cache_dir"
+        )
+        if self.jit_cache_dir is not None:
+            jit_cache.configure_jit_cache(self.jit_cache_dir)
+
+        # Multi-threaded kernel variant
+        self.use_parallel_kernel: bool = self.config_manager.get_output_config().get(
+            "parallel_kernel", False
+        )
+
+        # Table-driven shading (per-frame color phases, interpolated PQ curve)
+        self.use_lookup_tables: bool = self.config_manager.get_output_config().get(
+            "use_lookup_tables", False
+        )
+        self._pq_table: Optional[np.ndarray] = None
+
+        # Density mode: sum every point per pixel, then tone-map the sums
+        self.accumulate: bool = self.config_manager.get_output_config().get(
+            "accumulate", False
+        )
+        self.accumulation_exposure: float = self.config_manager.get_output_config().get(
+            "accumulation_exposure", 1.0
+        )
+        self._accumulation_buffer: Optional[np.ndarray] = None
+
+        # Float type of the kernel math ("float64" or "float32")
+        self.compute_precision: str = self.config_manager.get_output_config().get(
+            "compute_precision", "float64"
+        )
+
+        # Subsampling of the i/j loops (previews only)
+        self.sample_step = 1
+
+        # Optional on-disk cache of frame geometry, so color and HDR changes
+        # re-shade cached points instead of rerunning the recurrence
+        self.frame_cache: Optional[FrameGeometryCache] = None
+        frame_cache_dir = self.config_manager.get_output_config().get("frame_cache_dir")
+        if frame_cache_dir is not None:
+            self.configure_frame_cache(frame_cache_dir)
+
+        # Frames as sparse point lists, all in one raw frame file, or in a
+        # keyframe/delta archive, instead of dense image files
+        frame_format = self.config_manager.get_output_config().get(
+            "frame_format", "dense"
+        )
+        self.sparse_frames: bool = frame_format == "sparse"
+        self.raw_frames: bool = frame_format == "raw"
+        self.delta_frames: bool = frame_format == "delta"
+
+        # Progress manifest of the current render (resumable jobs)
+        self.manifest: Optional[RenderManifest] = None
+
+        # Optional per-frame metrics export
+        self.telemetry: Optional[RenderTelemetry] = None
+
+        # Optional ring of reusable frame buffers
+        self.buffer_pool: Optional[FrameBufferPool] = None
+
+        # Optional asynchronous consumer of rendered frames
+        self.frame_sink: Optional[FrameSink] = None
+
+        # Optional memory-mapped frame slots: the raw frame file, or the
+        # shared ring parallel workers hand streamed frames over in
+        self.frame_store: Optional[FrameStore] = None
+
+        # Optional live MJPEG server of frames as they render; parallel
+        # workers encode a JPEG of each frame (at most live_preview_width
+        # wide) and hand it to the parent's server with the frame result
+        self.live_server: Optional[LiveFrameServer] = None
+        self.live_preview_width: Optional[int] = None
+        self._live_preview: Optional[bytes] = None
+
+        # Optional memory (MB) and core budgets that parallelism is sized
+        # to, the plan chosen for the current render, and the governor
+        # adapting parallel renders to their measured memory
+        self.memory_budget_mb: Optional[float] = (
+            self.config_manager.get_output_config().get("memory_budget_mb")
+        )
+        self.cpu_budget: Optional[int] = self.config_manager.get_output_config().get(
+            "cpu_budget"
+        )
+        self.resource_plan: Optional[ResourcePlan] = None
+        self.memory_governor: Optional[MemoryGovernor] = None
+
+        # Numba threads of the frame kernels (None: Numba's default)
+        self.kernel_threads: Optional[int] = None
+
         # Mathematical state (persistent across frames)
         self.x = 0.0
         self.u = 0.0
@@ -52,149 +208,758 @@ class CosmicSpiralGenerator:
                 "Debug logging enabled - detailed performance metrics will be shown\n"
             )
 
-    def load_preset(self, preset_name: str) -> None:
-        """Load a specific preset configuration"""
-        self.current_preset = self.config_manager.get_preset(preset_name)
-        self.current_preset_name = preset_name
-        self._preset_loaded = True
+    def load_preset(
+        self, preset_name: str, overrides: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Load a specific preset configuration
 
-        # Validate the preset
-        if not self.config_manager.validate_preset(self.current_preset):
-            raise ValueError(f"Invalid preset configuration: {preset_name}")
+        overrides replaces preset fields, given as {"section.key": value}.
+        """
+        preset = self.config_manager.get_preset(preset_name)
+        if overrides:
+            preset = self.config_manager.apply_overrides(preset, overrides)
+        # Validates the preset
+        preset = self.config_manager.normalize_preset(preset)
+        plan = RenderPlan(preset, self.config_manager.get_output_config(), preset_name)
+        self._use_plan(plan, preset)
+        self.preset_overrides = dict(overrides or {})
 
         self.logger.info(f"Loaded preset: {preset_name}")
         self.logger.info(f"Description: {self.current_preset['description']}")
 
-    def _setup_output_directory(self) -> None:
-        """Create timestamped output directory with preset name"""
+    def _use_plan(
+        self, plan: RenderPlan, preset: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Make a compiled plan and its preset the loaded ones
+
+        Without the preset it was compiled from, the preset is rebuilt from
+        the plan's fields (the description and unused fields are lost).
+        """
+        self._plan = plan
+        self.current_preset = preset if preset is not None else plan.to_preset()
+        self.current_preset_name = plan.preset_name
+        self._preset_loaded = True
+
+    def _get_plan(self) -> RenderPlan:
+        """Get the compiled plan of the current preset"""
+        if self._plan is None:
+            raise RuntimeError("No preset loaded")
+        return self._plan
+
+    def _setup_output_directory(self, create: bool = True, tag: str = "") -> None:
+        """Create timestamped output directory with preset name
+
+        A tag (e.g. "preview") is added to the directory and video names.
+        """
         output_config = self.config_manager.get_output_config()
+        name = f"{self.current_preset_name}_{tag}" if tag else self.current_preset_name
 
         if output_config["create_timestamped_folder"]:
             self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            if tag:
+                self.timestamp = f"{tag}_{self.timestamp}"
             self.output_dir = f"frames_{self.current_preset_name}_{self.timestamp}"
         else:
-            self.output_dir = f"frames_{self.current_preset_name}"
-            self.timestamp = f"{self.current_preset_name}_output"
+            self.output_dir = f"frames_{name}"
+            self.timestamp = f"{name}_output"
+
+        if create:
+            os.makedirs(self.output_dir, exist_ok=True)
+
+    def configure_frame_cache(
+        self, cache_dir: str, max_mb: Optional[float] = None
+    ) -> None:
+        """Cache frame geometry in cache_dir, up to max_mb (default: config)"""
+        if max_mb is None:
+            max_mb = self.config_manager.get_output_config().get(
+                "frame_cache_max_mb", 2048
+            )
+        self.frame_cache = FrameGeometryCache(cache_dir, int(max_mb * 1024 * 1024))
+
+    def _frame_parameters(self, frame_number: int) -> Tuple[float, float]:
+        """Get the time and spiral size multiplier (pulsing) of a frame"""
+        return self._get_plan().frame_parameters(frame_number)
+
+    def _compute_frame(
+        self,
+        frame_number: int,
+        x: float,
+        u: float,
+        v: float,
+        out: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, int, float, float, float]:
+        """Run the JIT kernel for one frame starting from the given state
+
+        out is an optional reusable frame buffer, cleared in place.
+        """
+        plan = self._get_plan()
+
+        # Setup frame
+        width, height = plan.width, plan.height
+
+        # Time progression
+        t, spiral_size_multiplier = plan.frame_parameters(frame_number)
+
+        n = plan.n
+        r = plan.r
+        scale_factor = plan.scale_factor
+
+        # Density mode and chunked multi-threaded kernels, driven by per-frame
+        # color tables (subsampled preview frames always use the serial kernels)
+        if self.accumulate and self.sample_step == 1:
+            return self._compute_accumulation_frame(frame_number, x, u, v, out)
+        if self._uses_frame_cache():
+            return self._compute_cached_frame(frame_number, x, u, v, out)
+        if (self.use_parallel_kernel or self.use_lookup_tables) and (
+            self.sample_step == 1
+        ):
+            real = self._get_compute_type()
+            if out is None:
+                out = np.zeros((height, width, 3), dtype=plan.frame_dtype)
+            frame, pixels_processed, x, u, v = (
+                jit_core.compute_mathematical_system_parallel(
+                    n,
+                    real(r),
+                    real(t),
+                    real(x),
+                    real(u),
+                    real(v),
+                    width,
+                    height,
+                    real(scale_factor),
+                    real(spiral_size_multiplier),
+                    self._build_phase_table(frame_number),
+                    self._get_pq_table(),
+                    real(plan.max_nits),
+                    real(plan.hdr_boost),
+                    real(plan.cosmic_core_boost),
+                    out,
+                )
+            )
+            return frame, pixels_processed, float(x), float(u), float(v)
+
+        # Serial kernel, specialized on the frame buffer type (8-bit, 16-bit
+        # PQ or linear float) and on the compute precision of its arguments
+        real = self._get_compute_type()
+        if out is None:
+            out = np.zeros((height, width, 3), dtype=plan.frame_dtype)
+        frame, pixels_processed, x, u, v = jit_core.compute_mathematical_system(
+            n,
+            real(r),
+            real(t),
+            real(x),
+            real(u),
+            real(v),
+            width,
+            height,
+            real(scale_factor),
+            real(spiral_size_multiplier),
+            frame_number,
+            real(plan.color_speed),
+            real(plan.red_base),
+            real(plan.red_variation),
+            real(plan.green_base),
+            real(plan.green_variation),
+            real(plan.blue_base),
+            real(plan.blue_variation),
+            real(plan.saturation),
+            real(plan.max_nits),
+            real(plan.hdr_boost),
+            real(plan.cosmic_core_boost),
+            out,
+            self.sample_step,
+        )
+        return frame, pixels_processed, float(x), float(u), float(v)
+
+    def _compute_accumulation_frame(
+        self,
+        frame_number: int,
+        x: float,
+        u: float,
+        v: float,
+        out: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, int, float, float, float]:
+        """Run the density kernel for one frame and tone-map it into out"""
+        if self._get_compute_type() is not float:
+            raise ValueError("The accumulation kernel computes in float64 only")
+
+        plan = self._get_plan()
+        width, height = plan.width, plan.height
+        t, spiral_size_multiplier = plan.frame_parameters(frame_number)
+
+        # Float32 sums, reused across frames
+        accum = self._accumulation_buffer
+        if accum is None or accum.shape[:2] != (height, width):
+            accum = np.empty((height, width, 3), dtype=np.float32)
+            self._accumulation_buffer = accum
+
+        accum, pixels_processed, x, u, v = jit_core.compute_accumulation_frame(
+            plan.n,
+            plan.r,
+            t,
+            x,
+            u,
+            v,
+            width,
+            height,
+            plan.scale_factor,
+            spiral_size_multiplier,
+            self._build_phase_table(frame_number),
+            plan.hdr_boost,
+            plan.cosmic_core_boost,
+            accum,
+        )
+
+        if out is None:
+            out = np.empty((height, width, 3), dtype=plan.frame_dtype)
+        jit_core.tone_map_accumulation(
+            accum, self.accumulation_exposure, plan.max_nits, out
+        )
+        return out, pixels_processed, x, u, v
+
+    def _uses_frame_cache(self) -> bool:
+        """Whether dense frames are shaded from the geometry cache
+
+        Only exact float64 frames keeping the last point per pixel are.
+        """
+        return (
+            self.frame_cache is not None
+            and self.sample_step == 1
+            and not self.accumulate
+            and not self.use_lookup_tables
+            and self._get_compute_type() is float
+        )
+
+    def _get_geometry_settings(self) -> Dict[str, Any]:
+        """Get the preset settings that decide where points land"""
+        plan = self._get_plan()
+        return {
+            "width": plan.width,
+            "height": plan.height,
+            "mathematical": plan.section("mathematical"),
+            "spiral_pulse": plan.section("spiral_pulse"),
+        }
+
+    def _compute_cached_frame(
+        self,
+        frame_number: int,
+        x: float,
+        u: float,
+        v: float,
+        out: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, int, float, float, float]:
+        """Shade a frame from its cached geometry, tracing it on a miss"""
+        key = self.frame_cache.make_key(
+            self._get_geometry_settings(), frame_number, (x, u, v)
+        )
+        geometry = self.frame_cache.load(key)
+        if geometry is None:
+            geometry = self._trace_frame_geometry(frame_number, x, u, v)
+            self.frame_cache.store(key, geometry)
+
+        out = self._shade_frame_geometry(frame_number, geometry, out)
+        return (out, geometry.pixels_processed, *geometry.end_state)
+
+    def _trace_frame_geometry(
+        self, frame_number: int, x: float, u: float, v: float
+    ) -> FrameGeometry:
+        """Run the recurrence of one frame into its shading-independent geometry"""
+        plan = self._get_plan()
+        t, spiral_size_multiplier = plan.frame_parameters(frame_number)
+
+        *arrays, pixels_processed, x, u, v = jit_core.compute_frame_geometry(
+            plan.n,
+            plan.r,
+            t,
+            x,
+            u,
+            v,
+            plan.width,
+            plan.height,
+            plan.scale_factor,
+            spiral_size_multiplier,
+        )
+        return FrameGeometry(*arrays, pixels_processed, (x, u, v))
+
+    def _shade_frame_geometry(
+        self,
+        frame_number: int,
+        geometry: FrameGeometry,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Shade frame geometry with the loaded colors and HDR settings"""
+        plan = self._get_plan()
+        if out is None:
+            out = np.empty((plan.height, plan.width, 3), dtype=plan.frame_dtype)
+
+        return jit_core.shade_frame_geometry(
+            geometry.pixel_index,
+            geometry.color_phase,
+            geometry.base_luminance,
+            geometry.is_core,
+            self._build_phase_table(frame_number),
+            plan.max_nits,
+            plan.hdr_boost,
+            plan.cosmic_core_boost,
+            out,
+        )
+
+    def _get_compute_type(self) -> type:
+        """Get the float type the serial kernels compute in"""
+        if self.compute_precision not in COMPUTE_PRECISIONS:
+            raise ValueError(
+                f"Unknown compute precision '{self.compute_precision}' "
+                f"(expected one of: {', '.join(COMPUTE_PRECISIONS)})"
+            )
+        return COMPUTE_PRECISIONS[self.compute_precision]
+
+    def _get_frame_dtype(self) -> np.dtype:
+        """Get the channel type of dense frames
+
+        uint8, uint16 (PQ-encoded) or float32 (linear light, 1.0 = max_nits).
+        """
+        return self._get_plan().frame_dtype
+
+    def _build_phase_table(self, frame_number: int) -> np.ndarray:
+        """Build the per-frame color phase table for the chunked kernels
+
+        The table is in the compute precision, like the points it shades.
+        """
+        plan = self._get_plan()
+        real = self._get_compute_type()
+        return jit_core.build_color_phase_table(
+            plan.n,
+            frame_number,
+            real(plan.color_speed),
+            real(plan.red_base),
+            real(plan.red_variation),
+            real(plan.green_base),
+            real(plan.green_variation),
+            real(plan.blue_base),
+            real(plan.blue_variation),
+            real(plan.saturation),
+        )
+
+    def _compute_sparse_frame(
+        self, frame_number: int, x: float, u: float, v: float
+    ) -> Tuple[SparseFrame, int, float, float, float]:
+        """Run the sparse JIT kernel for one frame starting from the given state"""
+        plan = self._get_plan()
+        width, height = plan.width, plan.height
+        t, spiral_size_multiplier = plan.frame_parameters(frame_number)
+        if self.accumulate:
+            raise ValueError("Accumulated frames are dense; disable sparse frames")
+        if plan.frame_dtype == np.float32:
+            raise ValueError("Sparse frames hold 8- or 16-bit colors, not linear light")
 
-        os.makedirs(self.output_dir, exist_ok=True)
+        real = self._get_compute_type()
+        pixel_index, colors, pixels_processed, x, u, v = jit_core.compute_sparse_frame(
+            plan.n,
+            real(plan.r),
+            real(t),
+            real(x),
+            real(u),
+            real(v),
+            width,
+            height,
+            real(plan.scale_factor),
+            real(spiral_size_multiplier),
+            self._build_phase_table(frame_number),
+            self._get_pq_table(),
+            real(plan.max_nits),
+            real(plan.hdr_boost),
+            real(plan.cosmic_core_boost),
+            plan.frame_dtype,
+        )
+
+        sparse_frame = SparseFrame(width, height, pixel_index, colors)
+        return sparse_frame, pixels_processed, float(x), float(u), float(v)
+
+    def _get_pq_table(self) -> np.ndarray:
+        """Get the PQ lookup table, or an empty table for the exact pow() curve"""
+        if not self.use_lookup_tables:
+            return _EXACT_PQ_TABLE
+        if self._pq_table is None:
+            self._pq_table = jit_core.build_pq_table()
+        return self._pq_table
+
+    def check_lookup_accuracy(self, preset_name: str, num_frames: int = 3) -> int:
+        """Compare lookup-table rendering against the exact path
+
+        Renders the first frames of a preset both ways and reports the
+        maximum per-channel code value error. Returns that maximum.
+        """
+        self.load_preset(preset_name)
+        num_frames = min(num_frames, self.current_preset["video"]["num_frames"])
+        saved_modes = (self.use_parallel_kernel, self.use_lookup_tables)
+
+        max_error = 0
+        try:
+            for frame, state in enumerate(self.compute_frame_states(num_frames)):
+                if frame == num_frames:
+                    break
+
+                self.use_parallel_kernel, self.use_lookup_tables = False, False
+                exact = self._compute_frame(frame, *state)[0].astype(np.int32)
+                self.use_lookup_tables = True
+                table = self._compute_frame(frame, *state)[0].astype(np.int32)
+
+                error = np.abs(exact - table)
+                frame_error = int(error.max())
+                max_error = max(max_error, frame_error)
+                self.logger.info(
+                    f"Frame {frame+1:3d}: max code value error {frame_error}, "
+                    f"{np.count_nonzero(error):,} of {error.size:,} channels differ"
+                )
+        finally:
+            self.use_parallel_kernel, self.use_lookup_tables = saved_modes
+
+        scale = 65535 if self._get_plan().use_16bit else 255
+        self.logger.info(
+            f"Maximum code value error: {max_error} of {scale} "
+            f"({max_error / scale * 100:.4f}% of full scale)"
+        )
+        return max_error
+
+    def check_precision_drift(self, preset_name: str, num_frames: int = 3) -> float:
+        """Compare float32 rendering against the float64 reference
 
-    def _calculate_spiral_size_multiplier(self, t: float) -> float:
-        """Calculate spiral size multiplier with pulsing effect"""
+        Renders the first frames of a preset with the serial kernel in both
+        precisions. Since the recurrence is chaotic, each precision follows
+        its own state from frame to frame; the report gives the state drift
+        and the code value error, both of the carried-over frames and of
+        float32 started from the reference state (the shading error alone).
+        Returns the maximum state drift.
+        """
+        self.load_preset(preset_name)
+        num_frames = min(num_frames, self.current_preset["video"]["num_frames"])
+        saved_modes = (self.compute_precision, self.sample_step)
+        self.sample_step = 1
+        dtype = self._get_frame_dtype()
+        full_scale = 1.0 if dtype == np.float32 else np.iinfo(dtype).max
+
+        max_drift = 0.0
+        state_32 = (0.0, 0.0, 0.0)
+        try:
+            self.compute_precision = "float64"
+            reference_states = list(self.compute_frame_states(num_frames))
+            for frame in range(num_frames):
+                self.compute_precision = "float64"
+                reference, _, *next_reference = self._compute_frame(
+                    frame, *reference_states[frame]
+                )
+                self.compute_precision = "float32"
+                shaded = self._compute_frame(frame, *reference_states[frame])[0]
+                carried, _, *state_32 = self._compute_frame(frame, *state_32)
+
+                drift = float(np.max(np.abs(np.subtract(state_32, next_reference))))
+                max_drift = max(max_drift, drift)
+                reference = reference.astype(np.float64)
+                shading_error = np.abs(shaded.astype(np.float64) - reference)
+                carried_error = np.abs(carried.astype(np.float64) - reference)
+                self.logger.info(
+                    f"Frame {frame+1:3d}: state drift {drift:.3g}, "
+                    f"max code value error {carried_error.max():g} "
+                    f"({np.count_nonzero(carried_error) / carried_error.size:.2%} "
+                    f"of channels differ), from reference state "
+                    f"{shading_error.max():g}"
+                )
+        finally:
+            self.compute_precision, self.sample_step = saved_modes
+
+        self.logger.info(
+            f"Maximum float32 state drift: {max_drift:.3g} "
+            f"(code value errors are out of {full_scale:g})"
+        )
+        return max_drift
+
+    def compute_frame_states(
+        self,
+        num_frames: int,
+        start_frame: int = 0,
+        start_state: Tuple[float, float, float] = (0.0, 0.0, 0.0),
+    ) -> Iterator[Tuple[float, float, float]]:
+        """Yield the starting (x, u, v) state of each frame.
+
+        Only the state recurrence is evaluated (no shading or pixel writes),
+        starting from the reset state used by generate_animation (or from
+        start_state at start_frame when resuming), so frames can be rendered
+        independently with bit-identical results. A final extra state is
+        yielded: the state after the last frame.
+        """
+        plan = self._get_plan()
+        n = plan.n
+        r = plan.r
+
+        # Same precision as the serial kernels, so the states match theirs
+        real = self._get_compute_type()
+
+        # Frames in the geometry cache already know their end state
+        use_frame_cache = self.frame_cache is not None and real is float
+        geometry_settings = self._get_geometry_settings()
+
+        x, u, v = start_state
+        for frame_number in range(start_frame, num_frames):
+            yield x, u, v
+            if use_frame_cache:
+                key = self.frame_cache.make_key(
+                    geometry_settings, frame_number, (x, u, v)
+                )
+                end_state = self.frame_cache.load_end_state(key)
+                if end_state is not None:
+                    x, u, v = end_state
+                    continue
+
+            t, spiral_size_multiplier = plan.frame_parameters(frame_number)
+            x, u, v = jit_core.compute_state_trajectory(
+                n,
+                real(r),
+                real(t),
+                real(x),
+                real(u),
+                real(v),
+                real(spiral_size_multiplier),
+            )
+            x, u, v = float(x), float(u), float(v)
+        yield x, u, v
+
+    def warm_up_kernels(
+        self, frame_kernels: bool = True, all_variants: bool = False
+    ) -> float:
+        """Compile the kernels, or load them from the JIT cache, up front
+
+        Each kernel runs once on a tiny copy of the loaded preset with the
+        argument types render_frame uses, so the first frame is not charged
+        for compilation. frame_kernels=False warms only the state pre-pass.
+        With all_variants, every bit depth and kernel mode is compiled
+        (to build a cache for other machines). Returns the elapsed seconds.
+        """
         if not self._preset_loaded:
             raise RuntimeError("No preset loaded")
-        pulse_config = self.current_preset["spiral_pulse"]
 
-        size_base = (pulse_config["size_max"] + pulse_config["size_min"]) / 2.0
-        size_variation = (pulse_config["size_max"] - pulse_config["size_min"]) / 2.0
+        # (frame type, compute precision, chunked kernels, lookup tables,
+        # sparse frames, accumulation)
+        variants = [
+            (
+                self._get_frame_dtype(),
+                self.compute_precision,
+                self.use_parallel_kernel,
+                self.use_lookup_tables,
+                self.sparse_frames,
+                self.accumulate,
+            )
+        ]
+        if all_variants:
+            variants = [
+                (np.dtype(dtype), "float64", chunked, chunked, sparse, False)
+                for dtype in (np.uint16, np.uint8)
+                for chunked in (False, True)
+                for sparse in (False, True)
+                if not (sparse and not chunked)
+            ]
+            variants += [
+                (np.dtype(dtype), precision, False, False, False, False)
+                for dtype in (np.uint16, np.uint8, np.float32)
+                for precision in COMPUTE_PRECISIONS
+                if dtype == np.float32 or precision != "float64"
+            ]
+            variants += [
+                (np.dtype(dtype), "float32", True, True, sparse, False)
+                for dtype in (np.uint16, np.uint8)
+                for sparse in (False, True)
+            ]
+            variants += [
+                (np.dtype(np.float32), precision, True, True, False, False)
+                for precision in COMPUTE_PRECISIONS
+            ]
+            variants += [
+                (np.dtype(dtype), "float64", False, False, False, True)
+                for dtype in (np.uint16, np.uint8, np.float32)
+            ]
+        # Frame types of the geometry cache shading kernel
+        geometry_dtypes = [self._get_frame_dtype()] if self._uses_frame_cache() else []
+        if all_variants:
+            geometry_dtypes = [np.dtype(dtype) for dtype in (np.uint16, np.uint8)]
+            geometry_dtypes.append(np.dtype(np.float32))
+        if not frame_kernels:
+            variants = []
+            geometry_dtypes = []
 
-        return size_base + size_variation * sin(
-            t * pulse_config["pulse_speed"] * 2 * pi
+        saved_plan, saved_preset = self._get_plan(), self.current_preset
+        saved_frame_cache = self.frame_cache
+        saved_modes = (
+            self.compute_precision,
+            self.use_parallel_kernel,
+            self.use_lookup_tables,
+            self.sparse_frames,
+            self.accumulate,
+        )
+        warm_up_preset = saved_plan.to_preset()
+        warm_up_preset["video"]["width"] = warm_up_preset["video"]["height"] = 8
+        warm_up_preset["mathematical"]["n"] = 4
+        output_config = self.config_manager.get_output_config()
+        warm_up_plan = RenderPlan(warm_up_preset, output_config, saved_plan.preset_name)
+
+        # Warm-up frames must not be stored in the geometry cache
+        self.frame_cache = None
+
+        warm_up_start = time.time()
+        try:
+            for variant in variants:
+                dtype, precision, chunked, lookup_tables, sparse, accumulate = variant
+                variant_output = {
+                    **output_config,
+                    "use_tiff_16bit": dtype == np.uint16,
+                    "linear_float_frames": dtype == np.float32,
+                }
+                self._use_plan(
+                    RenderPlan(warm_up_preset, variant_output, saved_plan.preset_name)
+                )
+                self.compute_precision = precision
+                self.use_parallel_kernel = chunked
+                self.use_lookup_tables = lookup_tables
+                self.sparse_frames = sparse
+                self.accumulate = accumulate
+                if sparse:
+                    self._compute_sparse_frame(0, 0.0, 0.0, 0.0)
+                    continue
+                out = np.zeros((8, 8, 3), dtype=dtype)
+                self._compute_frame(0, 0.0, 0.0, 0.0, out)
+                if precision != saved_modes[0]:
+                    for _ in self.compute_frame_states(1):
+                        pass
+            self._use_plan(warm_up_plan)
+            self.compute_precision = saved_modes[0]
+            for _ in self.compute_frame_states(1):
+                pass
+            for dtype in geometry_dtypes:
+                geometry = self._trace_frame_geometry(0, 0.0, 0.0, 0.0)
+                out = np.zeros((8, 8, 3), dtype=dtype)
+                self._shade_frame_geometry(0, geometry, out)
+            if all_variants:
+                params = sweep_parameters([self._get_plan()], 0)
+                states = np.zeros((3, 1), dtype=np.float64)
+                thumbnails = np.zeros((1, 8, 8, 3), dtype=np.uint8)
+                jit_core.compute_sweep_trajectory(4, params, states)
+                jit_core.compute_sweep_frames_8bit(4, 0, params, states, thumbnails)
+        finally:
+            self._use_plan(saved_plan, saved_preset)
+            self.frame_cache = saved_frame_cache
+            (
+                self.compute_precision,
+                self.use_parallel_kernel,
+                self.use_lookup_tables,
+                self.sparse_frames,
+                self.accumulate,
+            ) = saved_modes
+
+        return time.time() - warm_up_start
+
+    def precompile_kernels(self, preset_name: Optional[str] = None) -> float:
+        """Compile every kernel variant into the JIT cache and report it
+
+        Argument types do not depend on the preset, so any preset will do.
+        """
+        self.load_preset(preset_name or self.config_manager.get_preset_names()[0])
+        hits_before, misses_before = jit_cache.get_jit_cache_stats()
+        compile_time = self.warm_up_kernels(all_variants=True)
+        hits, misses = jit_cache.get_jit_cache_stats()
+
+        self.logger.info(
+            f"Precompiled kernels in {compile_time:.1f}s: "
+            f"{misses - misses_before} compiled, {hits - hits_before} already cached"
         )
+        self.logger.info(f"JIT cache directory: {jit_cache.get_jit_cache_dir()}")
+        return compile_time
 
-    def render_frame(self, frame_number: int) -> None:
-        """Render a single frame using JIT-compiled math"""
+    def render_frame(self, frame_number: int) -> Dict[str, Any]:
+        """Render a single frame using JIT-compiled math
+
+        Returns the frame's telemetry record (stage timings, counts, RSS).
+        """
         if not self._preset_loaded:
             raise RuntimeError("No preset loaded")
 
         frame_start_time = time.time()
 
-        video_config = self.current_preset["video"]
-        math_config = self.current_preset["mathematical"]
-        color_config = self.current_preset["colors"]
-        hdr_config = self.current_preset["hdr"]
-
-        # Setup frame
-        width, height = video_config["width"], video_config["height"]
-        use_16bit = self.config_manager.get_output_config()["use_tiff_16bit"]
+        plan = self._get_plan()
 
-        # Time progression
-        t = frame_number * math_config["time_speed"]
-        spiral_size_multiplier = self._calculate_spiral_size_multiplier(t)
+        # Reusable output buffer (waits while all buffers are being written),
+        # or the frame's slot of the raw frame file
+        buffer_wait_start = time.time()
+        out = None
+        raw_slot = self.raw_frames and self.frame_store is not None
+        if raw_slot:
+            out = self.frame_store.claim(frame_number)
+        elif self.buffer_pool is not None and not self.sparse_frames:
+            out = self.buffer_pool.acquire()
+        buffer_wait_time = time.time() - buffer_wait_start
 
         # JIT-compiled mathematical computation
         math_start = time.time()
-        n = math_config["n"]
-        r = 2 * pi / math_config["r_denominator"]
-        scale_factor = math_config["scale_factor"]
-
-        # Call the appropriate JIT-compiled function
-        if use_16bit:
-            img_array, pixels_processed, new_x, new_u, new_v = (
-                compute_mathematical_system_16bit(
-                    n,
-                    r,
-                    t,
-                    self.x,
-                    self.u,
-                    self.v,
-                    width,
-                    height,
-                    scale_factor,
-                    spiral_size_multiplier,
-                    frame_number,
-                    color_config["speed"],
-                    color_config["red_base"],
-                    color_config["red_variation"],
-                    color_config["green_base"],
-                    color_config["green_variation"],
-                    color_config["blue_base"],
-                    color_config["blue_variation"],
-                    color_config["saturation"],
-                    hdr_config["max_nits"],
-                    hdr_config["hdr_boost"],
-                    hdr_config["cosmic_core_boost"],
+        frame: Union[np.ndarray, SparseFrame]
+        try:
+            if self.sparse_frames:
+                frame, pixels_processed, new_x, new_u, new_v = (
+                    self._compute_sparse_frame(frame_number, self.x, self.u, self.v)
                 )
-            )
-        else:
-            img_array, pixels_processed, new_x, new_u, new_v = (
-                compute_mathematical_system_8bit(
-                    n,
-                    r,
-                    t,
-                    self.x,
-                    self.u,
-                    self.v,
-                    width,
-                    height,
-                    scale_factor,
-                    spiral_size_multiplier,
-                    frame_number,
-                    color_config["speed"],
-                    color_config["red_base"],
-                    color_config["red_variation"],
-                    color_config["green_base"],
-                    color_config["green_variation"],
-                    color_config["blue_base"],
-                    color_config["blue_variation"],
-                    color_config["saturation"],
-                    hdr_config["hdr_boost"],
-                    hdr_config["cosmic_core_boost"],
+            else:
+                frame, pixels_processed, new_x, new_u, new_v = self._compute_frame(
+                    frame_number, self.x, self.u, self.v, out
                 )
-            )
+        except Exception:
+            # Hand the buffer back so a failed frame cannot starve the pool
+            if out is not None and not raw_slot:
+                self.buffer_pool.release(out)
+            raise
 
         # Update mathematical state
         self.x, self.u, self.v = new_x, new_u, new_v
         math_time = time.time() - math_start
+        if self.manifest is not None:
+            self.manifest.set_frame_state(frame_number, (new_x, new_u, new_v))
 
-        # Save frame
-        extension = "tiff" if use_16bit else "png"
-        filename = f"{self.output_dir}/frame_{frame_number:04d}.{extension}"
-        cv2.imwrite(filename, img_array)
+        # Show the frame live, then save it (frames in the raw frame file
+        # only publish their slot)
+        self._publish_live_frame(frame_number, frame)
+        if raw_slot:
+            self.frame_store.publish(
+                frame_number, frame_number, pixels_processed, (new_x, new_u, new_v)
+            )
+        else:
+            self._save_frame(frame_number, frame)
 
         # Calculate totals
-        total_iterations = n * n
+        total_iterations = len(range(0, plan.n, self.sample_step)) ** 2
         frame_total_time = time.time() - frame_start_time
+        setup_time = math_start - frame_start_time
+        save_time = frame_total_time - math_time - setup_time
+        record = {
+            "stages": {
+                "setup": setup_time - buffer_wait_time,
+                "buffer_wait": buffer_wait_time,
+                "math": math_time,
+                "save": save_time,
+                "total": frame_total_time,
+            },
+            "iterations": total_iterations,
+            "pixels_processed": int(pixels_processed),
+            "rss_mb": get_rss_mb(),
+        }
+        if self.telemetry is not None:
+            self._record_telemetry(
+                frame_number,
+                record,
+                frame.dense_nbytes if isinstance(frame, SparseFrame) else frame.nbytes,
+            )
 
         # INFO: Simple progress update
         self.logger.info(
-            f"Frame {frame_number+1:3d}/{video_config['num_frames']}: {frame_total_time:.2f}s"
+            f"Frame {frame_number+1:3d}/{plan.num_frames}: {frame_total_time:.2f}s"
         )
 
         # DEBUG: Detailed performance metrics
         if self.logger.isEnabledFor(logging.DEBUG):
-            setup_time = math_start - frame_start_time
-            save_time = frame_total_time - math_time - setup_time
-
             self.logger.debug(f"=== FRAME {frame_number+1} DEBUG METRICS ===")
             self.logger.debug(f"Total time: {frame_total_time:.3f}s")
             self.logger.debug(
@@ -214,82 +979,1345 @@ class CosmicSpiralGenerator:
             self.logger.debug(
                 f"Time per iteration: {(math_time/total_iterations)*1000000:.2f} microseconds"
             )
+            self.logger.debug(f"Buffer wait time: {buffer_wait_time:.3f}s")
+            if isinstance(frame, SparseFrame):
+                self.logger.debug(
+                    f"Sparse frame: {len(frame.pixel_index):,} pixels, "
+                    f"{frame.nbytes / 1e6:.1f} MB "
+                    f"({frame.nbytes / frame.dense_nbytes * 100:.1f}% of dense)"
+                )
+            if self.buffer_pool is not None:
+                self.logger.debug(
+                    f"Frame buffers allocated: {self.buffer_pool.allocations} "
+                    f"for {self.buffer_pool.acquisitions} frames"
+                )
+            self.logger.debug(f"Peak RSS: {get_peak_rss_mb():,.0f} MB")
             self.logger.debug("-" * 50)
 
-    def generate_animation(self, preset_name: str) -> None:
-        """Generate complete animation using specified preset"""
+        return record
+
+    def _record_telemetry(
+        self, frame_number: int, record: Dict[str, Any], frame_nbytes: int
+    ) -> None:
+        """Add a frame record to the telemetry
+
+        Streamed frames and frames in a raw frame file count their raw size
+        as written; frame files are recorded with their file size once they
+        are on disk.
+        """
+        assert self.telemetry is not None
+        streamed = isinstance(self.frame_sink, FFmpegStreamEncoder)
+        if streamed or self.raw_frames:
+            record["bytes_written"] = frame_nbytes
+        self.telemetry.record_frame(
+            frame_number, record, wait_for_write=not (streamed or self.raw_frames)
+        )
+
+    def _publish_live_frame(
+        self, frame_number: int, frame: Union[np.ndarray, SparseFrame]
+    ) -> None:
+        """Show a rendered frame on the live server, or keep its JPEG for it"""
+        if self.live_server is not None:
+            self.live_server.publish(frame_number, frame)
+        elif self.live_preview_width is not None:
+            self._live_preview = encode_preview(frame, self.live_preview_width)
+
+    def _get_frame_filename(
+        self, frame_number: int, output_dir: Optional[str] = None
+    ) -> str:
+        """Get the file path a frame is written to"""
+        extension = "npz" if self.sparse_frames else self._get_plan().frame_extension
+        return f"{output_dir or self.output_dir}/frame_{frame_number:04d}.{extension}"
+
+    def _frame_written(self, frame_number: int, filename: str) -> None:
+        """Record a frame file as complete in the manifest and telemetry"""
+        if self.manifest is not None:
+            self.manifest.complete_frame(frame_number, filename)
+        if self.telemetry is not None:
+            self.telemetry.frame_written(frame_number, os.path.getsize(filename))
+
+    def _save_frame(
+        self, frame_number: int, frame: Union[np.ndarray, SparseFrame]
+    ) -> None:
+        """Hand a rendered frame to the frame sink, or write it to a file
+
+        Sparse frames are stored as .npz point lists, and only rasterized
+        into a dense buffer when they are handed to an encoder.
+        """
+        if isinstance(frame, SparseFrame):
+            if self.frame_sink is None:
+                filename = self._get_frame_filename(frame_number)
+                frame.save(filename)
+                self._frame_written(frame_number, filename)
+                return
+            out = self.buffer_pool.acquire() if self.buffer_pool is not None else None
+            frame = frame.to_dense(out)
+
+        img_array = frame
+        if self.frame_sink is not None:
+            self.frame_sink.submit(frame_number, img_array)
+            return
+
+        filename = self._get_frame_filename(frame_number)
+        try:
+            if not cv2.imwrite(filename, img_array, self._get_plan().imwrite_params):
+                raise IOError(f"Failed to write {filename}")
+        finally:
+            if self.buffer_pool is not None:
+                self.buffer_pool.release(img_array)
+        self._frame_written(frame_number, filename)
+
+    def _create_buffer_pool(self, size: int) -> FrameBufferPool:
+        """Create a pool of reusable frame buffers for the loaded preset"""
+        plan = self._get_plan()
+        return FrameBufferPool((plan.height, plan.width, 3), plan.frame_dtype, size)
+
+    def _get_max_in_flight(self, workers: int) -> int:
+        """Get the number of frames that may wait for writing or encoding"""
+        if self.resource_plan is not None:
+            return self.resource_plan.max_in_flight
+        output_config = self.config_manager.get_output_config()
+        return max(output_config.get("max_in_flight_frames", 4), workers)
+
+    def _plan_resources(
+        self, workers: int, sink_frames: bool, presets: Sequence[Dict[str, Any]] = ()
+    ) -> int:
+        """Fit the render into the memory and CPU budgets, if any are set
+
+        Sizes workers, frames in flight and kernel threads from the cost of
+        the loaded preset (or the most expensive of presets) and starts the
+        memory governor of parallel renders. Returns the number of workers
+        to render with.
+        """
+        self._release_resource_plan()
+        if self.memory_budget_mb is None and self.cpu_budget is None:
+            return workers
+
+        costs = [
+            estimate_render_cost(
+                preset, self._get_frame_dtype(), self.accumulate, self.sparse_frames
+            )
+            for preset in presets or [self.current_preset]
+        ]
+        output_config = self.config_manager.get_output_config()
+        plan = plan_resources(
+            max(costs, key=lambda cost: cost.process_mb),
+            workers,
+            output_config.get("max_in_flight_frames", 4),
+            self.memory_budget_mb,
+            self.cpu_budget,
+            sink_frames,
+            self.use_parallel_kernel,
+        )
+        self.resource_plan = plan
+        self.kernel_threads = plan.kernel_threads
+        if plan.workers <= 1:
+            numba.set_num_threads(
+                min(plan.kernel_threads, numba.config.NUMBA_NUM_THREADS)
+            )
+        elif self.memory_budget_mb is not None:
+            self.memory_governor = MemoryGovernor(
+                self.memory_budget_mb, plan.workers * 2
+            )
+
+        budget = (
+            f" of the {self.memory_budget_mb:,.0f} MB budget"
+            if self.memory_budget_mb is not None
+            else ""
+        )
+        self.logger.info(
+            f"Resource plan: {plan.workers} worker processes, {plan.max_in_flight} frames "
+            f"in flight, {plan.kernel_threads} kernel threads "
+            f"(estimated {plan.estimated_mb:,.0f} MB{budget})"
+        )
+        return plan.workers
+
+    def _release_resource_plan(self) -> None:
+        """Drop the plan of a finished render and report the measured memory"""
+        governor = self.memory_governor
+        if governor is not None and governor.peak_mb:
+            self.logger.debug(
+                f"Measured memory: peak {governor.peak_mb:,.0f} MB of "
+                f"{governor.memory_budget_mb:,.0f} MB, frames in flight lowered "
+                f"{governor.reductions} times"
+            )
+        self.resource_plan = None
+        self.memory_governor = None
+        self.kernel_threads = None
+
+    def _get_parallel_limit(self, max_in_flight: int) -> int:
+        """Get the frames a parallel render may keep submitted"""
+        if self.memory_governor is None:
+            return max_in_flight
+        return min(max_in_flight, self.memory_governor.update())
+
+    def _create_frame_sink(self, stream: bool, workers: int) -> Optional[FrameSink]:
+        """Create the asynchronous frame consumer for this render, if any"""
+        output_config = self.config_manager.get_output_config()
+        max_in_flight = self._get_max_in_flight(workers)
+
+        # Buffers go back to the pool once written (parallel frames arrive
+        # from worker processes and are not pool buffers)
+        on_frame_done = self.buffer_pool.release if self.buffer_pool else None
+
+        if stream:
+            if self._get_frame_dtype() == np.float32:
+                raise ValueError("Linear float frames cannot be streamed to ffmpeg")
+            return FFmpegStreamEncoder(
+                self.config_manager.get_ffmpeg_stream_args(
+                    self.current_preset_name,
+                    self.timestamp,
+                    self.current_preset["video"],
+                ),
+                max_queued_frames=max_in_flight,
+                on_frame_done=on_frame_done,
+            )
+
+        if self.delta_frames:
+            return self._create_delta_archive_writer(max_in_flight, on_frame_done)
+
+        # Parallel workers write their own frames
+        # (sparse frame files are small and written directly, and raw frames
+        # are rendered in place in their file)
+        writer_threads = output_config.get("writer_threads", 2)
+        if workers > 1 or writer_threads < 1 or self.sparse_frames or self.raw_frames:
+            return None
+
+        plan = self._get_plan()
+        return FrameWriterPipeline(
+            self.output_dir,
+            plan.frame_extension,
+            list(plan.imwrite_params),
+            num_threads=writer_threads,
+            max_in_flight=max_in_flight,
+            on_frame_done=on_frame_done,
+            on_frame_written=self._frame_written,
+        )
+
+    def _create_delta_archive_writer(
+        self,
+        max_in_flight: int,
+        on_frame_done: Optional[Callable[[np.ndarray], None]],
+    ) -> DeltaArchiveWriter:
+        """Create the keyframe/delta archive writer of this render"""
+        video_config = self.current_preset["video"]
+        # One keyframe per second unless configured
+        keyframe_interval = (
+            self.config_manager.get_output_config().get("delta_keyframe_interval")
+            or video_config["fps"]
+        )
+        return DeltaArchiveWriter(
+            os.path.join(self.output_dir, DELTA_ARCHIVE_FILENAME),
+            (video_config["height"], video_config["width"], 3),
+            self._get_frame_dtype(),
+            {
+                "preset": self.current_preset_name,
+                "timestamp": self.timestamp,
+                "fps": video_config["fps"],
+            },
+            keyframe_interval=keyframe_interval,
+            max_queued_frames=max_in_flight,
+            on_frame_done=on_frame_done,
+            on_frame_written=self._archive_frame_written,
+        )
+
+    def _archive_frame_written(self, frame_number: int, bytes_written: int) -> None:
+        """Record the size of a frame's archive record in the telemetry"""
+        if self.telemetry is not None:
+            self.telemetry.frame_written(frame_number, bytes_written)
+
+    @contextmanager
+    def _frame_outputs(self, stream: bool, workers: int) -> Iterator[None]:
+        """Set up frame buffers and the frame sink, flushing them on exit"""
+        if self.delta_frames and stream:
+            raise ValueError(
+                "Delta archives cannot be streamed (encode them afterwards)"
+            )
+        # Frames handed to an encoder or archive writer in this process
+        sink_frames = stream or self.delta_frames
+
+        # Frame buffers: one being rendered, the rest queued in the sink
+        # (plus the one being encoded or archived). Sparse frames from
+        # parallel workers are rasterized into buffers for the sink, dense
+        # ones are rendered into a shared ring the sink reads.
+        if self.raw_frames:
+            self.frame_store = self._create_raw_frame_store(stream)
+        elif sink_frames and workers > 1 and not self.sparse_frames:
+            self.frame_store = self._create_frame_ring(workers)
+            self.buffer_pool = FrameBufferPool.from_buffers(
+                [
+                    self.frame_store.frame(slot)
+                    for slot in range(self.frame_store.num_slots)
+                ]
+            )
+        elif workers <= 1 or (sink_frames and self.sparse_frames):
+            self.buffer_pool = self._create_buffer_pool(
+                self._get_max_in_flight(workers) + (2 if sink_frames else 1)
+            )
+
+        try:
+            if self.live_server is not None:
+                self.live_server.start()
+                self.logger.info(f"Live frames: {self.live_server.url}")
+
+            self.frame_sink = self._create_frame_sink(stream, workers)
+            if self.frame_sink is not None:
+                self.frame_sink.start()
+
+            yield
+
+            # Flush pending frames and surface any write/encode error
+            if self.frame_sink is not None:
+                flush_start = time.time()
+                self.frame_sink.close()
+                self.logger.debug(
+                    f"Output flush time: {time.time() - flush_start:.3f}s"
+                )
+        except BaseException:
+            if self.frame_sink is not None:
+                self.frame_sink.abort()
+            raise
+        finally:
+            self.frame_sink = None
+            self.buffer_pool = None
+            if self.live_server is not None:
+                self._close_live_server()
+            if self.frame_store is not None:
+                self.frame_store.close()
+                if not self.raw_frames:
+                    os.remove(self.frame_store.path)
+                self.frame_store = None
+
+    def _close_live_server(self) -> None:
+        """Stop the live server and log how many frames it showed"""
+        assert self.live_server is not None
+        counts = self.live_server.close()
+        self.logger.debug(
+            f"Live frames: {counts['encoded']} shown, {counts['dropped']} dropped "
+            f"of {counts['published']}"
+        )
+        if counts["error"] is not None:
+            self.logger.warning(f"Live frames stopped: {counts['error']}")
+
+    def _create_raw_frame_store(self, stream: bool) -> FrameStore:
+        """Create the raw frame file of this render, one slot per frame"""
+        if stream:
+            raise ValueError("Raw frames cannot be streamed (encode them afterwards)")
+        if self.sparse_frames:
+            raise ValueError("Raw frame files hold dense frames, not sparse ones")
+
+        video_config = self.current_preset["video"]
+        return FrameStore.create(
+            os.path.join(self.output_dir, RAW_FRAMES_FILENAME),
+            video_config["num_frames"],
+            (video_config["height"], video_config["width"], 3),
+            self._get_frame_dtype(),
+            {
+                "preset": self.current_preset_name,
+                "timestamp": self.timestamp,
+                "fps": video_config["fps"],
+            },
+        )
+
+    def _create_frame_ring(self, workers: int) -> FrameStore:
+        """Create the shared-memory ring parallel workers render streamed frames in
+
+        Slots cover the frames in flight in workers, those queued in the
+        encoder, the one being encoded and the one waiting to be queued.
+        """
+        video_config = self.current_preset["video"]
+        ring_file, path = tempfile.mkstemp(
+            prefix="lux_spiral_ring_", suffix=".frames", dir=get_shared_memory_dir()
+        )
+        os.close(ring_file)
+        return FrameStore.create(
+            path,
+            workers * 2 + self._get_max_in_flight(workers) + 2,
+            (video_config["height"], video_config["width"], 3),
+            self._get_frame_dtype(),
+        )
+
+    def _get_job_hash(self) -> str:
+        """Hash of the loaded preset and the settings that change frame files"""
+        output_config = self.config_manager.get_output_config()
+        settings = {
+            "use_tiff_16bit": output_config["use_tiff_16bit"],
+            "compression": output_config.get("compression", "lzw"),
+            "png_compression_level": output_config.get("png_compression_level", 1),
+            "use_lookup_tables": self.use_lookup_tables,
+            "sparse_frames": self.sparse_frames,
+        }
+        if self.compute_precision != "float64":
+            settings["compute_precision"] = self.compute_precision
+        if output_config.get("linear_float_frames", False):
+            settings["linear_float_frames"] = True
+        if self.accumulate:
+            settings["accumulation_exposure"] = self.accumulation_exposure
+        if self.preset_overrides:
+            settings["overrides"] = self.preset_overrides
+        return self.config_manager.get_preset_hash(self.current_preset_name, settings)
+
+    def _resume_manifest(self, resume_dir: str) -> RenderManifest:
+        """Load the manifest of an interrupted render of the loaded preset"""
+        manifest = RenderManifest.load(resume_dir)
+        if manifest.preset_name != self.current_preset_name:
+            raise ValueError(
+                f"{resume_dir} is a render of preset '{manifest.preset_name}', "
+                f"not '{self.current_preset_name}'"
+            )
+        if manifest.preset_hash != self._get_job_hash():
+            raise ValueError(
+                f"Preset '{self.current_preset_name}' or its output settings changed "
+                f"since {resume_dir} was rendered; start a new render instead"
+            )
+        return manifest
+
+    def generate_animation(
+        self,
+        preset_name: str,
+        workers: int = 1,
+        stream: bool = False,
+        resume_dir: Optional[str] = None,
+    ) -> None:
+        """Generate complete animation using specified preset
+
+        With workers > 1 the frame starting states are computed by a
+        state-only pre-pass and frames are rendered by a process pool.
+        With stream=True frames are piped straight into an ffmpeg encoder
+        instead of being written as image files.
+
+        Frame renders record their progress in a manifest in the output
+        directory. With resume_dir, an interrupted render continues in that
+        directory from its last durable frame; verified frames are skipped.
+        """
         self.load_preset(preset_name)
-        self._setup_output_directory()
+        workers = self._plan_resources(workers, stream or self.delta_frames)
 
         video_config = self.current_preset["video"]
         num_frames = video_config["num_frames"]
 
+        if resume_dir is not None:
+            if stream or self.raw_frames or self.delta_frames:
+                raise ValueError(
+                    "Streamed, raw frame and delta archive renders cannot be resumed"
+                )
+            self.manifest = self._resume_manifest(resume_dir)
+            self.output_dir = resume_dir
+            self.timestamp = self.manifest.timestamp
+        else:
+            self._setup_output_directory(create=not stream)
+            if not (stream or self.raw_frames or self.delta_frames):
+                self.manifest = RenderManifest(
+                    self.output_dir,
+                    self.current_preset_name,
+                    self._get_job_hash(),
+                    num_frames,
+                    self.timestamp,
+                )
+                self.manifest.save()
+
+        if self.telemetry is not None:
+            self.telemetry.start(
+                preset=self.current_preset_name,
+                width=video_config["width"],
+                height=video_config["height"],
+                n=self.current_preset["mathematical"]["n"],
+                num_frames=num_frames,
+                workers=workers,
+                stream=stream,
+            )
+
+        try:
+            self._render_animation(num_frames, workers, stream)
+        finally:
+            self.manifest = None
+            self._release_resource_plan()
+            if self.telemetry is not None:
+                self._log_telemetry_summary(self.telemetry.close())
+
+    def _log_telemetry_summary(self, summary: Dict[str, Any]) -> None:
+        """Log p50/p95/max of each frame stage"""
+        if not summary["frames"]:
+            return
+        self.logger.info("")
+        self.logger.info(f"Stage times over {summary['frames']} frames (p50/p95/max):")
+        for stage, stats in summary["stages"].items():
+            self.logger.info(
+                f"  {stage:12} {stats['p50']:.3f}s / {stats['p95']:.3f}s / "
+                f"{stats['max']:.3f}s"
+            )
+        if self.telemetry is not None and self.telemetry.jsonl_path is not None:
+            self.logger.info(f"Telemetry saved to: {self.telemetry.jsonl_path}")
+
+    def _render_animation(self, num_frames: int, workers: int, stream: bool) -> None:
+        """Render the frames of generate_animation, skipping verified ones"""
+        video_config = self.current_preset["video"]
+
         self.logger.info(
             f"Generating {num_frames} HDR frames at {video_config['width']}x{video_config['height']}..."
         )
         self.logger.info(
-            f"HDR Settings: {self.current_preset['hdr']['max_nits']} nits peak, Rec. 2020 wide gamut"
+            f"HDR Settings: {self.current_preset['hdr']['max_nits']:g} nits peak, Rec. 2020 wide gamut"
         )
-        self.logger.info(f"Output directory: {self.output_dir}")
+        if stream:
+            video_file = self.config_manager.get_video_filename(
+                self.current_preset_name, self.timestamp
+            )
+            self.logger.info(f"Streaming to ffmpeg: {video_file}")
+        else:
+            self.logger.info(f"Output directory: {self.output_dir}")
         self.logger.info("")
 
-        # Reset mathematical state
+        # Reset mathematical state, or continue from the last durable frame
         self.x = self.u = self.v = 0.0
+        first_frame = 0
+        verified: Set[int] = set()
+        if self.manifest is not None and self.manifest.frames:
+            verified, damaged = self.manifest.verify_frames()
+            first_frame, (self.x, self.u, self.v) = self.manifest.get_resume_point(
+                verified
+            )
+            self.logger.info(
+                f"Resuming at frame {first_frame+1}: {len(verified)} of {num_frames} "
+                f"frames verified"
+            )
+            if damaged:
+                self.logger.warning(
+                    f"Re-rendering {len(damaged)} missing or damaged frames"
+                )
+        frames_to_render = num_frames - len(verified)
+
+        # Compile or load the kernels before timing frames (parallel
+        # workers warm up their own frame kernels when they start)
+        if frames_to_render:
+            hits_before, misses_before = jit_cache.get_jit_cache_stats()
+            compile_time = self.warm_up_kernels(frame_kernels=workers <= 1)
+            hits, misses = jit_cache.get_jit_cache_stats()
+            self.logger.info(
+                f"JIT warm-up: {compile_time:.2f}s ({misses - misses_before} "
+                f"compiled, {hits - hits_before} loaded from cache)"
+            )
 
         # Render all frames
         start_time = time.time()
-        for frame in range(num_frames):
-            self.render_frame(frame)
+        with self._frame_outputs(stream, workers):
+            if workers > 1:
+                self._render_frames_parallel(num_frames, workers, first_frame, verified)
+            else:
+                for frame in range(first_frame, num_frames):
+                    if frame in verified:
+                        self.x, self.u, self.v = self.manifest.get_frame_state(frame)
+                        continue
+                    self.render_frame(frame)
 
         total_time = time.time() - start_time
         self.logger.info("")
         self.logger.info(f"Animation complete! Total time: {total_time/60:.1f} minutes")
-        self.logger.info(f"Average: {total_time/num_frames:.2f}s per frame")
+        if frames_to_render:
+            self.logger.info(f"Average: {total_time/frames_to_render:.2f}s per frame")
+        if self.frame_cache is not None and workers <= 1:
+            self.logger.info(
+                f"Frame geometry cache: {self.frame_cache.hits} hits, "
+                f"{self.frame_cache.misses} misses"
+            )
+        self.logger.debug(f"Peak RSS: {get_peak_rss_mb():,.0f} MB")
         self.logger.info("")
 
-        self._print_completion_info()
+        self._print_completion_info(stream)
+
+    def _render_frames_parallel(
+        self,
+        num_frames: int,
+        workers: int,
+        first_frame: int = 0,
+        skip_frames: AbstractSet[int] = frozenset(),
+    ) -> None:
+        """Render frames in a process pool from pre-computed starting states
+
+        The pre-pass starts at first_frame from the current state; frames
+        in skip_frames are already written and are not rendered again.
+        """
+        self.logger.info(f"Rendering with {workers} worker processes")
+
+        # Workers are spawned rather than forked: forking after Numba has
+        # started its threading layer (parallel kernels) can deadlock
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_render_worker,
+            initargs=(
+                self._get_plan(),
+                self.config_manager.get_output_config(),
+                self.output_dir,
+                self.timestamp,
+                self.logger.level,
+                self._get_render_modes(),
+            ),
+        ) as executor:
+            # Frames are submitted as soon as the state after them is known,
+            # so the serial state pre-pass overlaps with rendering and a
+            # frame's manifest entry is complete whenever it finishes. The
+            # number of frames in flight is bounded so streamed frames wait
+            # in order for the encoder without piling up in memory.
+            stream = self.frame_sink is not None
+            worker = _compute_frame_worker if stream else _render_frame_worker
+            ring = self.frame_store if stream else None
+            max_in_flight = workers * 2
+            pending: Deque[Future] = deque()
+
+            prepass_start = time.time()
+            states = self.compute_frame_states(
+                num_frames, first_frame, (self.x, self.u, self.v)
+            )
+            # Frame waiting for the state after it, with its starting state
+            waiting: Optional[Tuple[int, Tuple[float, float, float]]] = None
+            for frame, state in zip(range(first_frame, num_frames + 1), states):
+                # The starting state of a frame is the state after the last one
+                if waiting is not None:
+                    previous, start_state = waiting
+                    waiting = None
+                    if self.manifest is not None:
+                        self.manifest.set_frame_state(previous, state)
+                    if ring is not None:
+                        # Workers render streamed frames straight into ring slots
+                        slot = ring.slot_of(self.buffer_pool.acquire())
+                        pending.append(
+                            executor.submit(worker, previous, start_state, slot)
+                        )
+                    else:
+                        pending.append(executor.submit(worker, previous, start_state))
+                    while len(pending) >= self._get_parallel_limit(max_in_flight):
+                        self._collect_parallel_frame(pending.popleft(), num_frames)
+                if frame == num_frames:
+                    # State after the last frame, as the serial path leaves it
+                    self.x, self.u, self.v = state
+                    break
+                if frame not in skip_frames:
+                    waiting = frame, state
+            self.logger.debug(
+                f"State pre-pass time: {time.time() - prepass_start:.3f}s"
+            )
+
+            while pending:
+                self._collect_parallel_frame(pending.popleft(), num_frames)
+
+    def _get_render_modes(self) -> Dict[str, Any]:
+        """Get the kernel/frame modes that render workers must share"""
+        return {
+            "compute_precision": self.compute_precision,
+            "frame_cache": self.frame_cache,
+            "accumulate": self.accumulate,
+            "accumulation_exposure": self.accumulation_exposure,
+            "use_parallel_kernel": self.use_parallel_kernel,
+            "use_lookup_tables": self.use_lookup_tables,
+            "sparse_frames": self.sparse_frames,
+            "raw_frames": self.raw_frames,
+            "frame_store": self.frame_store,
+            "kernel_threads": self.kernel_threads,
+            "live_preview_width": (
+                self.live_server.max_width if self.live_server is not None else None
+            ),
+        }
+
+    def _collect_parallel_frame(self, future: Future, num_frames: int) -> None:
+        """Wait for a parallel frame and forward streamed output in order"""
+        result = future.result()
+        if self.frame_sink is None:
+            frame_number, record, preview = result
+            if preview is not None and self.live_server is not None:
+                self.live_server.publish_jpeg(frame_number, preview)
+            if self.raw_frames:
+                # Rendered in place in the raw frame file
+                if self.telemetry is not None:
+                    self._record_telemetry(
+                        frame_number, record, self.frame_store.frame_bytes
+                    )
+                return
+            if self.telemetry is not None:
+                self.telemetry.record_frame(frame_number, record, wait_for_write=True)
+            self._frame_written(frame_number, self._get_frame_filename(frame_number))
+            return
+
+        frame_number, frame, record = result
+        if isinstance(frame, int):
+            frame = self._get_ring_frame(frame, frame_number)
+        frame_nbytes = (
+            frame.dense_nbytes if isinstance(frame, SparseFrame) else frame.nbytes
+        )
+        save_start = time.time()
+        self._publish_live_frame(frame_number, frame)
+        self._save_frame(frame_number, frame)
+        if self.telemetry is not None:
+            record["stages"]["save"] = time.time() - save_start
+            self._record_telemetry(frame_number, record, frame_nbytes)
+        self.logger.info(f"Frame {frame_number+1:3d}/{num_frames}: encoded")
+
+    def _get_ring_frame(self, slot: int, frame_number: int) -> np.ndarray:
+        """Get a frame a worker rendered into a ring slot"""
+        assert self.frame_store is not None
+        header = self.frame_store.read_header(slot)
+        if header is None or header.frame != frame_number:
+            raise RuntimeError(f"Frame {frame_number} missing from ring slot {slot}")
+        return self.frame_store.frame(slot)
 
-    def _print_completion_info(self) -> None:
+    def _print_completion_info(self, stream: bool = False) -> None:
         """Print completion information and ffmpeg command"""
         if not self._preset_loaded:
             raise RuntimeError("No preset loaded")
 
-        self.logger.info(f"Frames saved to: {self.output_dir}/")
-        self.logger.info("")
-        self.logger.info("To encode as HDR video, run this ffmpeg command:")
-        self.logger.info("")
+        if stream:
+            video_file = self.config_manager.get_video_filename(
+                self.current_preset_name, self.timestamp
+            )
+            self.logger.info(f"HDR video saved to: {video_file}")
+        elif self.raw_frames:
+            raw_file = os.path.join(self.output_dir, RAW_FRAMES_FILENAME)
+            self.logger.info(f"Raw frames saved to: {raw_file}")
+            self.logger.info("")
+            self.logger.info(
+                f"Encode them with: python cosmic_generator.py --encode-raw "
+                f"{self.output_dir}"
+            )
+        elif self.delta_frames:
+            archive = os.path.join(self.output_dir, DELTA_ARCHIVE_FILENAME)
+            self.logger.info(f"Frame archive saved to: {archive}")
+            self.logger.info("")
+            self.logger.info(
+                f"Encode it with: python cosmic_generator.py --encode-delta "
+                f"{self.output_dir}"
+            )
+        elif self.sparse_frames:
+            self.logger.info(f"Sparse frames saved to: {self.output_dir}/")
+            self.logger.info("")
+            self.logger.info(
+                "Load them with sparse_frame.SparseFrame.load(), or render with "
+                "--stream to encode directly"
+            )
+        else:
+            self.logger.info(f"Frames saved to: {self.output_dir}/")
+            self.logger.info("")
+            self.logger.info("To encode as HDR video, run this ffmpeg command:")
+            self.logger.info("")
 
-        ffmpeg_cmd = self.config_manager.get_ffmpeg_command(
-            self.current_preset_name, self.output_dir, self.timestamp
-        )
-        self.logger.info(ffmpeg_cmd)
+            ffmpeg_cmd = self.config_manager.get_ffmpeg_command(
+                self.current_preset_name, self.output_dir, self.timestamp
+            )
+            self.logger.info(ffmpeg_cmd)
 
         self.logger.info("")
         self.logger.info(
-            f"HDR Settings used: {self.current_preset['hdr']['max_nits']} nits peak brightness, Rec. 2020 color gamut"
+            f"HDR Settings used: {self.current_preset['hdr']['max_nits']:g} nits peak brightness, Rec. 2020 color gamut"
         )
 
 
+# Per-process generator used by parallel render workers
+_worker_generator: Optional[CosmicSpiralGenerator] = None
+
+
+def _init_render_worker(
+    plan: RenderPlan,
+    output_config: Dict[str, Any],
+    output_dir: str,
+    timestamp: str,
+    log_level: int,
+    render_modes: Dict[str, Any],
+) -> None:
+    """Initialize a render worker process with the parent's plan and output"""
+    global _worker_generator
+    generator = CosmicSpiralGenerator(config={"presets": {}, "output": output_config})
+    generator.logger.setLevel(log_level)
+    for mode, enabled in render_modes.items():
+        setattr(generator, mode, enabled)
+
+    # Frames already run one per process; keep kernels single-threaded
+    # unless a CPU budget leaves each worker several cores
+    numba.set_num_threads(
+        min(generator.kernel_threads or 1, numba.config.NUMBA_NUM_THREADS)
+    )
+
+    generator._use_plan(plan)
+    generator.output_dir = output_dir
+    generator.timestamp = timestamp
+    generator.buffer_pool = generator._create_buffer_pool(1)
+    compile_time = generator.warm_up_kernels()
+    generator.logger.debug(f"Worker JIT warm-up: {compile_time:.2f}s")
+    _worker_generator = generator
+
+
+def _render_frame_worker(
+    frame_number: int, state: Tuple[float, float, float]
+) -> Tuple[int, Dict[str, Any], Optional[bytes]]:
+    """Render one frame in a worker process from its starting state
+
+    Also returns the frame's JPEG for the parent's live server, if it has one.
+    """
+    if _worker_generator is None:
+        raise RuntimeError("Render worker not initialized")
+    _worker_generator.x, _worker_generator.u, _worker_generator.v = state
+    record = _worker_generator.render_frame(frame_number)
+    preview, _worker_generator._live_preview = _worker_generator._live_preview, None
+    return frame_number, record, preview
+
+
+def _compute_frame_worker(
+    frame_number: int,
+    state: Tuple[float, float, float],
+    slot: Optional[int] = None,
+) -> Tuple[int, Union[np.ndarray, SparseFrame, int], Dict[str, Any]]:
+    """Compute one frame in a worker process and return it for streaming
+
+    With a slot, the frame is rendered into that slot of the shared frame
+    ring and only the slot number is returned. Sparse frames are returned
+    as point lists, which are much cheaper to send back to the parent than
+    dense images. The frame's telemetry record covers the computation only.
+    """
+    if _worker_generator is None:
+        raise RuntimeError("Render worker not initialized")
+
+    math_start = time.time()
+    frame: Union[np.ndarray, SparseFrame, int]
+    if slot is not None:
+        ring = _worker_generator.frame_store
+        assert ring is not None
+        _, pixels_processed, *end_state = _worker_generator._compute_frame(
+            frame_number, *state, ring.claim(slot)
+        )
+        ring.publish(slot, frame_number, pixels_processed, tuple(end_state))
+        frame = slot
+    elif _worker_generator.sparse_frames:
+        frame, pixels_processed = _worker_generator._compute_sparse_frame(
+            frame_number, *state
+        )[:2]
+    else:
+        pool = _worker_generator.buffer_pool
+        assert pool is not None
+        frame = pool.acquire()
+        pixels_processed = _worker_generator._compute_frame(
+            frame_number, *state, frame
+        )[1]
+        # The result is pickled before this worker takes its next frame,
+        # so the buffer can already go back to the pool
+        pool.release(frame)
+    math_time = time.time() - math_start
+
+    n = _worker_generator._get_plan().n
+    record = {
+        "stages": {"math": math_time, "total": math_time},
+        "iterations": n * n,
+        "pixels_processed": int(pixels_processed),
+        "rss_mb": get_rss_mb(),
+    }
+    return frame_number, frame, record
+
+
+def validate_presets(
+    config_manager: ConfigManager, preset_name: Optional[str] = None
+) -> bool:
+    """Validate one preset, or all of them, and report the result"""
+    logger = logging.getLogger(__name__)
+    names = [preset_name] if preset_name else config_manager.get_preset_names()
+
+    valid = True
+    for name in names:
+        try:
+            preset_valid = config_manager.validate_preset(
+                config_manager.get_preset(name)
+            )
+        except ValueError as e:
+            logger.error(f"Error: {e}")
+            preset_valid = False
+        logger.info(f"{name:20} - {'OK' if preset_valid else 'INVALID'}")
+        valid = valid and preset_valid
+    return valid
+
+
+def get_frames_ffmpeg_command(
+    config_manager: ConfigManager, output_dir: str, preset_name: Optional[str] = None
+) -> str:
+    """Get the ffmpeg command that encodes the frames of a finished render
+
+    The preset and video name come from the render manifest when there is
+    one, and otherwise from preset_name and the directory name.
+    """
+    timestamp = os.path.basename(os.path.normpath(output_dir))
+    try:
+        manifest = RenderManifest.load(output_dir)
+        preset_name = preset_name or manifest.preset_name
+        timestamp = manifest.timestamp
+    except FileNotFoundError:
+        if preset_name is None:
+            raise ValueError(
+                f"No render manifest in {output_dir}; give the preset name"
+            )
+    return config_manager.get_ffmpeg_command(preset_name, output_dir, timestamp)
+
+
+def encode_raw_frames(
+    config_manager: ConfigManager, output_dir: str
+) -> Tuple[str, int]:
+    """Encode the raw frame file of a finished render with ffmpeg
+
+    Frames are read sequentially from the memory-mapped file and piped to
+    ffmpeg without being copied into intermediate images. Returns the
+    video filename and the number of frames encoded.
+    """
+    store = FrameStore(os.path.join(output_dir, RAW_FRAMES_FILENAME), writable=False)
+    try:
+        return _encode_frame_file(
+            config_manager,
+            store.metadata,
+            store.shape,
+            store.dtype,
+            ((header.frame, frame) for header, frame in store.iter_frames()),
+        )
+    finally:
+        store.close()
+
+
+def encode_delta_archive(
+    config_manager: ConfigManager, output_dir: str
+) -> Tuple[str, int]:
+    """Encode the keyframe/delta archive of a finished render with ffmpeg
+
+    Frames are decoded in order while earlier ones are piped to ffmpeg.
+    Returns the video filename and the number of frames encoded.
+    """
+    with DeltaArchiveReader(os.path.join(output_dir, DELTA_ARCHIVE_FILENAME)) as reader:
+        # The reader decodes every frame onto the previous one, so frames
+        # waiting for ffmpeg are copies
+        pool = FrameBufferPool(reader.shape, reader.dtype, 3)
+
+        def copy_frames() -> Iterator[Tuple[int, np.ndarray]]:
+            for frame_number, frame in reader:
+                buffer = pool.acquire()
+                np.copyto(buffer, frame)
+                yield frame_number, buffer
+
+        return _encode_frame_file(
+            config_manager,
+            reader.metadata,
+            reader.shape,
+            reader.dtype,
+            copy_frames(),
+            on_frame_done=pool.release,
+        )
+
+
+def _encode_frame_file(
+    config_manager: ConfigManager,
+    metadata: Dict[str, Any],
+    shape: Tuple[int, ...],
+    dtype: np.dtype,
+    frames: Iterator[Tuple[int, np.ndarray]],
+    on_frame_done: Optional[Callable[[np.ndarray], None]] = None,
+) -> Tuple[str, int]:
+    """Pipe (frame number, frame) pairs of a finished render into ffmpeg"""
+    if dtype == np.float32:
+        raise ValueError("Linear float frames cannot be encoded by ffmpeg")
+    height, width = shape[:2]
+    encoder = FFmpegStreamEncoder(
+        config_manager.get_ffmpeg_stream_args(
+            metadata["preset"],
+            metadata["timestamp"],
+            {"width": width, "height": height, "fps": metadata["fps"]},
+            use_16bit=dtype == np.uint16,
+        ),
+        on_frame_done=on_frame_done,
+    )
+
+    encoder.start()
+    try:
+        for frame_number, frame in frames:
+            encoder.submit(frame_number, frame)
+        encoder.close()
+    except BaseException:
+        encoder.abort()
+        raise
+
+    video_file = config_manager.get_video_filename(
+        metadata["preset"], metadata["timestamp"]
+    )
+    return video_file, encoder.frames_written
+
+
 def main():
     """Main entry point"""
-    generator = CosmicSpiralGenerator()
+    parser = argparse.ArgumentParser(
+        description="Lux Spiral Cosmos - HDR cosmic spiral animation generator"
+    )
+    parser.add_argument("preset", nargs="?", help="Preset name to render")
+    parser.add_argument(
+        "--debug", action="store_true", help="Show detailed performance metrics"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Render frames in N parallel processes (0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        metavar="MB",
+        help="Fit workers, queued frames and kernel threads into this much RAM "
+        "(default: from the config)",
+    )
+    parser.add_argument(
+        "--cpu-budget",
+        type=int,
+        metavar="CORES",
+        help="Use at most this many cores (default: from the config, or all)",
+    )
+    parser.add_argument(
+        "--parallel-kernel",
+        action="store_true",
+        help="Shade each frame on all CPU cores with the multi-threaded kernel",
+    )
+    parser.add_argument(
+        "--lookup-tables",
+        action="store_true",
+        help="Shade with precomputed color phase and PQ lookup tables",
+    )
+    parser.add_argument(
+        "--compute-precision",
+        choices=list(COMPUTE_PRECISIONS),
+        help="Float type of the kernel math (default: from the config)",
+    )
+    parser.add_argument(
+        "--precision-drift",
+        action="store_true",
+        help="Report how far float32 rendering drifts from float64 and exit",
+    )
+    parser.add_argument(
+        "--lut-accuracy",
+        action="store_true",
+        help="Report the lookup-table error against the exact path and exit",
+    )
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Render all frames into one memory-mapped raw file (frames.raw)",
+    )
+    parser.add_argument(
+        "--encode-raw",
+        metavar="OUTPUT_DIR",
+        help="Encode the raw frame file of a finished render into a video",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Write frames to a keyframe/delta archive (frames.delta)",
+    )
+    parser.add_argument(
+        "--encode-delta",
+        metavar="OUTPUT_DIR",
+        help="Encode the frame archive of a finished delta render into a video",
+    )
+    parser.add_argument(
+        "--sparse",
+        action="store_true",
+        help="Produce frames as sparse point lists (.npz files, cheaper IPC)",
+    )
+    parser.add_argument(
+        "--accumulate",
+        action="store_true",
+        help="Sum every point per pixel (density) instead of keeping the last one",
+    )
+    parser.add_argument(
+        "--exposure",
+        type=float,
+        help="Scale of accumulated light before encoding (default: from the config)",
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="Render a fast low-resolution preview instead of the full animation",
+    )
+    parser.add_argument(
+        "--preview-scale",
+        type=float,
+        default=0.25,
+        help="Preview resolution relative to the preset (default: 0.25)",
+    )
+    parser.add_argument(
+        "--preview-seconds",
+        type=float,
+        default=0.5,
+        help="Target render seconds per preview frame (default: 0.5)",
+    )
+    parser.add_argument(
+        "--preview-budget",
+        type=float,
+        default=30.0,
+        help="Total preview time budget in seconds (default: 30)",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="OUTPUT_DIR",
+        help="Continue an interrupted render in OUTPUT_DIR from its manifest",
+    )
+    parser.add_argument(
+        "--telemetry",
+        metavar="JSONL_FILE",
+        help="Append per-frame stage timings and a summary to a JSON Lines file",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on this local port while rendering",
+    )
+    parser.add_argument(
+        "--live-port",
+        type=int,
+        help="Serve frames as an MJPEG stream on this port while rendering",
+    )
+    parser.add_argument(
+        "--live-host",
+        default="127.0.0.1",
+        help="Address the live frame server listens on (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--live-width",
+        type=int,
+        default=DEFAULT_LIVE_WIDTH,
+        help=f"Width of the live frames (default: {DEFAULT_LIVE_WIDTH})",
+    )
+    parser.add_argument(
+        "--precompile",
+        action="store_true",
+        help="Compile all kernel variants into the JIT cache and exit",
+    )
+    parser.add_argument(
+        "--jit-cache-dir",
+        metavar="DIR",
+        help="Directory for compiled kernels (also NUMBA_CACHE_DIR)",
+    )
+    parser.add_argument(
+        "--frame-cache",
+        metavar="DIR",
+        help="Cache frame geometry in DIR so color/HDR changes skip the math",
+    )
+    parser.add_argument(
+        "--frame-cache-mb",
+        type=float,
+        help="Size limit of the frame cache in MB (default: from the config)",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Validate the preset (or all presets) and exit",
+    )
+    parser.add_argument(
+        "--ffmpeg-command",
+        metavar="OUTPUT_DIR",
+        help="Print the ffmpeg command that encodes the frames in OUTPUT_DIR",
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="*",
+        metavar="PRESET",
+        help="Render several presets (default: the given one, or all) in one pool",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        metavar="FIELD=V1,V2",
+        help="Batch-render every value of a preset field, e.g. colors.speed=1,3,5",
+    )
+    parser.add_argument(
+        "--explore",
+        action="store_true",
+        help="Compare the --sweep candidates as thumbnails and statistics "
+        "instead of rendering each one",
+    )
+    parser.add_argument(
+        "--explore-frames",
+        type=lambda text: [int(frame) - 1 for frame in text.split(",")],
+        metavar="F1,F2",
+        help="Frame numbers (1-based) to compare (default: four spread evenly)",
+    )
+    parser.add_argument(
+        "--explore-scale",
+        type=float,
+        default=0.25,
+        help="Thumbnail resolution relative to the preset (default: 0.25)",
+    )
+    parser.add_argument(
+        "--explore-stats-only",
+        action="store_true",
+        help="Save only the candidate statistics, no thumbnails",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Pipe frames straight into ffmpeg instead of writing image files",
+    )
+    args = parser.parse_args()
 
-    if len(sys.argv) < 2:
-        generator.config_manager.list_presets()
-        generator.logger.info("")
-        generator.logger.info("Usage: python cosmic_generator.py <preset_name>")
-        generator.logger.info("       python cosmic_generator.py <preset_name> --debug")
-        generator.logger.info("Default: python cosmic_generator.py original_settings")
+    # Commands that only read the configuration run before the generator
+    # (and with it OpenCV, Numba and the kernels) is loaded
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logger = logging.getLogger(__name__)
+    try:
+        config_manager = ConfigManager()
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Error: {e}")
+        sys.exit(1)
+
+    if args.validate:
+        if not validate_presets(config_manager, args.preset):
+            sys.exit(1)
+        return
+
+    if args.ffmpeg_command is not None:
+        try:
+            print(
+                get_frames_ffmpeg_command(
+                    config_manager, args.ffmpeg_command, args.preset
+                )
+            )
+        except (FileNotFoundError, ValueError) as e:
+            logger.error(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    if args.encode_raw is not None or args.encode_delta is not None:
+        try:
+            if args.encode_raw is not None:
+                video_file, frames = encode_raw_frames(config_manager, args.encode_raw)
+            else:
+                video_file, frames = encode_delta_archive(
+                    config_manager, args.encode_delta
+                )
+        except (FileNotFoundError, ValueError, RuntimeError) as e:
+            logger.error(f"Error: {e}")
+            sys.exit(1)
+        logger.info(f"Encoded {frames} frames to: {video_file}")
         return
 
-    preset_name = sys.argv[1]
+    # A resumed render defaults to the preset recorded in its manifest
+    if args.preset is None and args.resume is not None:
+        try:
+            args.preset = RenderManifest.load(args.resume).preset_name
+        except (FileNotFoundError, ValueError) as e:
+            logger.error(f"Error: {e}")
+            return
+
+    batch_mode = args.batch is not None or args.sweep is not None
+    if args.preset is None and (args.explore or not (args.precompile or batch_mode)):
+        config_manager.list_presets()
+        logger.info("")
+        logger.info("Usage: python cosmic_generator.py <preset_name>")
+        logger.info("       python cosmic_generator.py <preset_name> --debug")
+        logger.info("       python cosmic_generator.py <preset_name> --workers <count>")
+        logger.info("       python cosmic_generator.py <preset_name> --stream")
+        logger.info("       python cosmic_generator.py --resume <output_dir>")
+        logger.info("       python cosmic_generator.py --validate")
+        logger.info(
+            "       python cosmic_generator.py <preset_name> --sweep colors.speed=1,3,5"
+        )
+        logger.info(
+            "       python cosmic_generator.py <preset_name> --explore "
+            "--sweep r_denominator=50,125,300"
+        )
+        logger.info("Default: python cosmic_generator.py original_settings")
+        return
+
+    generator = CosmicSpiralGenerator()
+    if args.jit_cache_dir is not None:
+        generator.jit_cache_dir = jit_cache.configure_jit_cache(args.jit_cache_dir)
+
+    if args.precompile:
+        try:
+            generator.precompile_kernels(args.preset)
+        except ValueError as e:
+            generator.logger.error(f"Error: {e}")
+        return
 
     # Enable debug logging if requested
-    if len(sys.argv) > 2 and sys.argv[2] == "--debug":
+    if args.debug:
         generator.set_debug_mode(True)
 
+    if args.memory_budget is not None:
+        generator.memory_budget_mb = args.memory_budget
+    if args.cpu_budget is not None:
+        generator.cpu_budget = args.cpu_budget
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    if args.parallel_kernel:
+        generator.use_parallel_kernel = True
+    if args.lookup_tables:
+        generator.use_lookup_tables = True
+    if args.sparse:
+        generator.sparse_frames = True
+    if args.raw:
+        generator.raw_frames = True
+    if args.delta:
+        generator.delta_frames = True
+    if args.accumulate:
+        generator.accumulate = True
+    if args.exposure is not None:
+        generator.accumulation_exposure = args.exposure
+    if args.compute_precision:
+        generator.compute_precision = args.compute_precision
+    if args.frame_cache is not None:
+        generator.configure_frame_cache(args.frame_cache, args.frame_cache_mb)
+    elif args.frame_cache_mb is not None and generator.frame_cache is not None:
+        generator.configure_frame_cache(
+            generator.frame_cache.cache_dir, args.frame_cache_mb
+        )
+
     try:
-        generator.generate_animation(preset_name)
+        if args.live_port is not None:
+            generator.live_server = LiveFrameServer(
+                args.live_port, args.live_host, args.live_width
+            )
+
+        if args.lut_accuracy:
+            generator.check_lookup_accuracy(args.preset)
+            return
+
+        if args.precision_drift:
+            generator.check_precision_drift(args.preset)
+            return
+
+        if args.preview:
+            generate_preview(
+                generator,
+                args.preset,
+                scale=args.preview_scale,
+                target_frame_seconds=args.preview_seconds,
+                time_budget=args.preview_budget,
+                stream=args.stream,
+            )
+            return
+
+        if args.explore:
+            explore_parameters(
+                generator,
+                args.preset,
+                [parse_sweep(spec) for spec in args.sweep or []],
+                frames=args.explore_frames,
+                scale=args.explore_scale,
+                write_thumbnails=not args.explore_stats_only,
+            )
+            return
+
+        if batch_mode:
+            preset_names = args.batch or (
+                [args.preset] if args.preset else config_manager.get_preset_names()
+            )
+            sweeps = [parse_sweep(spec) for spec in args.sweep or []]
+            jobs = expand_batch_jobs(generator.config_manager, preset_names, sweeps)
+            statuses = generate_batch(generator, jobs, workers)
+            if any(status != "complete" for status in statuses.values()):
+                sys.exit(1)
+            return
+
+        if args.telemetry is not None or args.metrics_port is not None:
+            generator.telemetry = RenderTelemetry(args.telemetry, args.metrics_port)
+        generator.generate_animation(
+            args.preset, workers=workers, stream=args.stream, resume_dir=args.resume
+        )
     except (FileNotFoundError, ValueError) as e:
         generator.logger.error(f"Error: {e}")
         generator.config_manager.list_presets()
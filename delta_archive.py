@@ -0,0 +1,383 @@
+"""
+Keyframe and delta archive of rendered frames
+"""
+
+import json
+import os
+import queue
+import threading
+import zlib
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+ARCHIVE_MAGIC = b"LUXDELTA"
+ARCHIVE_VERSION = 1
+
+# Written after the frame index when an archive is closed
+INDEX_MAGIC = b"LUXINDEX"
+
+_FILE_HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("height", "<u4"),
+        ("width", "<u4"),
+        ("channels", "<u4"),
+        ("dtype", "S8"),
+        ("metadata_bytes", "<u4"),
+    ]
+)
+
+_RECORD_HEADER = np.dtype(
+    [
+        ("kind", "S1"),
+        ("frame", "<i8"),
+        ("mask_bytes", "<u4"),
+        ("colors_bytes", "<u4"),
+    ]
+)
+
+_INDEX_ENTRY = np.dtype([("frame", "<i8"), ("offset", "<i8"), ("kind", "S1")])
+
+_TRAILER = np.dtype([("index_offset", "<i8"), ("magic", "S8")])
+
+# Record kinds: every lit pixel, or the pixels that changed since the
+# previous frame
+KEYFRAME = b"K"
+DELTA = b"D"
+
+
+def _pixel_mask(flat: np.ndarray, previous: Optional[np.ndarray] = None) -> np.ndarray:
+    """Get the lit pixels of flat, or those differing from previous
+
+    Channels are compared as unsigned integers of the same width (exact
+    bits, also for float frames); ORing them is much faster than any().
+    """
+    bits = flat.view(f"u{flat.dtype.itemsize}")
+    if previous is not None:
+        bits = bits ^ previous.view(bits.dtype)
+    combined = bits[:, 0].copy()
+    for channel in range(1, bits.shape[1]):
+        combined |= bits[:, channel]
+    return combined != 0
+
+
+def _split_bytes(colors: np.ndarray) -> np.ndarray:
+    """Store each byte of the channel values as its own plane
+
+    High bytes of 16-bit values repeat far more than low bytes, so the
+    planes compress much better than interleaved values.
+    """
+    row_bytes = colors.shape[1] * colors.dtype.itemsize
+    return np.ascontiguousarray(colors.view(np.uint8).reshape(len(colors), row_bytes).T)
+
+
+def _join_bytes(planes: bytes, dtype: np.dtype, channels: int) -> np.ndarray:
+    """Reverse _split_bytes"""
+    plane_count = channels * dtype.itemsize
+    data = np.frombuffer(planes, dtype=np.uint8)
+    data = data.reshape(plane_count, len(data) // plane_count)
+    return np.ascontiguousarray(data.T).view(dtype).reshape(-1, channels)
+
+
+class DeltaArchiveWriter:
+    """Writes frames to a keyframe/delta archive on a background thread
+
+    A keyframe stores the mask of lit pixels and their values; a delta
+    stores the mask of pixels that changed since the previous frame and
+    their new values. Masks are bit-packed and values split into byte
+    planes, both deflated. A keyframe is written every keyframe_interval
+    frames, so readers can seek, and whenever a delta would hold more
+    pixels than a keyframe (points that move every frame change more
+    pixels than are lit). Frames must be submitted in order; submit()
+    blocks while max_queued_frames are waiting. on_frame_done receives
+    each frame buffer once it has been encoded, and on_frame_written the
+    frame number and the bytes its record takes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        shape: Tuple[int, int, int],
+        dtype: np.dtype,
+        metadata: Optional[Dict[str, Any]] = None,
+        keyframe_interval: int = 24,
+        compression_level: int = 1,
+        max_queued_frames: int = 4,
+        on_frame_done: Optional[Callable[[np.ndarray], None]] = None,
+        on_frame_written: Optional[Callable[[int, int], None]] = None,
+    ):
+        if keyframe_interval < 1:
+            raise ValueError("Keyframe interval must be at least 1")
+
+        self.path = path
+        self.shape = shape
+        self.dtype = np.dtype(dtype)
+        self.metadata = metadata or {}
+        self.keyframe_interval = keyframe_interval
+        self.compression_level = compression_level
+        self.on_frame_done = on_frame_done
+        self.on_frame_written = on_frame_written
+
+        # Metrics
+        self.frames_written = 0
+        self.keyframes_written = 0
+        self.bytes_written = 0
+
+        self._file: Optional[BinaryIO] = None
+        self._index: List[Tuple[int, int, bytes]] = []
+        self._previous: Optional[np.ndarray] = None
+        self._since_keyframe = 0
+        self._queue: "queue.Queue[Optional[Tuple[int, np.ndarray]]]" = queue.Queue(
+            maxsize=max_queued_frames
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        """Create the archive file and start the encoder thread"""
+        if self._file is not None:
+            raise RuntimeError("Archive writer already started")
+
+        metadata_json = json.dumps(self.metadata).encode("utf-8")
+        header = np.zeros(1, dtype=_FILE_HEADER)
+        header[0] = (
+            ARCHIVE_MAGIC,
+            ARCHIVE_VERSION,
+            self.shape[0],
+            self.shape[1],
+            self.shape[2],
+            self.dtype.str.encode("ascii"),
+            len(metadata_json),
+        )
+        self._file = open(self.path, "wb")
+        self._file.write(header.tobytes() + metadata_json)
+        self._thread = threading.Thread(
+            target=self._write_frames, name="delta-archive-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _write_frames(self) -> None:
+        """Encode queued frames until the end marker"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            frame_number, img_array = item
+            # Keep draining after an error so submit() never blocks
+            if self._error is None:
+                try:
+                    self._write_frame(frame_number, img_array)
+                except Exception as e:
+                    self._error = e
+            if self.on_frame_done is not None:
+                self.on_frame_done(img_array)
+
+    def _write_frame(self, frame_number: int, img_array: np.ndarray) -> None:
+        """Append the keyframe or delta record of a frame"""
+        assert self._file is not None
+        flat = img_array.reshape(-1, self.shape[2])
+        lit = _pixel_mask(flat)
+        kind, mask = KEYFRAME, lit
+        if self._previous is not None and self._since_keyframe < self.keyframe_interval:
+            changed = _pixel_mask(flat, self._previous)
+            if np.count_nonzero(changed) < np.count_nonzero(lit):
+                kind, mask = DELTA, changed
+
+        packed_mask = zlib.compress(np.packbits(mask), self.compression_level)
+        colors = zlib.compress(_split_bytes(flat[mask]), self.compression_level)
+        header = np.zeros(1, dtype=_RECORD_HEADER)
+        header[0] = (kind, frame_number, len(packed_mask), len(colors))
+
+        offset = self._file.tell()
+        self._file.write(header.tobytes())
+        self._file.write(packed_mask)
+        self._file.write(colors)
+        self._index.append((frame_number, offset, kind))
+
+        # Deltas are taken against the frame as decoded, i.e. this frame
+        if self._previous is None:
+            self._previous = np.empty_like(flat)
+        np.copyto(self._previous, flat)
+        self._since_keyframe = 1 if kind == KEYFRAME else self._since_keyframe + 1
+
+        record_bytes = self._file.tell() - offset
+        self.frames_written += 1
+        self.keyframes_written += kind == KEYFRAME
+        self.bytes_written += record_bytes
+        if self.on_frame_written is not None:
+            self.on_frame_written(frame_number, record_bytes)
+
+    def submit(self, frame_number: int, img_array: np.ndarray) -> None:
+        """Queue a frame for the archive, blocking while the queue is full
+
+        Frames must be submitted in frame order.
+        """
+        if self._file is None:
+            raise RuntimeError("Archive writer not started")
+        if img_array.shape != self.shape or img_array.dtype != self.dtype:
+            raise ValueError("Frame does not match the archive")
+        self._raise_if_failed()
+        self._queue.put((frame_number, img_array))
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(
+                f"Writing {self.path} failed after {self.frames_written} frames: "
+                f"{self._error}"
+            ) from self._error
+
+    def close(self) -> None:
+        """Encode the queued frames, then write the frame index"""
+        if self._file is None:
+            return
+
+        self._queue.put(None)
+        assert self._thread is not None
+        self._thread.join()
+        try:
+            self._raise_if_failed()
+            index = np.array(self._index, dtype=_INDEX_ENTRY)
+            trailer = np.zeros(1, dtype=_TRAILER)
+            trailer[0] = (self._file.tell(), INDEX_MAGIC)
+            self._file.write(index.tobytes() + trailer.tobytes())
+        finally:
+            self._file.close()
+            self._file = None
+            self._previous = None
+
+    def abort(self) -> None:
+        """Stop writing; the archive stays readable up to its last record"""
+        if self._file is None:
+            return
+
+        self._error = self._error or RuntimeError("Archive writing aborted")
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+        self._file.close()
+        self._file = None
+        self._previous = None
+
+
+class DeltaArchiveReader:
+    """Reads the frames of a keyframe/delta archive
+
+    Iterating yields (frame number, frame) in order, decoding each record
+    onto the previous frame. The frame array is reused, so copy it to keep
+    it. read_frame() seeks to the nearest keyframe before a frame. An
+    archive whose render was interrupted has no index and is scanned
+    instead, up to its last complete record.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+
+        header = np.frombuffer(
+            self._file.read(_FILE_HEADER.itemsize), dtype=_FILE_HEADER
+        )
+        if len(header) != 1 or header[0]["magic"] != ARCHIVE_MAGIC:
+            self._file.close()
+            raise ValueError(f"Not a frame archive: {path}")
+        header = header[0]
+        if header["version"] != ARCHIVE_VERSION:
+            self._file.close()
+            raise ValueError(f"Unsupported frame archive version in {path}")
+
+        self.shape = (
+            int(header["height"]),
+            int(header["width"]),
+            int(header["channels"]),
+        )
+        self.dtype = np.dtype(header["dtype"].decode("ascii"))
+        self.metadata: Dict[str, Any] = json.loads(
+            self._file.read(int(header["metadata_bytes"])) or b"{}"
+        )
+        self._records_start = self._file.tell()
+        self.index = self._read_index()
+
+    @property
+    def num_frames(self) -> int:
+        """Number of frames in the archive"""
+        return len(self.index)
+
+    def _read_index(self) -> np.ndarray:
+        """Load the frame index, or rebuild it from the records"""
+        size = os.fstat(self._file.fileno()).st_size
+        if size >= self._records_start + _TRAILER.itemsize:
+            self._file.seek(size - _TRAILER.itemsize)
+            trailer = np.frombuffer(self._file.read(_TRAILER.itemsize), _TRAILER)[0]
+            index_offset = int(trailer["index_offset"])
+            if trailer["magic"] == INDEX_MAGIC and index_offset <= size:
+                self._file.seek(index_offset)
+                data = self._file.read(size - _TRAILER.itemsize - index_offset)
+                return np.frombuffer(data, dtype=_INDEX_ENTRY).copy()
+
+        entries = []
+        offset = self._records_start
+        while offset + _RECORD_HEADER.itemsize <= size:
+            self._file.seek(offset)
+            record = np.frombuffer(
+                self._file.read(_RECORD_HEADER.itemsize), _RECORD_HEADER
+            )[0]
+            end = (
+                offset
+                + _RECORD_HEADER.itemsize
+                + int(record["mask_bytes"])
+                + int(record["colors_bytes"])
+            )
+            if record["kind"] not in (KEYFRAME, DELTA) or end > size:
+                break
+            entries.append((int(record["frame"]), offset, record["kind"]))
+            offset = end
+        return np.array(entries, dtype=_INDEX_ENTRY)
+
+    def _apply_record(self, offset: int, frame: np.ndarray) -> int:
+        """Decode the record at offset onto frame; returns its frame number"""
+        self._file.seek(offset)
+        record = np.frombuffer(
+            self._file.read(_RECORD_HEADER.itemsize), _RECORD_HEADER
+        )[0]
+        packed_mask = zlib.decompress(self._file.read(int(record["mask_bytes"])))
+        colors = zlib.decompress(self._file.read(int(record["colors_bytes"])))
+
+        flat = frame.reshape(-1, self.shape[2])
+        mask = np.unpackbits(
+            np.frombuffer(packed_mask, dtype=np.uint8), count=len(flat)
+        ).view(bool)
+        if record["kind"] == KEYFRAME:
+            flat.fill(0)
+        flat[mask] = _join_bytes(colors, self.dtype, self.shape[2])
+        return int(record["frame"])
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        frame = np.zeros(self.shape, dtype=self.dtype)
+        for offset in self.index["offset"]:
+            yield self._apply_record(int(offset), frame), frame
+
+    def read_frame(
+        self, frame_number: int, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Decode one frame, starting from the keyframe before it"""
+        positions = np.flatnonzero(self.index["frame"] == frame_number)
+        if not len(positions):
+            raise KeyError(f"Frame {frame_number} not in {self.path}")
+        position = int(positions[0])
+        keyframes = np.flatnonzero(self.index["kind"][: position + 1] == KEYFRAME)
+        start = int(keyframes[-1]) if len(keyframes) else 0
+
+        frame = np.zeros(self.shape, dtype=self.dtype) if out is None else out
+        for offset in self.index["offset"][start : position + 1]:
+            self._apply_record(int(offset), frame)
+        return frame
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "DeltaArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,129 @@
+"""
+Streaming FFmpeg encoder for rendered frames
+"""
+
+import queue
+import subprocess
+import threading
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+
+class FFmpegStreamEncoder:
+    """Pipes raw BGR frames into an ffmpeg subprocess as they are rendered
+
+    Frames are handed to a background thread through a bounded queue, so
+    encoding overlaps with rendering. When the queue is full, submit()
+    blocks until ffmpeg has consumed a frame (backpressure). on_frame_done
+    receives each frame buffer once it has been written to ffmpeg.
+    """
+
+    def __init__(
+        self,
+        command: List[str],
+        max_queued_frames: int = 4,
+        on_frame_done: Optional[Callable[[np.ndarray], None]] = None,
+    ):
+        self.command = command
+        self.max_queued_frames = max_queued_frames
+        self.on_frame_done = on_frame_done
+        self.frames_written = 0
+        self.bytes_written = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, np.ndarray]]]" = (
+            queue.Queue(maxsize=max_queued_frames)
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        """Start the ffmpeg process and the stdin feeder thread"""
+        if self._process is not None:
+            raise RuntimeError("Encoder already started")
+
+        self._process = subprocess.Popen(self.command, stdin=subprocess.PIPE)
+        self._thread = threading.Thread(
+            target=self._feed, name="ffmpeg-feeder", daemon=True
+        )
+        self._thread.start()
+
+    def _feed(self) -> None:
+        """Write queued frames to ffmpeg stdin until the end marker"""
+        assert self._process is not None and self._process.stdin is not None
+        stdin = self._process.stdin
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            img_array, raw_frame = item
+            # Keep draining after an error so submit() never blocks on a dead encoder
+            if self._error is None:
+                try:
+                    stdin.write(raw_frame.data)
+                    self.frames_written += 1
+                    self.bytes_written += raw_frame.nbytes
+                except (BrokenPipeError, OSError) as e:
+                    self._error = e
+            if self.on_frame_done is not None:
+                self.on_frame_done(img_array)
+
+    def submit(self, frame_number: int, img_array: np.ndarray) -> None:
+        """Queue a frame for encoding, blocking while the queue is full
+
+        Frames must be submitted in frame order.
+        """
+        if self._process is None:
+            raise RuntimeError("Encoder not started")
+        self._raise_if_failed()
+
+        # Raw video is little-endian and tightly packed
+        raw_frame = np.ascontiguousarray(
+            img_array, dtype=img_array.dtype.newbyteorder("<")
+        )
+        self._queue.put((img_array, raw_frame))
+
+    def _raise_if_failed(self) -> None:
+        """Raise if ffmpeg has stopped accepting frames"""
+        if self._error is not None:
+            raise RuntimeError(
+                f"ffmpeg stopped accepting frames after {self.frames_written} frames: "
+                f"{self._error}"
+            ) from self._error
+
+    def close(self) -> None:
+        """Flush queued frames, finish encoding and check the ffmpeg result"""
+        if self._process is None:
+            return
+
+        self._queue.put(None)
+        assert self._thread is not None
+        self._thread.join()
+
+        assert self._process.stdin is not None
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError) as e:
+            if self._error is None:
+                self._error = e
+        returncode = self._process.wait()
+        self._process = None
+
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with status {returncode}")
+        self._raise_if_failed()
+
+    def abort(self) -> None:
+        """Stop ffmpeg without flushing queued frames"""
+        if self._process is None:
+            return
+
+        self._process.kill()
+        self._process.wait()
+        # Unblock the feeder thread
+        self._error = self._error or RuntimeError("Encoding aborted")
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+        self._process = None
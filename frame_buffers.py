@@ -0,0 +1,109 @@
+"""
+Reusable frame buffers for the rendering pipeline
+"""
+
+import resource
+import sys
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+
+def get_peak_rss_mb() -> float:
+    """Get the peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def get_rss_mb() -> float:
+    """Get the current resident set size of this process in MB
+
+    Falls back to the peak RSS where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return get_peak_rss_mb()
+    return resident_pages * resource.getpagesize() / (1024 * 1024)
+
+
+def get_process_private_mb(pid: int) -> Optional[float]:
+    """Get the resident memory of a process not shared with others, in MB
+
+    Shared libraries and shared-memory frames are left out, so the values
+    of related processes can be added up. None where /proc is not
+    available or the process has exited.
+    """
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            resident_pages, shared_pages = (int(v) for v in f.read().split()[1:3])
+    except (OSError, ValueError):
+        return None
+    return (resident_pages - shared_pages) * resource.getpagesize() / (1024 * 1024)
+
+
+class FrameBufferPool:
+    """Ring of preallocated frame buffers handed out for rendering
+
+    Kernels render into an acquired buffer (clearing it in place), and the
+    buffer is released back once the writer or encoder is done with it.
+    acquire() blocks while every buffer is in use, so the pool size also
+    bounds the number of frames held in memory.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype: np.dtype, size: int):
+        if size < 1:
+            raise ValueError("Frame buffer pool needs at least one buffer")
+
+        self.shape = shape
+        self.dtype = np.dtype(dtype)
+        self.size = size
+
+        # Metrics
+        self.allocations = 0
+        self.acquisitions = 0
+        self.wait_time = 0.0
+
+        self._free: List[np.ndarray] = []
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_buffers(cls, buffers: Sequence[np.ndarray]) -> "FrameBufferPool":
+        """Create a pool handing out existing buffers (e.g. shared memory)"""
+        pool = cls(buffers[0].shape, buffers[0].dtype, len(buffers))
+        pool._free = list(buffers)
+        pool.allocations = len(buffers)
+        return pool
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Size of one frame buffer in bytes"""
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def acquire(self) -> np.ndarray:
+        """Get a free buffer, allocating lazily up to the pool size"""
+        wait_start = time.time()
+        with self._condition:
+            while not self._free and self.allocations >= self.size:
+                self._condition.wait()
+
+            if self._free:
+                buffer = self._free.pop()
+            else:
+                buffer = np.empty(self.shape, dtype=self.dtype)
+                self.allocations += 1
+            self.acquisitions += 1
+
+        self.wait_time += time.time() - wait_start
+        return buffer
+
+    def release(self, buffer: np.ndarray) -> None:
+        """Return a buffer to the pool"""
+        with self._condition:
+            self._free.append(buffer)
+            self._condition.notify()
@@ -0,0 +1,187 @@
+"""
+Content-addressed on-disk cache of frame geometry
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+# Part of every key: bump when the geometry kernel or entry layout changes
+GEOMETRY_FORMAT_VERSION = 1
+
+ENTRY_SUFFIX = ".npz"
+
+
+class FrameGeometry(NamedTuple):
+    """Shading-independent result of one frame's recurrence
+
+    One entry per lit pixel, holding the last point drawn there (see
+    jit_core.compute_frame_geometry), plus the frame's point count and
+    the state it hands to the next frame.
+    """
+
+    pixel_index: np.ndarray
+    color_phase: np.ndarray
+    base_luminance: np.ndarray
+    is_core: np.ndarray
+    pixels_processed: int
+    end_state: Tuple[float, float, float]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the per-pixel arrays"""
+        return sum(array.nbytes for array in self[:4])
+
+
+class FrameGeometryCache:
+    """Frame geometry stored by a hash of everything it depends on
+
+    A key covers the geometry settings of the preset (frame size, the
+    mathematical and spiral pulse sections), the frame number and the exact
+    starting state, so color and HDR changes hit the cache while anything
+    that moves points misses it. Entries are .npz files written atomically,
+    so render processes can share a directory; the least recently used
+    ones are evicted once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        settings: Dict[str, Any],
+        frame_number: int,
+        state: Tuple[float, float, float],
+    ) -> str:
+        """Hash the geometry settings, frame number and starting state"""
+        payload = {
+            "version": GEOMETRY_FORMAT_VERSION,
+            "settings": settings,
+            "frame": frame_number,
+            # Exact bits of the state, not a rounded decimal
+            "state": [float(value).hex() for value in state],
+        }
+        encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+    def load(self, key: str) -> Optional[FrameGeometry]:
+        """Get a cached frame geometry, or None (and count a miss)"""
+        path = self._entry_path(key)
+        try:
+            with np.load(path) as entry:
+                geometry = FrameGeometry(
+                    entry["pixel_index"],
+                    entry["color_phase"],
+                    entry["base_luminance"],
+                    entry["is_core"],
+                    int(entry["pixels_processed"]),
+                    tuple(float(value) for value in entry["end_state"]),
+                )
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            # Truncated or foreign file: drop it and recompute
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        self._touch(path)
+        self.hits += 1
+        return geometry
+
+    def load_end_state(self, key: str) -> Optional[Tuple[float, float, float]]:
+        """Get only the state after a cached frame (reads no pixel arrays)"""
+        path = self._entry_path(key)
+        try:
+            with np.load(path) as entry:
+                end_state = tuple(float(value) for value in entry["end_state"])
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+        self._touch(path)
+        return end_state
+
+    def store(self, key: str, geometry: FrameGeometry) -> None:
+        """Add a frame geometry, then evict entries over the size limit"""
+        if geometry.nbytes > self.max_bytes:
+            return
+
+        file = tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".tmp", delete=False
+        )
+        try:
+            with file:
+                np.savez(
+                    file,
+                    pixel_index=geometry.pixel_index,
+                    color_phase=geometry.color_phase,
+                    base_luminance=geometry.base_luminance,
+                    is_core=geometry.is_core,
+                    pixels_processed=np.int64(geometry.pixels_processed),
+                    end_state=np.array(geometry.end_state, dtype=np.float64),
+                )
+            os.replace(file.name, self._entry_path(key))
+        except BaseException:
+            self._remove(file.name)
+            raise
+
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries over max_bytes; returns the count"""
+        entries = self._list_entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def size(self) -> int:
+        """Total bytes of the cached entries"""
+        return sum(size for _, size, _ in self._list_entries())
+
+    def _list_entries(self) -> List[Tuple[str, int, float]]:
+        """Get (path, size, last use time) of every entry"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Evicted by another process meanwhile
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        """Mark an entry as recently used (access times are often disabled)"""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,228 @@
+"""
+Memory-mapped frame store shared between render and encoder processes
+"""
+
+import json
+import mmap
+import os
+import tempfile
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+import numpy as np
+
+STORE_MAGIC = b"LUXFRAME"
+STORE_VERSION = 1
+
+# The file header and metadata JSON fill the first page, followed by the
+# slot header table and the page-aligned frame slots
+HEADER_BYTES = 4096
+
+_FILE_HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("num_slots", "<u4"),
+        ("height", "<u4"),
+        ("width", "<u4"),
+        ("channels", "<u4"),
+        ("dtype", "S8"),
+        ("metadata_bytes", "<u4"),
+    ]
+)
+
+_SLOT_HEADER = np.dtype(
+    [
+        ("status", "<i8"),
+        ("frame", "<i8"),
+        ("pixels_processed", "<i8"),
+        ("state", "<f8", (3,)),
+    ]
+)
+
+# Slot status values
+SLOT_EMPTY = 0
+SLOT_READY = 1
+
+
+class SlotHeader(NamedTuple):
+    """Frame number, point count and end state published with a slot"""
+
+    frame: int
+    pixels_processed: int
+    state: Tuple[float, float, float]
+
+
+def get_shared_memory_dir() -> str:
+    """Get a directory whose files live in memory when the OS offers one"""
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _align(offset: int) -> int:
+    return -(-offset // mmap.PAGESIZE) * mmap.PAGESIZE
+
+
+class FrameStore:
+    """Fixed-size frame slots in one memory-mapped file
+
+    Kernels render straight into slot arrays, and any process that maps
+    the same file sees the frames without copying or pickling them. Each
+    slot has a small header (status, frame number, points, end state)
+    written by publish() once the frame is complete. A store in shared
+    memory with a few slots is a ring for handing frames from render
+    workers to the encoder. A store with one slot per frame is a raw
+    frame file that can be encoded later by reading it sequentially.
+    Stores pickle by path, so worker processes map the same file.
+    """
+
+    def __init__(self, path: str, writable: bool = True):
+        """Map an existing store (see create() for new ones)"""
+        self.path = path
+        self.writable = writable
+
+        with open(path, "r+b" if writable else "rb") as f:
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self._mmap = mmap.mmap(f.fileno(), 0, access=access)
+
+        header = np.frombuffer(self._mmap, dtype=_FILE_HEADER, count=1)[0]
+        if header["magic"] != STORE_MAGIC:
+            raise ValueError(f"Not a frame store: {path}")
+        if header["version"] != STORE_VERSION:
+            raise ValueError(f"Unsupported frame store version in {path}")
+
+        self.num_slots = int(header["num_slots"])
+        self.shape = (
+            int(header["height"]),
+            int(header["width"]),
+            int(header["channels"]),
+        )
+        self.dtype = np.dtype(header["dtype"].decode("ascii"))
+        metadata_start = _FILE_HEADER.itemsize
+        metadata = self._mmap[
+            metadata_start : metadata_start + int(header["metadata_bytes"])
+        ]
+        self.metadata: Dict[str, Any] = json.loads(metadata or b"{}")
+
+        self._slots = np.ndarray(
+            (self.num_slots,),
+            dtype=_SLOT_HEADER,
+            buffer=self._mmap,
+            offset=HEADER_BYTES,
+        )
+        self._data_offset = _align(HEADER_BYTES + self._slots.nbytes)
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        num_slots: int,
+        shape: Tuple[int, int, int],
+        dtype: np.dtype,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> "FrameStore":
+        """Create (or replace) a store of num_slots empty frames
+
+        The file is sized up front; pages are only committed as frames are
+        written. metadata is a small JSON-compatible description.
+        """
+        if num_slots < 1:
+            raise ValueError("Frame store needs at least one slot")
+        dtype = np.dtype(dtype)
+        metadata_json = json.dumps(metadata or {}).encode("utf-8")
+        if _FILE_HEADER.itemsize + len(metadata_json) > HEADER_BYTES:
+            raise ValueError("Frame store metadata too large")
+
+        header = np.zeros(1, dtype=_FILE_HEADER)
+        header[0] = (
+            STORE_MAGIC,
+            STORE_VERSION,
+            num_slots,
+            shape[0],
+            shape[1],
+            shape[2],
+            dtype.str.encode("ascii"),
+            len(metadata_json),
+        )
+        frame_bytes = int(np.prod(shape)) * dtype.itemsize
+        data_offset = _align(HEADER_BYTES + num_slots * _SLOT_HEADER.itemsize)
+
+        with open(path, "wb") as f:
+            f.write(header.tobytes() + metadata_json)
+            # Slot headers start zeroed, i.e. SLOT_EMPTY
+            f.truncate(data_offset + num_slots * _align(frame_bytes))
+        return cls(path)
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str, bool]]:
+        return (FrameStore, (self.path, self.writable))
+
+    @property
+    def frame_bytes(self) -> int:
+        """Size of one frame in bytes"""
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def frame(self, slot: int) -> np.ndarray:
+        """Get the frame array of a slot, a view of the mapped file"""
+        if not 0 <= slot < self.num_slots:
+            raise IndexError(f"Frame store slot {slot} out of range")
+        return np.ndarray(
+            self.shape,
+            dtype=self.dtype,
+            buffer=self._mmap,
+            offset=self._data_offset + slot * _align(self.frame_bytes),
+        )
+
+    def slot_of(self, frame: np.ndarray) -> int:
+        """Get the slot a frame array returned by frame() belongs to"""
+        base = np.frombuffer(self._mmap, dtype=np.uint8, count=1).ctypes.data
+        offset = frame.ctypes.data - base - self._data_offset
+        slot, remainder = divmod(offset, _align(self.frame_bytes))
+        if remainder or not 0 <= slot < self.num_slots:
+            raise ValueError("Array is not a frame of this store")
+        return slot
+
+    def claim(self, slot: int) -> np.ndarray:
+        """Mark a slot empty before rendering into it; returns its frame"""
+        self._slots[slot]["status"] = SLOT_EMPTY
+        return self.frame(slot)
+
+    def publish(
+        self,
+        slot: int,
+        frame_number: int,
+        pixels_processed: int,
+        state: Tuple[float, float, float],
+    ) -> None:
+        """Record a slot's frame as complete (the status is written last)"""
+        entry = self._slots[slot]
+        entry["frame"] = frame_number
+        entry["pixels_processed"] = pixels_processed
+        entry["state"] = state
+        entry["status"] = SLOT_READY
+
+    def read_header(self, slot: int) -> Optional[SlotHeader]:
+        """Get the published header of a slot, or None while it is empty"""
+        entry = self._slots[slot]
+        if entry["status"] != SLOT_READY:
+            return None
+        x, u, v = (float(value) for value in entry["state"])
+        return SlotHeader(
+            int(entry["frame"]), int(entry["pixels_processed"]), (x, u, v)
+        )
+
+    def iter_frames(self) -> Iterator[Tuple[SlotHeader, np.ndarray]]:
+        """Yield the published frames in slot order, reading sequentially"""
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+        for slot in range(self.num_slots):
+            header = self.read_header(slot)
+            if header is not None:
+                yield header, self.frame(slot)
+
+    def close(self) -> None:
+        """Unmap the store (frame arrays still in use keep their pages mapped)"""
+        self._slots = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Views are still alive; the mapping goes away with them
+            pass
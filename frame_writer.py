@@ -0,0 +1,169 @@
+"""
+Asynchronous image file writer for rendered frames
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+from lazy_imports import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# TIFF compression tag values (libtiff), accepted by cv2.IMWRITE_TIFF_COMPRESSION
+TIFF_COMPRESSION_SCHEMES: Dict[str, int] = {
+    "none": 1,
+    "lzw": 5,
+    "deflate": 8,
+    "packbits": 32773,
+}
+
+
+def get_imwrite_params(
+    extension: str, compression: str = "lzw", png_compression_level: int = 1
+) -> List[int]:
+    """Build cv2.imwrite parameters for the frame file format"""
+    if extension == "tiff":
+        if compression not in TIFF_COMPRESSION_SCHEMES:
+            raise ValueError(
+                f"Unknown TIFF compression '{compression}' "
+                f"(expected one of: {', '.join(TIFF_COMPRESSION_SCHEMES)})"
+            )
+        return [cv2.IMWRITE_TIFF_COMPRESSION, TIFF_COMPRESSION_SCHEMES[compression]]
+
+    if not 0 <= png_compression_level <= 9:
+        raise ValueError("PNG compression level must be between 0 and 9")
+    return [cv2.IMWRITE_PNG_COMPRESSION, png_compression_level]
+
+
+class FrameWriterPipeline:
+    """Writes frames to image files on a pool of background threads
+
+    cv2.imwrite releases the GIL while encoding, so writer threads run
+    alongside the JIT kernel. At most max_in_flight frames are queued or
+    being written at once, which caps memory; submit() only blocks when
+    that limit is reached. The first write error is raised from submit()
+    or close(). on_frame_done receives each frame buffer once it has been
+    written, so it can be reused, and on_frame_written receives the frame
+    number and file name of each successfully written frame.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        extension: str,
+        imwrite_params: Optional[List[int]] = None,
+        num_threads: int = 2,
+        max_in_flight: int = 4,
+        on_frame_done: Optional[Callable[[np.ndarray], None]] = None,
+        on_frame_written: Optional[Callable[[int, str], None]] = None,
+    ):
+        if num_threads < 1:
+            raise ValueError("Writer pipeline needs at least one thread")
+        if max_in_flight < 1:
+            raise ValueError("Writer pipeline needs at least one in-flight frame")
+
+        self.output_dir = output_dir
+        self.extension = extension
+        self.imwrite_params = imwrite_params or []
+        self.num_threads = num_threads
+        self.max_in_flight = max_in_flight
+        self.on_frame_done = on_frame_done
+        self.on_frame_written = on_frame_written
+
+        # Metrics
+        self.frames_written = 0
+        self.wait_time = 0.0
+
+        self._queue: "queue.Queue[Optional[Tuple[int, np.ndarray]]]" = queue.Queue()
+        self._slots = threading.Semaphore(max_in_flight)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+
+    def get_filename(self, frame_number: int) -> str:
+        """Get the image file path for a frame"""
+        return f"{self.output_dir}/frame_{frame_number:04d}.{self.extension}"
+
+    def start(self) -> None:
+        """Start the writer threads"""
+        if self._threads:
+            raise RuntimeError("Writer pipeline already started")
+
+        for index in range(self.num_threads):
+            thread = threading.Thread(
+                target=self._write_frames, name=f"frame-writer-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _write_frames(self) -> None:
+        """Write queued frames until the end marker"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            frame_number, img_array = item
+            try:
+                if self._error is None:
+                    filename = self.get_filename(frame_number)
+                    if not cv2.imwrite(filename, img_array, self.imwrite_params):
+                        raise IOError(f"Failed to write {filename}")
+                    if self.on_frame_written is not None:
+                        self.on_frame_written(frame_number, filename)
+                    with self._lock:
+                        self.frames_written += 1
+            except Exception as e:
+                with self._lock:
+                    if self._error is None:
+                        self._error = e
+            finally:
+                if self.on_frame_done is not None:
+                    self.on_frame_done(img_array)
+                self._slots.release()
+
+    def submit(self, frame_number: int, img_array: np.ndarray) -> None:
+        """Queue a frame for writing, blocking while max_in_flight are pending
+
+        The pipeline takes ownership of img_array until it has been written.
+        """
+        if not self._threads:
+            raise RuntimeError("Writer pipeline not started")
+        self._raise_if_failed()
+
+        wait_start = time.time()
+        self._slots.acquire()
+        self.wait_time += time.time() - wait_start
+
+        self._queue.put((frame_number, img_array))
+
+    def _raise_if_failed(self) -> None:
+        """Raise the first error hit by a writer thread"""
+        if self._error is not None:
+            raise RuntimeError(f"Frame writer failed: {self._error}") from self._error
+
+    def close(self) -> None:
+        """Flush all pending frames, stop the threads and report errors"""
+        if not self._threads:
+            return
+
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        self._raise_if_failed()
+
+    def abort(self) -> None:
+        """Stop the threads, discarding frames that are not yet written"""
+        with self._lock:
+            if self._error is None:
+                self._error = RuntimeError("Writing aborted")
+        try:
+            self.close()
+        except RuntimeError:
+            pass
@@ -0,0 +1,360 @@
+"""
+Golden-output regression harness for the frame kernels
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from benchmarks import KERNELS, get_system_info, make_benchmark_preset
+from cosmic_generator import CosmicSpiralGenerator
+
+GOLDEN_VERSION = 1
+
+# Tiles per side of the frame signature; the perceptual hash has one bit
+# per tile
+TILE_GRID = 8
+
+# Tile statistics are stored as fractions of full scale in these units
+SIGNATURE_SCALE = 65535
+
+# Comparison outcomes, best first
+OUTCOMES = ("exact", "tolerance", "regression", "missing")
+
+# System details that change float results, and with them the exact hashes
+EXACT_SYSTEM_KEYS = ("python", "platform", "processor", "numpy", "numba")
+
+logger = logging.getLogger(__name__)
+
+
+def frame_signature(frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the per-tile channel means and lit-pixel fractions of a frame
+
+    Both are (TILE_GRID, TILE_GRID[, 3]) arrays of fractions of full scale.
+    """
+    if frame.dtype == np.float32:
+        normalized = frame.astype(np.float64)
+    else:
+        normalized = frame / np.iinfo(frame.dtype).max
+    lit = frame.any(axis=2)
+
+    height, width = frame.shape[:2]
+    rows = np.linspace(0, height, TILE_GRID + 1).astype(int)
+    columns = np.linspace(0, width, TILE_GRID + 1).astype(int)
+    means = np.zeros((TILE_GRID, TILE_GRID, 3))
+    coverage = np.zeros((TILE_GRID, TILE_GRID))
+    for ty in range(TILE_GRID):
+        for tx in range(TILE_GRID):
+            tile = (slice(rows[ty], rows[ty + 1]), slice(columns[tx], columns[tx + 1]))
+            if normalized[tile].size:
+                means[ty, tx] = normalized[tile].mean(axis=(0, 1))
+                coverage[ty, tx] = lit[tile].mean()
+    return means, coverage
+
+
+def perceptual_hash(means: np.ndarray) -> str:
+    """Hash tile brightness into TILE_GRID^2 bits (above the median or not)"""
+    brightness = means.mean(axis=2).ravel()
+    bits = brightness > np.median(brightness)
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):0{bits.size // 4}x}"
+
+
+def frame_digest(
+    frame: np.ndarray, pixels_processed: int, state: Tuple[float, float, float]
+) -> Dict[str, Any]:
+    """Get the exact hash, end state and perceptual signature of a frame"""
+    means, coverage = frame_signature(frame)
+    digest = hashlib.sha256(frame.tobytes())
+    digest.update(f"{frame.shape}{frame.dtype.str}".encode("ascii"))
+    return {
+        "sha256": digest.hexdigest(),
+        "pixels_processed": int(pixels_processed),
+        # Exact bits of the state handed to the next frame
+        "state": [float(value).hex() for value in state],
+        "phash": perceptual_hash(means),
+        "tile_means": np.rint(means * SIGNATURE_SCALE).astype(int).tolist(),
+        "tile_coverage": np.rint(coverage * SIGNATURE_SCALE).astype(int).tolist(),
+    }
+
+
+def compare_digests(
+    golden: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerance: float,
+    max_hash_distance: int,
+) -> Tuple[str, float, int]:
+    """Classify a frame against its golden digest
+
+    Returns the outcome ("exact", "tolerance" or "regression"), the largest
+    tile mean or coverage difference (fraction of full scale) and the
+    Hamming distance of the perceptual hashes.
+    """
+    if golden["sha256"] == current["sha256"] and golden["state"] == current["state"]:
+        return "exact", 0.0, 0
+
+    difference = max(
+        np.abs(np.subtract(golden[key], current[key])).max() / SIGNATURE_SCALE
+        for key in ("tile_means", "tile_coverage")
+    )
+    distance = bin(int(golden["phash"], 16) ^ int(current["phash"], 16)).count("1")
+    if difference <= tolerance and distance <= max_hash_distance:
+        return "tolerance", float(difference), distance
+    return "regression", float(difference), distance
+
+
+def render_digests(
+    generator: CosmicSpiralGenerator,
+    preset_name: str,
+    preset: Dict[str, Any],
+    kernel: str,
+    num_frames: int,
+) -> List[Dict[str, Any]]:
+    """Render the first frames of a preset with one kernel into digests"""
+    use_16bit, chunked, precision, accumulate = KERNELS[kernel]
+    generator.config_manager.config["presets"][preset_name] = preset
+    generator.config_manager.config["output"]["use_tiff_16bit"] = use_16bit
+    generator.load_preset(preset_name)
+    generator.use_parallel_kernel = chunked
+    generator.compute_precision = precision
+    generator.accumulate = accumulate
+
+    digests = []
+    state = (0.0, 0.0, 0.0)
+    for frame_number in range(num_frames):
+        frame, pixels_processed, *state = generator._compute_frame(frame_number, *state)
+        digests.append(frame_digest(frame, pixels_processed, tuple(state)))
+    return digests
+
+
+def render_golden_set(
+    config_file: str,
+    preset_names: Optional[List[str]],
+    kernels: Optional[List[str]],
+    scale: float,
+    num_frames: int,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Render digests of every preset and kernel, keyed "preset/kernel"
+
+    Presets are reduced with the benchmark scaling (n and the resolution
+    multiplied by scale), so the whole set renders in seconds.
+    """
+    generator = CosmicSpiralGenerator(config_file)
+    generator.logger.setLevel(logging.WARNING)
+    # Exact kernels only: no table-driven shading or cached geometry
+    generator.use_lookup_tables = False
+    generator.frame_cache = None
+
+    original_presets = copy.deepcopy(generator.config_manager.config["presets"])
+    for preset_name in preset_names or []:
+        if preset_name not in original_presets:
+            raise ValueError(f"Preset '{preset_name}' not found")
+    for kernel in kernels or []:
+        if kernel not in KERNELS:
+            raise ValueError(f"Unknown kernel '{kernel}'")
+
+    digests = {}
+    for preset_name in preset_names or list(original_presets):
+        preset = make_benchmark_preset(original_presets[preset_name], None, scale)
+        for kernel in kernels or list(KERNELS):
+            digests[f"{preset_name}/{kernel}"] = render_digests(
+                generator, preset_name, preset, kernel, num_frames
+            )
+    return digests
+
+
+def record_golden(
+    golden_file: str,
+    config_file: str,
+    preset_names: Optional[List[str]],
+    kernels: Optional[List[str]],
+    scale: float,
+    num_frames: int,
+) -> None:
+    """Render the reference digests and save them to golden_file"""
+    if not 0 < scale <= 1:
+        raise ValueError("Golden output scale must be in (0, 1]")
+    if num_frames < 1:
+        raise ValueError("Golden outputs need at least one frame")
+
+    start = time.perf_counter()
+    digests = render_golden_set(config_file, preset_names, kernels, scale, num_frames)
+    golden = {
+        "version": GOLDEN_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "system": get_system_info(),
+        "settings": {"scale": scale, "frames": num_frames, "tile_grid": TILE_GRID},
+        "digests": digests,
+    }
+    with open(golden_file, "w") as f:
+        json.dump(golden, f, separators=(",", ":"))
+
+    logger.info(
+        f"Recorded {len(digests)} preset/kernel pairs x {num_frames} frames "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    logger.info(f"Golden outputs saved to: {golden_file}")
+
+
+def check_golden(
+    golden_file: str,
+    config_file: str,
+    preset_names: Optional[List[str]],
+    kernels: Optional[List[str]],
+    tolerance: float,
+    max_hash_distance: int,
+) -> Dict[str, int]:
+    """Render with the current build and compare against golden_file
+
+    Uses the scale and frame count the golden outputs were recorded with,
+    and logs the worst outcome of each preset/kernel pair. Exact hashes
+    only match on the system the outputs were recorded on; elsewhere they
+    are informational and the tolerance tier decides. Returns the number
+    of frames per outcome.
+    """
+    with open(golden_file, "r") as f:
+        golden = json.load(f)
+    if golden.get("version") != GOLDEN_VERSION:
+        raise ValueError(f"Unsupported golden output version in {golden_file}")
+    settings = golden["settings"]
+    if settings["tile_grid"] != TILE_GRID:
+        raise ValueError(f"Golden outputs in {golden_file} use another tile grid")
+
+    system = get_system_info()
+    changed = [
+        key
+        for key in EXACT_SYSTEM_KEYS
+        if golden.get("system", {}).get(key) != system[key]
+    ]
+    if changed:
+        logger.info(
+            f"Golden outputs were recorded with another {', '.join(changed)}: "
+            f"exact matches are informational, the tolerance tier decides"
+        )
+        logger.info("")
+
+    start = time.perf_counter()
+    current = render_golden_set(
+        config_file, preset_names, kernels, settings["scale"], settings["frames"]
+    )
+
+    counts = {outcome: 0 for outcome in OUTCOMES}
+    for key, digests in current.items():
+        reference = golden["digests"].get(key)
+        if reference is None:
+            counts["missing"] += len(digests)
+            logger.info(f"{key:36} missing from the golden outputs")
+            continue
+
+        results = [
+            compare_digests(expected, digest, tolerance, max_hash_distance)
+            for expected, digest in zip(reference, digests)
+        ]
+        for outcome, _, _ in results:
+            counts[outcome] += 1
+        worst = max(results, key=lambda result: OUTCOMES.index(result[0]))
+        logger.info(
+            f"{key:36} {worst[0]:10} max tile difference {worst[1]:.4f}, "
+            f"hash distance {worst[2]}"
+        )
+
+    logger.info("")
+    logger.info(
+        f"Checked {sum(counts.values())} frames in "
+        f"{time.perf_counter() - start:.1f}s: "
+        + ", ".join(f"{count} {outcome}" for outcome, count in counts.items())
+    )
+    return counts
+
+
+def main():
+    """Golden-output harness entry point"""
+    parser = argparse.ArgumentParser(
+        description="Lux Spiral Cosmos - golden-output regression harness"
+    )
+    parser.add_argument(
+        "command",
+        choices=["record", "check"],
+        help="Record reference digests, or check the current build against them",
+    )
+    parser.add_argument(
+        "--golden",
+        default="golden_outputs.json",
+        help="Golden digest file (default: golden_outputs.json)",
+    )
+    parser.add_argument(
+        "--config", default="config_presets.json", help="Preset configuration file"
+    )
+    parser.add_argument("--presets", nargs="+", help="Presets to render (default: all)")
+    parser.add_argument(
+        "--kernels",
+        nargs="+",
+        choices=list(KERNELS),
+        help="Kernels to render (default: all)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=0.1,
+        help="Scale of n and the resolution when recording (default: 0.1)",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=3,
+        help="Frames per preset and kernel when recording (default: 3)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.01,
+        help="Largest tile mean/coverage difference that is not a regression, "
+        "as a fraction of full scale (default: 0.01)",
+    )
+    parser.add_argument(
+        "--max-hash-distance",
+        type=int,
+        default=4,
+        help="Largest perceptual hash distance that is not a regression (default: 4)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    config_file = os.path.abspath(args.config)
+    try:
+        if args.command == "record":
+            record_golden(
+                args.golden,
+                config_file,
+                args.presets,
+                args.kernels,
+                args.scale,
+                args.frames,
+            )
+            return
+
+        counts = check_golden(
+            args.golden,
+            config_file,
+            args.presets,
+            args.kernels,
+            args.tolerance,
+            args.max_hash_distance,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Error: {e}")
+        sys.exit(1)
+
+    if counts["regression"] or counts["missing"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
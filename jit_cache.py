@@ -0,0 +1,55 @@
+"""
+Location and statistics of the on-disk Numba kernel cache
+"""
+
+import os
+from typing import List, Optional, Tuple
+import numba
+from numba.core.dispatcher import Dispatcher
+
+import jit_core
+
+
+def get_jit_kernels() -> List[Dispatcher]:
+    """Get the JIT-compiled functions of jit_core"""
+    return [value for value in vars(jit_core).values() if isinstance(value, Dispatcher)]
+
+
+def configure_jit_cache(cache_dir: Optional[str]) -> str:
+    """Store compiled kernels in cache_dir instead of next to jit_core.py
+
+    Has the same effect as setting NUMBA_CACHE_DIR before start-up: the
+    kernels already imported switch to the new location, and the variable
+    is exported so spawned worker processes use it too. A cache built with
+    the precompile command can be shipped in a read-only image this way.
+    Returns the cache directory in use.
+    """
+    if cache_dir is not None:
+        cache_dir = os.path.abspath(cache_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+        os.environ["NUMBA_CACHE_DIR"] = cache_dir
+        numba.config.CACHE_DIR = cache_dir
+        for kernel in get_jit_kernels():
+            kernel.enable_caching()
+
+    return get_jit_cache_dir()
+
+
+def get_jit_cache_dir() -> str:
+    """Get the directory compiled kernels are cached in"""
+    return numba.config.CACHE_DIR or os.path.join(
+        os.path.dirname(os.path.abspath(jit_core.__file__)), "__pycache__"
+    )
+
+
+def get_jit_cache_stats() -> Tuple[int, int]:
+    """Get the (cache hits, cache misses) of all kernels in this process
+
+    A miss means a kernel signature had to be compiled.
+    """
+    hits = misses = 0
+    for kernel in get_jit_kernels():
+        stats = kernel.stats
+        hits += sum(stats.cache_hits.values())
+        misses += sum(stats.cache_misses.values())
+    return hits, misses
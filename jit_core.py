@@ -2,14 +2,222 @@
 JIT-compiled mathematical core for cosmic spiral generation
 """
 
-from math import pi, sin, cos, pow
-from typing import Tuple
+from math import pi, sin, cos, pow, frexp
+from typing import Optional, Tuple
 import numpy as np
-from numba import jit
+from numba import jit, prange
+from numba.core import types
+from numba.core.errors import TypingError
+from numba.extending import overload
+
+# Helpers specialized at compile time on their argument types. Each has a
+# plain Python body doing the same, and an overload picking the JIT variant.
+
+
+def _as_real(value, like):
+    """Convert value to the compute precision, the float type of like"""
+    return type(like)(value)
+
+
+@overload(_as_real)
+def _as_real_overload(value, like):
+    if like == types.float32:
+        return lambda value, like: np.float32(value)
+    return lambda value, like: np.float64(value)
+
+
+def _empty_real(shape, like):
+    """Allocate an array of the compute precision, the float type of like"""
+    return np.empty(shape, dtype=type(like))
+
+
+@overload(_empty_real)
+def _empty_real_overload(shape, like):
+    if like == types.float32:
+        return lambda shape, like: np.empty(shape, dtype=np.float32)
+    return lambda shape, like: np.empty(shape, dtype=np.float64)
+
+
+def _encode_channel(value, max_nits, pq_table, out):
+    """Encode a linear channel value in the format of the out buffer
+
+    pq_table (16-bit only) is a build_pq_table lookup table; None or an
+    empty table selects the exact pow() PQ curve.
+    """
+    if out.dtype == np.uint8:
+        return int(value * 255)
+    if out.dtype == np.uint16:
+        normalized = min(1.0, value * max_nits / 10000)
+        if pq_table is not None and pq_table.shape[0] > 0:
+            return int(_pq_lookup(normalized, pq_table))
+        return int(pow(normalized, 0.159) * 65535)
+    if out.dtype == np.float32:
+        return np.float32(value)
+    raise TypeError(f"Unsupported frame buffer type {out.dtype}")
+
+
+@overload(_encode_channel)
+def _encode_channel_overload(value, max_nits, pq_table, out):
+    if out.dtype == types.uint8:
+        # 8-bit standard range
+        return lambda value, max_nits, pq_table, out: int(value * 255)
+    if out.dtype == types.uint16:
+        # 16-bit with simplified PQ curve
+        if isinstance(pq_table, types.NoneType):
+
+            def encode_pq(value, max_nits, pq_table, out):
+                normalized = min(1.0, value * max_nits / 10000)
+                return int(pow(normalized, 0.159) * 65535)
+
+            return encode_pq
+
+        def encode_pq_table(value, max_nits, pq_table, out):
+            normalized = min(1.0, value * max_nits / 10000)
+            if pq_table.shape[0] > 0:
+                return int(_pq_lookup(normalized, pq_table))
+            return int(pow(normalized, 0.159) * 65535)
+
+        return encode_pq_table
+    if out.dtype == types.float32:
+        # Linear light for compositing (1.0 = max_nits)
+        return lambda value, max_nits, pq_table, out: np.float32(value)
+    raise TypingError(f"Unsupported frame buffer type {out.dtype}")
+
+
+def _clip_light(value, out):
+    """Clip linear light to the range the out buffer can encode"""
+    if out.dtype == np.uint8:
+        return min(value, 1.0)
+    return value
+
+
+@overload(_clip_light)
+def _clip_light_overload(value, out):
+    if out.dtype == types.uint8:
+        # 8-bit standard range ends at 1.0
+        return lambda value, out: min(value, 1.0)
+    # The PQ curve clips at 10000 nits; linear light is not clipped
+    return lambda value, out: value
+
+
+# Recurrence and shading shared by every kernel. The helpers are inlined
+# into the kernels and run in the precision of their float arguments, so
+# each kernel keeps exactly the arithmetic of the original serial kernels.
+
+
+@jit(nopython=True, inline="always")
+def _phase_color(
+    phase: int,
+    frame_phase: float,
+    red_base: float,
+    red_variation: float,
+    green_base: float,
+    green_variation: float,
+    blue_base: float,
+    blue_variation: float,
+    hdr_saturation: float,
+) -> Tuple[float, float, float]:
+    """Rec. 2020 RGB color of color phase i + j (frame_phase: frame * speed)"""
+
+    # Constants, in the compute precision
+    pi_val = 3.141592653589793
+    zero = _as_real(0.0, red_base)
+    one = _as_real(1.0, red_base)
+
+    # Color calculation
+    color_phase = (_as_real(phase, red_base) + frame_phase) * _as_real(0.01, red_base)
+
+    r_hdr = red_base + red_variation * sin(color_phase)
+    g_hdr = green_base + green_variation * sin(
+        color_phase + _as_real(pi_val / 3, red_base)
+    )
+    b_hdr = blue_base + blue_variation * sin(
+        color_phase + _as_real(2 * pi_val / 3, red_base)
+    )
+
+    # Clamp and apply saturation
+    r_hdr = max(zero, min(one, r_hdr * hdr_saturation))
+    g_hdr = max(zero, min(one, g_hdr * hdr_saturation))
+    b_hdr = max(zero, min(one, b_hdr * hdr_saturation))
+
+    # Simple Rec. 2020 conversion (inlined for JIT)
+    return (
+        min(one, r_hdr * _as_real(1.2, red_base)),
+        min(one, g_hdr * _as_real(1.15, red_base)),
+        min(one, b_hdr * _as_real(1.1, red_base)),
+    )
+
+
+@jit(nopython=True, inline="always")
+def _advance_state(
+    fi: float, r: float, t: float, x: float, v: float, spiral_size_multiplier: float
+) -> Tuple[float, float, float]:
+    """One step of the x/u/v recurrence in row fi (i in the compute precision)"""
+
+    # Core mathematical system
+    u_raw = sin(fi + v) + sin(r * fi + x)
+    v_raw = cos(fi + v) + cos(r * fi + x)
+
+    # Apply spiral size multiplier
+    return (
+        u_raw + t,
+        u_raw * spiral_size_multiplier,
+        v_raw * spiral_size_multiplier,
+    )
+
+
+@jit(nopython=True, inline="always")
+def _point_geometry(i: int, j: int, u: float, v: float, x: float) -> Tuple[float, bool]:
+    """Base luminance of a point and whether it lies in a bright core"""
+
+    # HDR luminance calculation (simplified for JIT)
+    luminance_freq = _as_real(0.05, u)
+    base_luminance = abs(sin(_as_real(i, u) * luminance_freq + v)) * abs(
+        cos(_as_real(j, u) * luminance_freq + u)
+    )
+    return base_luminance, abs(u) + abs(v) + abs(x) > _as_real(2.0, u)
+
+
+@jit(nopython=True, inline="always")
+def _point_luminance(
+    base_luminance: float, is_core: bool, hdr_boost: float, cosmic_core_boost: float
+) -> float:
+    """HDR luminance of a point from its geometry"""
+    if is_core:
+        # Blazing bright cores
+        return min(
+            _as_real(1.0, base_luminance),
+            base_luminance * cosmic_core_boost * hdr_boost,
+        )
+
+    # Regular space luminance
+    return base_luminance * hdr_boost * _as_real(0.3, base_luminance)
+
+
+@jit(nopython=True, inline="always")
+def _shade_point(
+    red: float,
+    green: float,
+    blue: float,
+    base_luminance: float,
+    is_core: bool,
+    hdr_boost: float,
+    cosmic_core_boost: float,
+    max_nits: float,
+    pq_table: Optional[np.ndarray],
+    out: np.ndarray,
+):
+    """Shade a point into (B, G, R) channel values in the format of out"""
+    luminance = _point_luminance(base_luminance, is_core, hdr_boost, cosmic_core_boost)
+    return (
+        _encode_channel(blue * luminance, max_nits, pq_table, out),
+        _encode_channel(green * luminance, max_nits, pq_table, out),
+        _encode_channel(red * luminance, max_nits, pq_table, out),
+    )
 
 
 @jit(nopython=True, cache=True)
-def compute_mathematical_system_16bit(
+def compute_mathematical_system(
     n: int,
     r: float,
     t: float,
@@ -21,7 +229,7 @@ def compute_mathematical_system_16bit(
     scale_factor: float,
     spiral_size_multiplier: float,
     frame_number: int,
-    color_speed: int,
+    color_speed: float,
     red_base: float,
     red_variation: float,
     green_base: float,
@@ -29,92 +237,146 @@ def compute_mathematical_system_16bit(
     blue_base: float,
     blue_variation: float,
     hdr_saturation: float,
-    max_nits: int,
+    max_nits: float,
     hdr_boost: float,
     cosmic_core_boost: float,
+    out: np.ndarray,
+    sample_step: int = 1,
 ) -> Tuple[np.ndarray, int, float, float, float]:
-    """JIT-compiled mathematical system computation for 16-bit HDR output"""
+    """JIT-compiled mathematical system computation for any output depth
 
-    # Initialize 16-bit output array
-    img_array = np.zeros((height, width, 3), dtype=np.uint16)
-    max_value = 65535
+    Specialized at compile time on the out buffer, cleared in place:
+    uint8 (8-bit), uint16 (16-bit PQ) or float32 (linear light). The
+    math runs in the precision of r (float64 or float32; pass every float
+    argument in that type), and the returned state has that type too.
+    A sample_step above 1 visits every sample_step-th i and j only (previews).
+    """
+    if out.shape[0] != height or out.shape[1] != width or out.shape[2] != 3:
+        raise ValueError("Output buffer shape does not match frame size")
+    img_array = out
+    img_array[:] = 0
 
     # Mathematical state
-    x, u, v = initial_x, initial_u, initial_v
+    x = _as_real(initial_x, r)
+    u = _as_real(initial_u, r)
+    v = _as_real(initial_v, r)
     pixels_processed = 0
 
-    # Constants
-    pi_val = 3.141592653589793
-
-    for i in range(n):
-        for j in range(n):
-            # Core mathematical system
-            u_raw = sin(i + v) + sin(r * i + x)
-            v_raw = cos(i + v) + cos(r * i + x)
-            x = u_raw + t
+    # Constants, in the compute precision
+    half_width = _as_real(width // 2, r)
+    half_height = _as_real(height // 2, r)
+    frame_phase = _as_real(frame_number, r) * color_speed
 
-            # Apply spiral size multiplier
-            u = u_raw * spiral_size_multiplier
-            v = v_raw * spiral_size_multiplier
+    for i in range(0, n, sample_step):
+        fi = _as_real(i, r)
+        for j in range(0, n, sample_step):
+            x, u, v = _advance_state(fi, r, t, x, v, spiral_size_multiplier)
 
             # Screen coordinates
-            px = int(width // 2 + scale_factor * u)
-            py = int(height // 2 + scale_factor * v)
+            px = int(half_width + scale_factor * u)
+            py = int(half_height + scale_factor * v)
 
             if 0 <= px < width and 0 <= py < height:
                 pixels_processed += 1
 
-                # Color calculation
-                color_phase = (i + j + frame_number * color_speed) * 0.01
-
-                r_hdr = red_base + red_variation * sin(color_phase)
-                g_hdr = green_base + green_variation * sin(color_phase + pi_val / 3)
-                b_hdr = blue_base + blue_variation * sin(color_phase + 2 * pi_val / 3)
-
-                # Clamp and apply saturation
-                r_hdr = max(0.0, min(1.0, r_hdr * hdr_saturation))
-                g_hdr = max(0.0, min(1.0, g_hdr * hdr_saturation))
-                b_hdr = max(0.0, min(1.0, b_hdr * hdr_saturation))
-
-                # Simple Rec. 2020 conversion (inlined for JIT)
-                r_2020 = min(1.0, r_hdr * 1.2)
-                g_2020 = min(1.0, g_hdr * 1.15)
-                b_2020 = min(1.0, b_hdr * 1.1)
-
-                # HDR luminance calculation (simplified for JIT)
-                base_luminance = abs(sin(i * 0.05 + v)) * abs(cos(j * 0.05 + u))
-                core_intensity = abs(u) + abs(v) + abs(x)
-
-                if core_intensity > 2.0:
-                    # Blazing bright cores
-                    luminance = min(1.0, base_luminance * cosmic_core_boost * hdr_boost)
-                else:
-                    # Regular space luminance
-                    luminance = base_luminance * hdr_boost * 0.3
-
-                # Apply luminance to colors
-                r_final = r_2020 * luminance
-                g_final = g_2020 * luminance
-                b_final = b_2020 * luminance
-
-                # Convert to 16-bit format with simplified PQ curve
-                normalized_r = min(1.0, r_final * max_nits / 10000)
-                normalized_g = min(1.0, g_final * max_nits / 10000)
-                normalized_b = min(1.0, b_final * max_nits / 10000)
-
-                # Simplified PQ approximation
-                r_col = int(pow(normalized_r, 0.159) * max_value)
-                g_col = int(pow(normalized_g, 0.159) * max_value)
-                b_col = int(pow(normalized_b, 0.159) * max_value)
+                red, green, blue = _phase_color(
+                    i + j,
+                    frame_phase,
+                    red_base,
+                    red_variation,
+                    green_base,
+                    green_variation,
+                    blue_base,
+                    blue_variation,
+                    hdr_saturation,
+                )
+                base_luminance, is_core = _point_geometry(i, j, u, v, x)
 
                 # Set pixel (BGR for OpenCV)
-                img_array[py, px, 0] = b_col
-                img_array[py, px, 1] = g_col
-                img_array[py, px, 2] = r_col
+                (
+                    img_array[py, px, 0],
+                    img_array[py, px, 1],
+                    img_array[py, px, 2],
+                ) = _shade_point(
+                    red,
+                    green,
+                    blue,
+                    base_luminance,
+                    is_core,
+                    hdr_boost,
+                    cosmic_core_boost,
+                    max_nits,
+                    None,
+                    out,
+                )
 
     return img_array, pixels_processed, x, u, v
 
 
+@jit(nopython=True, cache=True)
+def compute_mathematical_system_16bit(
+    n: int,
+    r: float,
+    t: float,
+    initial_x: float,
+    initial_u: float,
+    initial_v: float,
+    width: int,
+    height: int,
+    scale_factor: float,
+    spiral_size_multiplier: float,
+    frame_number: int,
+    color_speed: float,
+    red_base: float,
+    red_variation: float,
+    green_base: float,
+    green_variation: float,
+    blue_base: float,
+    blue_variation: float,
+    hdr_saturation: float,
+    max_nits: float,
+    hdr_boost: float,
+    cosmic_core_boost: float,
+    out: Optional[np.ndarray] = None,
+    sample_step: int = 1,
+) -> Tuple[np.ndarray, int, float, float, float]:
+    """JIT-compiled mathematical system computation for 16-bit HDR output
+
+    Pass out to render into a reusable (height, width, 3) uint16 buffer.
+    A sample_step above 1 visits every sample_step-th i and j only (previews).
+    """
+    if out is None:
+        img_array = np.zeros((height, width, 3), dtype=np.uint16)
+    else:
+        img_array = out
+    return compute_mathematical_system(
+        n,
+        r,
+        t,
+        initial_x,
+        initial_u,
+        initial_v,
+        width,
+        height,
+        scale_factor,
+        spiral_size_multiplier,
+        frame_number,
+        color_speed,
+        red_base,
+        red_variation,
+        green_base,
+        green_variation,
+        blue_base,
+        blue_variation,
+        hdr_saturation,
+        max_nits,
+        hdr_boost,
+        cosmic_core_boost,
+        img_array,
+        sample_step,
+    )
+
+
 @jit(nopython=True, cache=True)
 def compute_mathematical_system_8bit(
     n: int,
@@ -128,7 +390,7 @@ def compute_mathematical_system_8bit(
     scale_factor: float,
     spiral_size_multiplier: float,
     frame_number: int,
-    color_speed: int,
+    color_speed: float,
     red_base: float,
     red_variation: float,
     green_base: float,
@@ -138,30 +400,744 @@ def compute_mathematical_system_8bit(
     hdr_saturation: float,
     hdr_boost: float,
     cosmic_core_boost: float,
+    out: Optional[np.ndarray] = None,
+    sample_step: int = 1,
 ) -> Tuple[np.ndarray, int, float, float, float]:
-    """JIT-compiled mathematical system computation for 8-bit standard output"""
+    """JIT-compiled mathematical system computation for 8-bit standard output
+
+    Pass out to render into a reusable (height, width, 3) uint8 buffer.
+    A sample_step above 1 visits every sample_step-th i and j only (previews).
+    """
+    if out is None:
+        img_array = np.zeros((height, width, 3), dtype=np.uint8)
+    else:
+        img_array = out
+    return compute_mathematical_system(
+        n,
+        r,
+        t,
+        initial_x,
+        initial_u,
+        initial_v,
+        width,
+        height,
+        scale_factor,
+        spiral_size_multiplier,
+        frame_number,
+        color_speed,
+        red_base,
+        red_variation,
+        green_base,
+        green_variation,
+        blue_base,
+        blue_variation,
+        hdr_saturation,
+        1.0,
+        hdr_boost,
+        cosmic_core_boost,
+        img_array,
+        sample_step,
+    )
+
+
+@jit(nopython=True, cache=True)
+def compute_state_trajectory(
+    n: int,
+    r: float,
+    t: float,
+    initial_x: float,
+    initial_u: float,
+    initial_v: float,
+    spiral_size_multiplier: float,
+) -> Tuple[float, float, float]:
+    """JIT-compiled state-only pass of the mathematical system.
 
-    # Initialize 8-bit output array
-    img_array = np.zeros((height, width, 3), dtype=np.uint8)
-    max_value = 255
+    Runs exactly the x/u/v recurrence of the rendering kernels without any
+    color, luminance or pixel work, so the returned state is bit-identical
+    to the state a full render of the same frame would hand to the next one.
+    Like the rendering kernels, it runs in the precision of r.
+    """
 
     # Mathematical state
-    x, u, v = initial_x, initial_u, initial_v
+    x = _as_real(initial_x, r)
+    u = _as_real(initial_u, r)
+    v = _as_real(initial_v, r)
+
+    for i in range(n):
+        fi = _as_real(i, r)
+        for j in range(n):
+            x, u, v = _advance_state(fi, r, t, x, v, spiral_size_multiplier)
+
+    return x, u, v
+
+
+# Points traced per chunk by the parallel kernels (bounds scratch memory)
+PARALLEL_CHUNK_POINTS = 1 << 18
+
+# PQ lookup table layout: one row per power-of-two range of the input,
+# linearly interpolated over the mantissa. Inputs below 2^-PQ_TABLE_ROWS
+# encode to code value 0 on the 16-bit scale.
+PQ_TABLE_ROWS = 112
+PQ_TABLE_MANTISSA_STEPS = 256
+
+
+def build_pq_table(
+    rows: int = PQ_TABLE_ROWS, mantissa_steps: int = PQ_TABLE_MANTISSA_STEPS
+) -> np.ndarray:
+    """Build the lookup table for the simplified 16-bit PQ curve
+
+    Row k covers inputs in [2^-k / 2, 2^-k) (row 0 holds only 1.0), with
+    mantissa_steps + 1 samples of pow(normalized, 0.159) * 65535 each.
+    """
+    mantissa = 0.5 + 0.5 * np.arange(mantissa_steps + 1) / mantissa_steps
+    scale = np.power(2.0, 1 - np.arange(rows, dtype=np.float64))
+    return np.power(np.outer(scale, mantissa), 0.159) * 65535
+
+
+@jit(nopython=True, cache=True)
+def _pq_lookup(normalized: float, pq_table: np.ndarray) -> float:
+    """Simplified PQ curve scaled to 16-bit, from the lookup table"""
+    if normalized <= 0.0:
+        return 0.0
+
+    mantissa, exponent = frexp(normalized)
+    row = 1 - exponent
+    if row >= pq_table.shape[0]:
+        return 0.0
+
+    position = (mantissa - 0.5) * 2.0 * (pq_table.shape[1] - 1)
+    k = min(int(position), pq_table.shape[1] - 2)
+    fraction = position - k
+    return pq_table[row, k] + fraction * (pq_table[row, k + 1] - pq_table[row, k])
+
+
+@jit(nopython=True, cache=True)
+def build_color_phase_table(
+    n: int,
+    frame_number: int,
+    color_speed: float,
+    red_base: float,
+    red_variation: float,
+    green_base: float,
+    green_variation: float,
+    blue_base: float,
+    blue_variation: float,
+    hdr_saturation: float,
+) -> np.ndarray:
+    """Precompute the Rec. 2020 RGB color of every i + j phase for a frame
+
+    The color phase only depends on the integer i + j, so the 2n - 1
+    entries reproduce the per-point color math of the kernels exactly.
+    The table is computed and stored in the precision of the color
+    arguments (float64 or float32).
+    """
+    table = _empty_real((max(1, 2 * n - 1), 3), red_base)
+    frame_phase = _as_real(frame_number, red_base) * color_speed
+
+    for k in range(table.shape[0]):
+        table[k, 0], table[k, 1], table[k, 2] = _phase_color(
+            k,
+            frame_phase,
+            red_base,
+            red_variation,
+            green_base,
+            green_variation,
+            blue_base,
+            blue_variation,
+            hdr_saturation,
+        )
+
+    return table
+
+
+@jit(nopython=True, cache=True)
+def _trace_point_chunk(
+    n: int,
+    r: float,
+    t: float,
+    i_start: int,
+    i_stop: int,
+    x: float,
+    u: float,
+    v: float,
+    width: int,
+    height: int,
+    scale_factor: float,
+    spiral_size_multiplier: float,
+    pixel_index: np.ndarray,
+    u_points: np.ndarray,
+    v_points: np.ndarray,
+    x_points: np.ndarray,
+) -> Tuple[float, float, float]:
+    """Run the serial recurrence for rows i_start..i_stop and record each point
+
+    pixel_index receives py * width + px, or -1 for points off screen. The
+    point buffers hold the compute precision of r, like the state.
+    """
+    half_width = _as_real(width // 2, r)
+    half_height = _as_real(height // 2, r)
+
+    k = 0
+    for i in range(i_start, i_stop):
+        fi = _as_real(i, r)
+        for j in range(n):
+            x, u, v = _advance_state(fi, r, t, x, v, spiral_size_multiplier)
+
+            # Screen coordinates
+            px = int(half_width + scale_factor * u)
+            py = int(half_height + scale_factor * v)
+
+            if 0 <= px < width and 0 <= py < height:
+                pixel_index[k] = py * width + px
+            else:
+                pixel_index[k] = -1
+            u_points[k] = u
+            v_points[k] = v
+            x_points[k] = x
+            k += 1
+
+    return x, u, v
+
+
+@jit(nopython=True, cache=True, parallel=True)
+def _shade_point_chunk(
+    n: int,
+    i_start: int,
+    count: int,
+    pixel_index: np.ndarray,
+    u_points: np.ndarray,
+    v_points: np.ndarray,
+    x_points: np.ndarray,
+    colors: np.ndarray,
+    phase_table: np.ndarray,
+    pq_table: Optional[np.ndarray],
+    max_nits: float,
+    hdr_boost: float,
+    cosmic_core_boost: float,
+) -> None:
+    """Shade traced points across threads into BGR colors
+
+    Colors are encoded in the format of the colors array (uint8, uint16 PQ
+    or float32 linear); pq_table is as for _encode_channel. Points, the
+    phase table and the HDR settings share one compute precision.
+    """
+    for k in prange(count):
+        if pixel_index[k] < 0:
+            continue
+
+        i = i_start + k // n
+        j = k % n
+        base_luminance, is_core = _point_geometry(
+            i, j, u_points[k], v_points[k], x_points[k]
+        )
+        colors[k, 0], colors[k, 1], colors[k, 2] = _shade_point(
+            phase_table[i + j, 0],
+            phase_table[i + j, 1],
+            phase_table[i + j, 2],
+            base_luminance,
+            is_core,
+            hdr_boost,
+            cosmic_core_boost,
+            max_nits,
+            pq_table,
+            colors,
+        )
+
+
+@jit(nopython=True, cache=True)
+def _scatter_point_chunk(
+    img_array: np.ndarray, count: int, pixel_index: np.ndarray, colors: np.ndarray
+) -> int:
+    """Write shaded points in trace order so the last write to a pixel wins"""
+    width = img_array.shape[1]
     pixels_processed = 0
 
-    # Constants
-    pi_val = 3.141592653589793
+    for k in range(count):
+        index = pixel_index[k]
+        if index >= 0:
+            pixels_processed += 1
+            py = index // width
+            px = index % width
+            img_array[py, px, 0] = colors[k, 0]
+            img_array[py, px, 1] = colors[k, 1]
+            img_array[py, px, 2] = colors[k, 2]
+
+    return pixels_processed
+
+
+@jit(nopython=True, cache=True)
+def compute_mathematical_system_parallel(
+    n: int,
+    r: float,
+    t: float,
+    initial_x: float,
+    initial_u: float,
+    initial_v: float,
+    width: int,
+    height: int,
+    scale_factor: float,
+    spiral_size_multiplier: float,
+    phase_table: np.ndarray,
+    pq_table: np.ndarray,
+    max_nits: float,
+    hdr_boost: float,
+    cosmic_core_boost: float,
+    out: np.ndarray,
+) -> Tuple[np.ndarray, int, float, float, float]:
+    """Multi-threaded, table-driven variant of compute_mathematical_system
+
+    The n x n loop is split into chunks of rows. Each chunk runs the serial
+    x/u/v recurrence, shades its points across threads with prange and then
+    scatters them in order, so the last write to a pixel still wins.
+    Specialized on the out buffer (cleared in place) and the compute
+    precision of r like the serial kernel; pass every float argument and
+    the phase table in that type. Point colors come from
+    build_color_phase_table; with an empty pq_table the output is identical
+    to the serial kernel, with build_pq_table the 16-bit PQ curve is
+    interpolated from the table instead of calling pow().
+    """
+    if out.shape[0] != height or out.shape[1] != width or out.shape[2] != 3:
+        raise ValueError("Output buffer shape does not match frame size")
+    img_array = out
+    img_array[:] = 0
+
+    # Chunk scratch buffers
+    rows_per_chunk = max(1, PARALLEL_CHUNK_POINTS // max(1, n))
+    chunk_size = rows_per_chunk * n
+    pixel_index = np.empty(chunk_size, dtype=np.int64)
+    u_points = _empty_real(chunk_size, r)
+    v_points = _empty_real(chunk_size, r)
+    x_points = _empty_real(chunk_size, r)
+    colors = np.empty((chunk_size, 3), dtype=out.dtype)
+
+    # Mathematical state
+    x = _as_real(initial_x, r)
+    u = _as_real(initial_u, r)
+    v = _as_real(initial_v, r)
+    pixels_processed = 0
+
+    for i_start in range(0, n, rows_per_chunk):
+        i_stop = min(n, i_start + rows_per_chunk)
+        count = (i_stop - i_start) * n
+
+        x, u, v = _trace_point_chunk(
+            n,
+            r,
+            t,
+            i_start,
+            i_stop,
+            x,
+            u,
+            v,
+            width,
+            height,
+            scale_factor,
+            spiral_size_multiplier,
+            pixel_index,
+            u_points,
+            v_points,
+            x_points,
+        )
+        _shade_point_chunk(
+            n,
+            i_start,
+            count,
+            pixel_index,
+            u_points,
+            v_points,
+            x_points,
+            colors,
+            phase_table,
+            pq_table,
+            max_nits,
+            hdr_boost,
+            cosmic_core_boost,
+        )
+        pixels_processed += _scatter_point_chunk(img_array, count, pixel_index, colors)
+
+    return img_array, pixels_processed, x, u, v
+
+
+@jit(nopython=True, cache=True)
+def _append_visible_points(
+    count: int,
+    pixel_index: np.ndarray,
+    colors: np.ndarray,
+    point_index: np.ndarray,
+    point_colors: np.ndarray,
+    num_points: int,
+) -> int:
+    """Append the on-screen points of a chunk in trace order"""
+    for k in range(count):
+        index = pixel_index[k]
+        if index >= 0:
+            point_index[num_points] = index
+            point_colors[num_points, 0] = colors[k, 0]
+            point_colors[num_points, 1] = colors[k, 1]
+            point_colors[num_points, 2] = colors[k, 2]
+            num_points += 1
+    return num_points
+
+
+@jit(nopython=True, cache=True)
+def _keep_last_writes(
+    point_index: np.ndarray, point_colors: np.ndarray, num_points: int, num_pixels: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Deduplicate points so only the last write to each pixel remains
+
+    Scans backwards with a one-bit-per-pixel seen mask, so no dense frame
+    is needed. Surviving points are returned in trace order.
+    """
+    seen = np.zeros((num_pixels + 7) // 8, dtype=np.uint8)
+    keep = np.zeros(num_points, dtype=np.bool_)
+    num_kept = 0
+
+    for k in range(num_points - 1, -1, -1):
+        index = point_index[k]
+        mask = np.uint8(1 << (index & 7))
+        if not seen[index >> 3] & mask:
+            seen[index >> 3] |= mask
+            keep[k] = True
+            num_kept += 1
+
+    sparse_index = np.empty(num_kept, dtype=np.int32)
+    sparse_colors = np.empty((num_kept, 3), dtype=point_colors.dtype)
+    slot = 0
+    for k in range(num_points):
+        if keep[k]:
+            sparse_index[slot] = point_index[k]
+            sparse_colors[slot, 0] = point_colors[k, 0]
+            sparse_colors[slot, 1] = point_colors[k, 1]
+            sparse_colors[slot, 2] = point_colors[k, 2]
+            slot += 1
+
+    return sparse_index, sparse_colors
+
+
+@jit(nopython=True, cache=True)
+def compute_sparse_frame(
+    n: int,
+    r: float,
+    t: float,
+    initial_x: float,
+    initial_u: float,
+    initial_v: float,
+    width: int,
+    height: int,
+    scale_factor: float,
+    spiral_size_multiplier: float,
+    phase_table: np.ndarray,
+    pq_table: np.ndarray,
+    max_nits: float,
+    hdr_boost: float,
+    cosmic_core_boost: float,
+    color_dtype: np.dtype,
+) -> Tuple[np.ndarray, np.ndarray, int, float, float, float]:
+    """Sparse variant of compute_mathematical_system_parallel
+
+    Returns the frame as packed pixel indices (py * width + px, int32) and
+    their BGR colors, encoded as color_dtype (uint8 or uint16 PQ) like a
+    dense frame of that type, one entry per distinct pixel holding its last
+    write, instead of a dense image.
+    """
+
+    # Chunk scratch buffers
+    rows_per_chunk = max(1, PARALLEL_CHUNK_POINTS // max(1, n))
+    chunk_size = rows_per_chunk * n
+    pixel_index = np.empty(chunk_size, dtype=np.int64)
+    u_points = _empty_real(chunk_size, r)
+    v_points = _empty_real(chunk_size, r)
+    x_points = _empty_real(chunk_size, r)
+    colors = np.empty((chunk_size, 3), dtype=color_dtype)
+
+    # Sized for every point landing on screen; pages that are never written
+    # are never committed, so low-coverage frames stay small
+    point_index = np.empty(n * n, dtype=np.int32)
+    point_colors = np.empty((n * n, 3), dtype=color_dtype)
+    num_points = 0
+
+    # Mathematical state
+    x = _as_real(initial_x, r)
+    u = _as_real(initial_u, r)
+    v = _as_real(initial_v, r)
+
+    for i_start in range(0, n, rows_per_chunk):
+        i_stop = min(n, i_start + rows_per_chunk)
+        count = (i_stop - i_start) * n
+
+        x, u, v = _trace_point_chunk(
+            n,
+            r,
+            t,
+            i_start,
+            i_stop,
+            x,
+            u,
+            v,
+            width,
+            height,
+            scale_factor,
+            spiral_size_multiplier,
+            pixel_index,
+            u_points,
+            v_points,
+            x_points,
+        )
+        _shade_point_chunk(
+            n,
+            i_start,
+            count,
+            pixel_index,
+            u_points,
+            v_points,
+            x_points,
+            colors,
+            phase_table,
+            pq_table,
+            max_nits,
+            hdr_boost,
+            cosmic_core_boost,
+        )
+        num_points = _append_visible_points(
+            count, pixel_index, colors, point_index, point_colors, num_points
+        )
+
+    sparse_index, sparse_colors = _keep_last_writes(
+        point_index, point_colors, num_points, width * height
+    )
+    return sparse_index, sparse_colors, num_points, x, u, v
+
+
+# Frame rows per band of the accumulation kernel: threads take whole bands,
+# so no two threads ever add to the same pixel
+ACCUMULATION_BAND_ROWS = 8
+
+
+@jit(nopython=True, cache=True)
+def _bin_points_by_band(
+    count: int,
+    pixel_index: np.ndarray,
+    width: int,
+    band_starts: np.ndarray,
+    band_fill: np.ndarray,
+    band_points: np.ndarray,
+) -> None:
+    """Counting-sort the on-screen points of a chunk by frame band
+
+    Afterwards band_points[band_starts[b]:band_starts[b + 1]] holds the
+    point numbers of band b in trace order.
+    """
+    band_starts[:] = 0
+    for k in range(count):
+        if pixel_index[k] >= 0:
+            band_starts[pixel_index[k] // width // ACCUMULATION_BAND_ROWS + 1] += 1
+    for band in range(1, band_starts.shape[0]):
+        band_starts[band] += band_starts[band - 1]
+
+    band_fill[:] = band_starts[:-1]
+    for k in range(count):
+        if pixel_index[k] >= 0:
+            band = pixel_index[k] // width // ACCUMULATION_BAND_ROWS
+            band_points[band_fill[band]] = k
+            band_fill[band] += 1
+
+
+@jit(nopython=True, cache=True, parallel=True)
+def _accumulate_point_chunk(
+    n: int,
+    i_start: int,
+    pixel_index: np.ndarray,
+    u_points: np.ndarray,
+    v_points: np.ndarray,
+    x_points: np.ndarray,
+    phase_table: np.ndarray,
+    hdr_boost: float,
+    cosmic_core_boost: float,
+    band_starts: np.ndarray,
+    band_points: np.ndarray,
+    accum: np.ndarray,
+) -> None:
+    """Add the linear colors of binned points to the accumulation buffer
+
+    Each thread takes whole bands, and within a pixel the points add up in
+    trace order, so the sums do not depend on the number of threads.
+    """
+    width = accum.shape[1]
+
+    for band in prange(band_starts.shape[0] - 1):
+        for p in range(band_starts[band], band_starts[band + 1]):
+            k = band_points[p]
+            i = i_start + k // n
+            j = k % n
+            base_luminance, is_core = _point_geometry(
+                i, j, u_points[k], v_points[k], x_points[k]
+            )
+            luminance = _point_luminance(
+                base_luminance, is_core, hdr_boost, cosmic_core_boost
+            )
+
+            # Linear color contribution (BGR for OpenCV)
+            py = pixel_index[k] // width
+            px = pixel_index[k] % width
+            accum[py, px, 0] += phase_table[i + j, 2] * luminance
+            accum[py, px, 1] += phase_table[i + j, 1] * luminance
+            accum[py, px, 2] += phase_table[i + j, 0] * luminance
+
+
+@jit(nopython=True, cache=True)
+def compute_accumulation_frame(
+    n: int,
+    r: float,
+    t: float,
+    initial_x: float,
+    initial_u: float,
+    initial_v: float,
+    width: int,
+    height: int,
+    scale_factor: float,
+    spiral_size_multiplier: float,
+    phase_table: np.ndarray,
+    hdr_boost: float,
+    cosmic_core_boost: float,
+    accum: np.ndarray,
+) -> Tuple[np.ndarray, int, float, float, float]:
+    """Density variant of the chunked kernels: sum every point per pixel
+
+    Instead of keeping the last point landing on a pixel, the linear BGR
+    color of every point is added into accum, a (height, width, 3) float32
+    buffer (cleared in place). Chunks are traced serially, then their
+    points are binned by band of ACCUMULATION_BAND_ROWS frame rows and
+    accumulated band by band across threads, without write races. Map the
+    result to a frame with tone_map_accumulation.
+    """
+    if accum.shape[0] != height or accum.shape[1] != width or accum.shape[2] != 3:
+        raise ValueError("Accumulation buffer shape does not match frame size")
+    accum[:] = 0
+
+    # Chunk scratch buffers
+    rows_per_chunk = max(1, PARALLEL_CHUNK_POINTS // max(1, n))
+    chunk_size = rows_per_chunk * n
+    pixel_index = np.empty(chunk_size, dtype=np.int64)
+    u_points = np.empty(chunk_size, dtype=np.float64)
+    v_points = np.empty(chunk_size, dtype=np.float64)
+    x_points = np.empty(chunk_size, dtype=np.float64)
+    num_bands = (height + ACCUMULATION_BAND_ROWS - 1) // ACCUMULATION_BAND_ROWS
+    band_starts = np.empty(num_bands + 1, dtype=np.int64)
+    band_fill = np.empty(num_bands, dtype=np.int64)
+    band_points = np.empty(chunk_size, dtype=np.int64)
+
+    # Mathematical state
+    x = _as_real(initial_x, r)
+    u = _as_real(initial_u, r)
+    v = _as_real(initial_v, r)
+    pixels_processed = 0
+
+    for i_start in range(0, n, rows_per_chunk):
+        i_stop = min(n, i_start + rows_per_chunk)
+        count = (i_stop - i_start) * n
+
+        x, u, v = _trace_point_chunk(
+            n,
+            r,
+            t,
+            i_start,
+            i_stop,
+            x,
+            u,
+            v,
+            width,
+            height,
+            scale_factor,
+            spiral_size_multiplier,
+            pixel_index,
+            u_points,
+            v_points,
+            x_points,
+        )
+        _bin_points_by_band(
+            count, pixel_index, width, band_starts, band_fill, band_points
+        )
+        pixels_processed += band_starts[num_bands]
+        _accumulate_point_chunk(
+            n,
+            i_start,
+            pixel_index,
+            u_points,
+            v_points,
+            x_points,
+            phase_table,
+            hdr_boost,
+            cosmic_core_boost,
+            band_starts,
+            band_points,
+            accum,
+        )
+
+    return accum, pixels_processed, x, u, v
+
+
+@jit(nopython=True, cache=True, parallel=True)
+def tone_map_accumulation(
+    accum: np.ndarray, exposure: float, max_nits: float, out: np.ndarray
+) -> np.ndarray:
+    """Encode accumulated linear light into a frame buffer
+
+    Sums are scaled by exposure, clipped to the range of the frame format
+    and encoded like single points: 8-bit clips at 1.0, 16-bit PQ at 10000
+    nits (so dense pixels can use the headroom above max_nits), float32
+    stays linear. out is overwritten.
+    """
+    if out.shape[0] != accum.shape[0] or out.shape[1] != accum.shape[1]:
+        raise ValueError("Output buffer shape does not match frame size")
+
+    for py in prange(accum.shape[0]):
+        for px in range(accum.shape[1]):
+            for channel in range(3):
+                out[py, px, channel] = _encode_channel(
+                    _clip_light(accum[py, px, channel] * exposure, out),
+                    max_nits,
+                    None,
+                    out,
+                )
+    return out
+
+
+@jit(nopython=True, cache=True)
+def compute_frame_geometry(
+    n: int,
+    r: float,
+    t: float,
+    initial_x: float,
+    initial_u: float,
+    initial_v: float,
+    width: int,
+    height: int,
+    scale_factor: float,
+    spiral_size_multiplier: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int, float, float, float]:
+    """Trace a frame into the shading-independent geometry of its pixels
+
+    Runs the serial recurrence and keeps, for each pixel, the last point
+    landing on it (the one the dense kernels leave on screen): its packed
+    pixel index (py * width + px, int32), color phase i + j (int32), base
+    luminance (float64) and whether its core intensity exceeds 2 (bool).
+    Entries are ordered by pixel index. shade_frame_geometry turns them
+    into the frame of any color and HDR settings, without the recurrence.
+    """
+    # Last point landing on each pixel (phase -1: none)
+    num_pixels = width * height
+    pixel_phase = np.full(num_pixels, -1, dtype=np.int32)
+    pixel_luminance = np.empty(num_pixels, dtype=np.float64)
+    pixel_core = np.empty(num_pixels, dtype=np.bool_)
+
+    # Mathematical state
+    x, u, v = initial_x, initial_u, initial_v
+    pixels_processed = 0
 
     for i in range(n):
+        fi = _as_real(i, r)
         for j in range(n):
-            # Core mathematical system
-            u_raw = sin(i + v) + sin(r * i + x)
-            v_raw = cos(i + v) + cos(r * i + x)
-            x = u_raw + t
-
-            # Apply spiral size multiplier
-            u = u_raw * spiral_size_multiplier
-            v = v_raw * spiral_size_multiplier
+            x, u, v = _advance_state(fi, r, t, x, v, spiral_size_multiplier)
 
             # Screen coordinates
             px = int(width // 2 + scale_factor * u)
@@ -169,48 +1145,218 @@ def compute_mathematical_system_8bit(
 
             if 0 <= px < width and 0 <= py < height:
                 pixels_processed += 1
+                index = py * width + px
+                pixel_phase[index] = i + j
 
-                # Color calculation
-                color_phase = (i + j + frame_number * color_speed) * 0.01
+                pixel_luminance[index], pixel_core[index] = _point_geometry(
+                    i, j, u, v, x
+                )
 
-                r_hdr = red_base + red_variation * sin(color_phase)
-                g_hdr = green_base + green_variation * sin(color_phase + pi_val / 3)
-                b_hdr = blue_base + blue_variation * sin(color_phase + 2 * pi_val / 3)
+    num_lit = 0
+    for index in range(num_pixels):
+        if pixel_phase[index] >= 0:
+            num_lit += 1
 
-                # Clamp and apply saturation
-                r_hdr = max(0.0, min(1.0, r_hdr * hdr_saturation))
-                g_hdr = max(0.0, min(1.0, g_hdr * hdr_saturation))
-                b_hdr = max(0.0, min(1.0, b_hdr * hdr_saturation))
+    pixel_index = np.empty(num_lit, dtype=np.int32)
+    color_phase = np.empty(num_lit, dtype=np.int32)
+    base_luminance = np.empty(num_lit, dtype=np.float64)
+    is_core = np.empty(num_lit, dtype=np.bool_)
+    slot = 0
+    for index in range(num_pixels):
+        if pixel_phase[index] >= 0:
+            pixel_index[slot] = index
+            color_phase[slot] = pixel_phase[index]
+            base_luminance[slot] = pixel_luminance[index]
+            is_core[slot] = pixel_core[index]
+            slot += 1
 
-                # Simple Rec. 2020 conversion (inlined for JIT)
-                r_2020 = min(1.0, r_hdr * 1.2)
-                g_2020 = min(1.0, g_hdr * 1.15)
-                b_2020 = min(1.0, b_hdr * 1.1)
+    return pixel_index, color_phase, base_luminance, is_core, pixels_processed, x, u, v
 
-                # HDR luminance calculation (simplified for JIT)
-                base_luminance = abs(sin(i * 0.05 + v)) * abs(cos(j * 0.05 + u))
-                core_intensity = abs(u) + abs(v) + abs(x)
 
-                if core_intensity > 2.0:
-                    # Blazing bright cores
-                    luminance = min(1.0, base_luminance * cosmic_core_boost * hdr_boost)
-                else:
-                    # Regular space luminance
-                    luminance = base_luminance * hdr_boost * 0.3
+@jit(nopython=True, cache=True, parallel=True)
+def shade_frame_geometry(
+    pixel_index: np.ndarray,
+    color_phase: np.ndarray,
+    base_luminance: np.ndarray,
+    is_core: np.ndarray,
+    phase_table: np.ndarray,
+    max_nits: float,
+    hdr_boost: float,
+    cosmic_core_boost: float,
+    out: np.ndarray,
+) -> np.ndarray:
+    """Shade frame geometry into the out buffer (cleared in place)
 
-                # Apply luminance to colors
-                r_final = r_2020 * luminance
-                g_final = g_2020 * luminance
-                b_final = b_2020 * luminance
+    Pixels are distinct, so they are shaded across threads; the result is
+    the frame compute_mathematical_system draws with the same settings, in
+    the format of out (uint8, uint16 PQ or float32 linear).
+    """
+    out[:] = 0
+    width = out.shape[1]
 
-                # Convert to 8-bit format
-                r_col = int(r_final * max_value)
-                g_col = int(g_final * max_value)
-                b_col = int(b_final * max_value)
+    for k in prange(pixel_index.shape[0]):
+        # Set pixel (BGR for OpenCV)
+        py = pixel_index[k] // width
+        px = pixel_index[k] % width
+        phase = color_phase[k]
+        out[py, px, 0], out[py, px, 1], out[py, px, 2] = _shade_point(
+            phase_table[phase, 0],
+            phase_table[phase, 1],
+            phase_table[phase, 2],
+            base_luminance[k],
+            is_core[k],
+            hdr_boost,
+            cosmic_core_boost,
+            max_nits,
+            None,
+            out,
+        )
+    return out
 
-                # Set pixel (BGR for OpenCV)
-                img_array[py, px, 0] = b_col
-                img_array[py, px, 1] = g_col
-                img_array[py, px, 2] = r_col
 
-    return img_array, pixels_processed, x, u, v
+# Rows of the (SWEEP_PARAMS, K) per-candidate parameter array of the sweep
+# kernels: one contiguous row per parameter, one column per candidate
+(
+    SWEEP_R,
+    SWEEP_T,
+    SWEEP_SCALE_FACTOR,
+    SWEEP_SIZE_MULTIPLIER,
+    SWEEP_COLOR_SPEED,
+    SWEEP_RED_BASE,
+    SWEEP_RED_VARIATION,
+    SWEEP_GREEN_BASE,
+    SWEEP_GREEN_VARIATION,
+    SWEEP_BLUE_BASE,
+    SWEEP_BLUE_VARIATION,
+    SWEEP_SATURATION,
+    SWEEP_HDR_BOOST,
+    SWEEP_CORE_BOOST,
+) = range(14)
+SWEEP_PARAMS = 14
+
+
+# Candidates per block of the sweep kernels: threads take whole blocks, and
+# the candidates of a block advance in lockstep
+SWEEP_BLOCK_CANDIDATES = 4
+
+
+@jit(nopython=True, cache=True, parallel=True)
+def compute_sweep_trajectory(n: int, params: np.ndarray, states: np.ndarray) -> None:
+    """State-only pass of K parameter sets, in blocks across threads
+
+    states is a (3, K) array of x, u and v rows, advanced in place by one
+    frame exactly as compute_state_trajectory advances each candidate.
+    """
+    r = params[SWEEP_R]
+    t = params[SWEEP_T]
+    size_multiplier = params[SWEEP_SIZE_MULTIPLIER]
+    xs, us, vs = states[0], states[1], states[2]
+    num_candidates = states.shape[1]
+    num_blocks = (num_candidates + SWEEP_BLOCK_CANDIDATES - 1) // SWEEP_BLOCK_CANDIDATES
+
+    for block in prange(num_blocks):
+        first = block * SWEEP_BLOCK_CANDIDATES
+        last = min(num_candidates, first + SWEEP_BLOCK_CANDIDATES)
+        for i in range(n):
+            fi = float(i)
+            for j in range(n):
+                # Independent lanes: one candidate per iteration
+                for k in range(first, last):
+                    xs[k], us[k], vs[k] = _advance_state(
+                        fi, r[k], t[k], xs[k], vs[k], size_multiplier[k]
+                    )
+
+
+@jit(nopython=True, cache=True, parallel=True)
+def compute_sweep_frames_8bit(
+    n: int,
+    frame_number: int,
+    params: np.ndarray,
+    states: np.ndarray,
+    thumbnails: np.ndarray,
+) -> np.ndarray:
+    """Render one frame of K parameter sets into 8-bit thumbnails
+
+    params is a (SWEEP_PARAMS, K) array, states a (3, K) array of x, u and
+    v rows advanced in place, and thumbnails a (K, height, width, 3) uint8
+    array, cleared and drawn. Candidates are independent, so threads take
+    blocks of SWEEP_BLOCK_CANDIDATES, which advance in lockstep. They are
+    shaded by the same helpers as compute_mathematical_system_8bit, so each
+    gets exactly its pixels and next state with the candidate's parameters.
+    Returns the points landing inside each thumbnail.
+    """
+    num_candidates = states.shape[1]
+    height, width = thumbnails.shape[1], thumbnails.shape[2]
+    thumbnails[:] = 0
+    pixels_processed = np.zeros(num_candidates, dtype=np.int64)
+
+    r = params[SWEEP_R]
+    t = params[SWEEP_T]
+    scale_factor = params[SWEEP_SCALE_FACTOR]
+    size_multiplier = params[SWEEP_SIZE_MULTIPLIER]
+    color_speed = params[SWEEP_COLOR_SPEED]
+    red_base = params[SWEEP_RED_BASE]
+    red_variation = params[SWEEP_RED_VARIATION]
+    green_base = params[SWEEP_GREEN_BASE]
+    green_variation = params[SWEEP_GREEN_VARIATION]
+    blue_base = params[SWEEP_BLUE_BASE]
+    blue_variation = params[SWEEP_BLUE_VARIATION]
+    hdr_saturation = params[SWEEP_SATURATION]
+    hdr_boost = params[SWEEP_HDR_BOOST]
+    cosmic_core_boost = params[SWEEP_CORE_BOOST]
+    xs, us, vs = states[0], states[1], states[2]
+    num_blocks = (num_candidates + SWEEP_BLOCK_CANDIDATES - 1) // SWEEP_BLOCK_CANDIDATES
+
+    for block in prange(num_blocks):
+        first = block * SWEEP_BLOCK_CANDIDATES
+        last = min(num_candidates, first + SWEEP_BLOCK_CANDIDATES)
+        for i in range(n):
+            fi = float(i)
+            for j in range(n):
+                # Core mathematical system, one candidate per lane
+                for k in range(first, last):
+                    xs[k], us[k], vs[k] = _advance_state(
+                        fi, r[k], t[k], xs[k], vs[k], size_multiplier[k]
+                    )
+
+                # Shading, as in compute_mathematical_system_8bit
+                for k in range(first, last):
+                    x, u, v = xs[k], us[k], vs[k]
+                    px = int(width // 2 + scale_factor[k] * u)
+                    py = int(height // 2 + scale_factor[k] * v)
+                    if not (0 <= px < width and 0 <= py < height):
+                        continue
+                    pixels_processed[k] += 1
+
+                    red, green, blue = _phase_color(
+                        i + j,
+                        frame_number * color_speed[k],
+                        red_base[k],
+                        red_variation[k],
+                        green_base[k],
+                        green_variation[k],
+                        blue_base[k],
+                        blue_variation[k],
+                        hdr_saturation[k],
+                    )
+                    base_luminance, is_core = _point_geometry(i, j, u, v, x)
+
+                    # Set pixel (BGR for OpenCV)
+                    (
+                        thumbnails[k, py, px, 0],
+                        thumbnails[k, py, px, 1],
+                        thumbnails[k, py, px, 2],
+                    ) = _shade_point(
+                        red,
+                        green,
+                        blue,
+                        base_luminance,
+                        is_core,
+                        hdr_boost[k],
+                        cosmic_core_boost[k],
+                        1.0,
+                        None,
+                        thumbnails,
+                    )
+
+    return pixels_processed
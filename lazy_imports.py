@@ -0,0 +1,37 @@
+"""
+Deferred module imports for a fast-starting CLI
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import a module on first attribute access instead of right away
+
+    OpenCV, Numba and the JIT kernels take most of a second to import,
+    which commands like listing presets never need. The returned module
+    is registered in sys.modules, so later imports share it.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(name: str) -> bool:
+    """Check whether a module has really been imported (not just deferred)"""
+    module = sys.modules.get(name)
+    return module is not None and not isinstance(
+        module, importlib.util._LazyModule  # type: ignore[attr-defined]
+    )
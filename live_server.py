@@ -0,0 +1,321 @@
+"""
+Live MJPEG server of frames as they are rendered
+"""
+
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
+import numpy as np
+
+from lazy_imports import lazy_import
+from sparse_frame import SparseFrame
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+cv2 = lazy_import("cv2")
+
+# Width of the served frames (narrower frames are not upscaled)
+DEFAULT_LIVE_WIDTH = 960
+
+DEFAULT_JPEG_QUALITY = 80
+
+# Part separator of the multipart/x-mixed-replace stream
+STREAM_BOUNDARY = "luxframe"
+
+# How often idle stream handlers check whether the server is closing
+_POLL_SECONDS = 0.5
+
+_INDEX_PAGE = b"""<!DOCTYPE html>
+<html><head><title>Lux Spiral Cosmos - live render</title></head>
+<body style="margin:0;background:#000">
+<img src="/stream" style="width:100vw;height:100vh;object-fit:contain">
+</body></html>
+"""
+
+
+def encode_preview(
+    frame: Union[np.ndarray, SparseFrame],
+    max_width: int = DEFAULT_LIVE_WIDTH,
+    quality: int = DEFAULT_JPEG_QUALITY,
+) -> bytes:
+    """Downscale a frame to at most max_width and encode it as an 8-bit JPEG
+
+    16-bit frames show their PQ signal truncated to 8 bits, and linear
+    float frames get a plain 2.2 gamma; this is a monitor, not a grade.
+    """
+    if isinstance(frame, SparseFrame):
+        frame = frame.to_dense()
+
+    height, width = frame.shape[:2]
+    if width > max_width:
+        size = (max_width, max(1, round(height * max_width / width)))
+        # Area averaging keeps the single-pixel points visible as a glow
+        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    if frame.dtype == np.uint16:
+        frame = (frame >> 8).astype(np.uint8)
+    elif frame.dtype != np.uint8:
+        frame = np.clip(frame, 0.0, 1.0) ** (1 / 2.2)
+        frame = (frame * 255 + 0.5).astype(np.uint8)
+
+    ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise RuntimeError("Failed to encode a live frame")
+    return jpeg.tobytes()
+
+
+class LiveFrameServer:
+    """Serves the latest rendered frame over HTTP while a render runs
+
+    publish() hands a frame over without waiting: dense frames are copied
+    into a staging buffer (the render reuses its buffers) and sparse ones
+    are kept as they are. A background thread downscales and encodes the
+    latest staged frame to JPEG; frames published while it is busy replace
+    the staged one and are dropped. Each client gets its own thread that
+    sends the newest JPEG whenever it is ready for another, so slow
+    clients skip frames instead of holding anything up.
+
+    GET / is a viewer page, /stream the multipart MJPEG stream and
+    /frame.jpg the latest frame.
+    """
+
+    def __init__(
+        self,
+        port: int,
+        host: str = "127.0.0.1",
+        max_width: int = DEFAULT_LIVE_WIDTH,
+    ):
+        if max_width < 1:
+            raise ValueError("Live frame width must be positive")
+
+        self.port = port
+        self.host = host
+        self.max_width = max_width
+
+        # Metrics
+        self.frames_published = 0
+        self.frames_encoded = 0
+        self.frames_dropped = 0
+
+        # Staged frame waiting for the encoder, and a spare staging buffer
+        self._staged: Optional[Tuple[int, Union[np.ndarray, SparseFrame, bytes]]] = None
+        self._spare: Optional[np.ndarray] = None
+        # Latest JPEG and its sequence number (0: none yet)
+        self._jpeg: Optional[bytes] = None
+        self._jpeg_frame = -1
+        self._sequence = 0
+
+        self._condition = threading.Condition()
+        self._closing = False
+        self._encoder: Optional[threading.Thread] = None
+        self._server: Optional["ThreadingHTTPServer"] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def url(self) -> str:
+        """Address of the viewer page"""
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self) -> None:
+        """Start serving and the encoder thread"""
+        if self._server is not None:
+            raise RuntimeError("Live server already started")
+
+        self._closing = False
+        self._start_http_server()
+        self._encoder = threading.Thread(
+            target=self._encode_frames, name="live-encoder", daemon=True
+        )
+        self._encoder.start()
+
+    def publish(self, frame_number: int, frame: Union[np.ndarray, SparseFrame]) -> None:
+        """Stage a rendered frame for the live stream (never waits on encoding)"""
+        with self._condition:
+            if self._closing or self._server is None:
+                return
+            staged = self._take_staged()
+            if isinstance(frame, SparseFrame):
+                self._staged = (frame_number, frame)
+            else:
+                buffer = self._get_staging_buffer(frame, staged)
+                np.copyto(buffer, frame)
+                self._staged = (frame_number, buffer)
+            self.frames_published += 1
+            self._condition.notify_all()
+
+    def publish_jpeg(self, frame_number: int, jpeg: bytes) -> None:
+        """Stage a frame another process has already encoded (encode_preview)"""
+        with self._condition:
+            if self._closing or self._server is None:
+                return
+            self._take_staged()
+            self._staged = (frame_number, jpeg)
+            self.frames_published += 1
+            self._condition.notify_all()
+
+    def _take_staged(self) -> Optional[np.ndarray]:
+        """Drop the staged frame, if any; returns its buffer for reuse"""
+        if self._staged is None:
+            return None
+        _, staged = self._staged
+        self._staged = None
+        self.frames_dropped += 1
+        return staged if isinstance(staged, np.ndarray) else None
+
+    def _get_staging_buffer(
+        self, frame: np.ndarray, staged: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """Get a free buffer matching frame (called with the lock held)"""
+        for buffer in (staged, self._spare):
+            if buffer is None:
+                continue
+            if buffer.shape == frame.shape and buffer.dtype == frame.dtype:
+                if buffer is self._spare:
+                    self._spare = None
+                return buffer
+        return np.empty_like(frame)
+
+    def _encode_frames(self) -> None:
+        """Encode staged frames until the server closes"""
+        while True:
+            with self._condition:
+                while self._staged is None and not self._closing:
+                    self._condition.wait()
+                if self._closing:
+                    return
+                frame_number, frame = self._staged
+                self._staged = None
+
+            try:
+                if isinstance(frame, bytes):
+                    jpeg = frame
+                else:
+                    jpeg = encode_preview(frame, self.max_width)
+            except Exception as e:
+                # A failing monitor must not fail the render; stop serving frames
+                with self._condition:
+                    self._error = e
+                    self._closing = True
+                    self._condition.notify_all()
+                return
+
+            with self._condition:
+                if isinstance(frame, np.ndarray):
+                    self._spare = frame
+                self._jpeg = jpeg
+                self._jpeg_frame = frame_number
+                self._sequence += 1
+                self.frames_encoded += 1
+                self._condition.notify_all()
+
+    def wait_for_frame(
+        self, after_sequence: int, timeout: float = _POLL_SECONDS
+    ) -> Optional[Tuple[int, int, bytes]]:
+        """Get (sequence, frame number, JPEG) of a frame newer than after_sequence
+
+        Returns None if no newer frame arrives within timeout or the server
+        is closing.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._sequence > after_sequence or self._closing, timeout
+            )
+            if self._closing or self._sequence <= after_sequence:
+                return None
+            assert self._jpeg is not None
+            return self._sequence, self._jpeg_frame, self._jpeg
+
+    @property
+    def closing(self) -> bool:
+        """Whether the server is shutting down"""
+        return self._closing
+
+    def close(self) -> Dict[str, Any]:
+        """Stop serving; returns the frame counts (published, encoded, dropped)"""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._encoder is not None:
+            self._encoder.join()
+            self._encoder = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._spare = None
+        return {
+            "published": self.frames_published,
+            "encoded": self.frames_encoded,
+            "dropped": self.frames_dropped,
+            "error": self._error,
+        }
+
+    def _start_http_server(self) -> None:
+        """Serve the viewer page, stream and latest frame on a background thread"""
+        # Imported here: only renders with a live port need it
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        live = self
+
+        class LiveFrameHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path == "/":
+                    self._send(200, "text/html; charset=utf-8", _INDEX_PAGE)
+                elif self.path == "/frame.jpg":
+                    latest = live.wait_for_frame(0, timeout=0)
+                    if latest is None:
+                        self.send_error(503, "No frame rendered yet")
+                        return
+                    self._send(200, "image/jpeg", latest[2])
+                elif self.path == "/stream":
+                    self._stream()
+                else:
+                    self.send_error(404)
+
+            def _send(self, status: int, content_type: str, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self) -> None:
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    f"multipart/x-mixed-replace; boundary={STREAM_BOUNDARY}",
+                )
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+
+                # Start with the latest frame, then send whatever is newest
+                # each time this client has taken the previous one
+                sequence = 0
+                while not live.closing:
+                    latest = live.wait_for_frame(sequence)
+                    if latest is None:
+                        continue
+                    sequence, frame_number, jpeg = latest
+                    part = (
+                        f"--{STREAM_BOUNDARY}\r\n"
+                        f"Content-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n"
+                        f"X-Frame-Number: {frame_number}\r\n\r\n"
+                    ).encode("ascii")
+                    try:
+                        self.wfile.write(part + jpeg + b"\r\n")
+                        self.wfile.flush()
+                    except (BrokenPipeError, ConnectionResetError):
+                        return
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), LiveFrameHandler)
+        self._server.daemon_threads = True
+        # Port 0 binds a free port
+        self.port = self._server.server_address[1]
+        threading.Thread(
+            target=self._server.serve_forever, name="live-server", daemon=True
+        ).start()
@@ -0,0 +1,438 @@
+"""
+Parameter sweeps: lockstep exploration of candidates and batch renders
+"""
+
+import os
+import json
+import time
+import logging
+import multiprocessing
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from batch_queue import BatchJob, Sweep, expand_batch_jobs, thumbnail_statistics
+from lazy_imports import lazy_import
+from preview import make_preview_preset
+from render_manifest import RenderManifest
+from render_plan import RenderPlan, find_preset_problems
+
+if TYPE_CHECKING:
+    from cosmic_generator import CosmicSpiralGenerator
+
+cv2 = lazy_import("cv2")
+numba = lazy_import("numba")
+jit_core = lazy_import("jit_core")
+# Batch workers build their own generator
+cosmic_generator = lazy_import("cosmic_generator")
+
+
+def sweep_parameters(plans: List[RenderPlan], frame_number: int) -> np.ndarray:
+    """Get the (SWEEP_PARAMS, K) kernel parameters of candidates for a frame"""
+    params = np.empty((jit_core.SWEEP_PARAMS, len(plans)), dtype=np.float64)
+    for k, plan in enumerate(plans):
+        t, spiral_size_multiplier = plan.frame_parameters(frame_number)
+        params[:, k] = (
+            plan.r,
+            t,
+            plan.scale_factor,
+            spiral_size_multiplier,
+            plan.color_speed,
+            plan.red_base,
+            plan.red_variation,
+            plan.green_base,
+            plan.green_variation,
+            plan.blue_base,
+            plan.blue_variation,
+            plan.saturation,
+            plan.hdr_boost,
+            plan.cosmic_core_boost,
+        )
+    return params
+
+
+def explore_parameters(
+    generator: "CosmicSpiralGenerator",
+    preset_name: str,
+    sweeps: Sequence[Sweep],
+    frames: Optional[Sequence[int]] = None,
+    scale: float = 0.25,
+    write_thumbnails: bool = True,
+) -> List[Dict[str, Any]]:
+    """Compare every sweep candidate of a preset in one lockstep pass
+
+    Rather than rendering each candidate in full, the sweep kernels
+    advance the states of all candidates together and draw the given
+    frames (default: four spread over the animation) as 8-bit
+    thumbnails, scaled like previews; frames in between run state-only.
+    Thumbnails are exact frames at reduced size. Per-candidate points on
+    screen, coverage and brightness histograms are saved to
+    explore.json, next to the thumbnails unless write_thumbnails is
+    False. Returns the per-candidate statistics.
+    """
+    if not 0 < scale <= 1:
+        raise ValueError("Explore scale must be in (0, 1]")
+
+    logger = generator.logger
+
+    jobs = expand_batch_jobs(generator.config_manager, [preset_name], sweeps)
+    generator.load_preset(preset_name)
+    num_frames = generator.current_preset["video"]["num_frames"]
+    if frames is None:
+        frames = np.linspace(0, num_frames - 1, 4).round().astype(int).tolist()
+    frames = sorted(set(frames))
+
+    # Candidate plans, scaled like previews
+    plans = []
+    for job in jobs:
+        preset = generator.config_manager.normalize_preset(
+            generator.config_manager.apply_overrides(
+                generator.config_manager.get_preset(preset_name), job.overrides
+            )
+        )
+        problems = find_preset_problems(preset)
+        if problems:
+            raise ValueError(
+                f"Invalid sweep candidate: {job.name} ({'; '.join(problems)})"
+            )
+        plan = RenderPlan(
+            make_preview_preset(preset, scale),
+            generator.config_manager.get_output_config(),
+            preset_name,
+        )
+        if frames[0] < 0 or frames[-1] >= plan.num_frames:
+            raise ValueError(f"Frame numbers out of range for {job.name}")
+        plans.append(plan)
+
+    generator._setup_output_directory(tag="explore")
+    logger.info(
+        f"Exploring {len(jobs)} candidates at frames "
+        f"{', '.join(str(frame + 1) for frame in frames)} "
+        f"({plans[0].width}x{plans[0].height} thumbnails)"
+    )
+    logger.info(f"Output directory: {generator.output_dir}")
+    logger.info("")
+
+    # Candidates run in lockstep in groups sharing n and thumbnail size
+    groups: Dict[Tuple[int, int, int], List[int]] = {}
+    for k, plan in enumerate(plans):
+        groups.setdefault((plan.n, plan.height, plan.width), []).append(k)
+
+    results = [
+        {"name": job.name, "overrides": job.overrides, "frames": {}} for job in jobs
+    ]
+    start_time = time.time()
+    for (n, height, width), members in groups.items():
+        group_plans = [plans[k] for k in members]
+        states = np.zeros((3, len(members)), dtype=np.float64)
+        thumbnails = np.zeros((len(members), height, width, 3), dtype=np.uint8)
+
+        for frame in range(frames[-1] + 1):
+            params = sweep_parameters(group_plans, frame)
+            if frame not in frames:
+                jit_core.compute_sweep_trajectory(n, params, states)
+                continue
+
+            frame_start = time.time()
+            points = jit_core.compute_sweep_frames_8bit(
+                n, frame, params, states, thumbnails
+            )
+            for index, k in enumerate(members):
+                stats = thumbnail_statistics(thumbnails[index])
+                results[k]["frames"][frame] = {
+                    "pixels_processed": int(points[index]),
+                    **stats,
+                }
+                if write_thumbnails:
+                    cv2.imwrite(
+                        f"{generator.output_dir}/{jobs[k].name}_frame_{frame:04d}.png",
+                        thumbnails[index],
+                    )
+            logger.info(
+                f"Frame {frame+1:3d}: {len(members)} candidates in "
+                f"{time.time() - frame_start:.2f}s"
+            )
+
+    stats_file = os.path.join(generator.output_dir, "explore.json")
+    with open(stats_file, "w") as f:
+        json.dump({"preset": preset_name, "candidates": results}, f, indent=1)
+
+    total_time = time.time() - start_time
+    logger.info("")
+    logger.info(
+        f"Explored {len(jobs)} candidates in {total_time:.1f}s "
+        f"({total_time / len(jobs):.2f}s per candidate)"
+    )
+    for result in results:
+        coverage = np.mean([stats["coverage"] for stats in result["frames"].values()])
+        logger.info(f"  {result['name']:30} coverage {coverage:7.2%}")
+    logger.info(f"Statistics saved to: {stats_file}")
+    return results
+
+
+def generate_batch(
+    generator: "CosmicSpiralGenerator", jobs: List[BatchJob], workers: int = 1
+) -> Dict[str, str]:
+    """Render a batch of presets or sweep variants in one process pool
+
+    All frames of all jobs go through a single long-lived pool, whose
+    workers compile (or load) the kernels once. Jobs are started most
+    expensive first (frames x n^2) and the next job's frames are queued
+    while the last frames of the previous one render, so no worker
+    idles between jobs. Each job gets its own output directory and
+    manifest. A failing job is reported and skipped; the others carry
+    on. Returns the status of each job by name.
+    """
+    if not jobs:
+        raise ValueError("No batch jobs to render")
+    if generator.raw_frames or generator.delta_frames:
+        raise ValueError(
+            "Batch renders write frame files, not raw frame files or archives"
+        )
+    if generator.live_server is not None:
+        raise ValueError("Live frames cover single renders, not batches")
+    logger = generator.logger
+
+    # Prepare each job: output directory, manifest and estimated cost
+    batch: List[Dict[str, Any]] = []
+    job_specs: Dict[str, Tuple[RenderPlan, str, str]] = {}
+    presets: List[Dict[str, Any]] = []
+    for job in jobs:
+        generator.load_preset(job.preset_name, job.overrides)
+        plan = generator._get_plan()
+        presets.append(generator.current_preset)
+        generator._setup_output_directory(tag=job.tag)
+        num_frames = plan.num_frames
+        n = plan.n
+        manifest = RenderManifest(
+            generator.output_dir,
+            job.preset_name,
+            generator._get_job_hash(),
+            num_frames,
+            generator.timestamp,
+        )
+        manifest.save()
+        job_specs[job.name] = (plan, generator.output_dir, generator.timestamp)
+        batch.append(
+            {
+                "job": job,
+                "plan": plan,
+                "preset": generator.current_preset,
+                "output_dir": generator.output_dir,
+                "manifest": manifest,
+                "num_frames": num_frames,
+                "cost": num_frames * n * n,
+                "done": 0,
+                "error": None,
+                "start_time": None,
+            }
+        )
+    batch.sort(key=lambda entry: entry["cost"], reverse=True)
+    workers = generator._plan_resources(workers, False, presets)
+
+    logger.info(
+        f"Batch of {len(batch)} jobs, "
+        f"{sum(entry['num_frames'] for entry in batch)} frames, "
+        f"{workers} worker processes"
+    )
+    for entry in batch:
+        logger.info(f"  {entry['job'].name} -> {entry['output_dir']}")
+    logger.info("")
+
+    start_time = time.time()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_batch_worker,
+        initargs=(
+            generator.config_manager.get_output_config(),
+            job_specs,
+            logger.level,
+            generator._get_render_modes(),
+        ),
+    ) as executor:
+        max_in_flight = workers * 2
+        pending: Dict[Future, Dict[str, Any]] = {}
+
+        try:
+            for entry in batch:
+                job = entry["job"]
+                entry["start_time"] = time.time()
+                generator._use_plan(entry["plan"], entry["preset"])
+                generator.preset_overrides = dict(job.overrides)
+
+                try:
+                    _submit_batch_job(
+                        generator, entry, executor, pending, max_in_flight
+                    )
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    entry["error"] = _describe_error(e)
+                    logger.error(f"[{job.name}] failed: {entry['error']}")
+
+            while pending:
+                _collect_batch_frames(generator, pending)
+        except BrokenProcessPool as e:
+            for entry in batch:
+                if entry["error"] is None and entry["done"] < entry["num_frames"]:
+                    entry["error"] = f"worker pool failed: {e}"
+    generator._release_resource_plan()
+
+    # Report per-job results
+    total_time = time.time() - start_time
+    statuses = {}
+    logger.info("")
+    logger.info(f"Batch finished in {total_time/60:.1f} minutes:")
+    for entry in batch:
+        job = entry["job"]
+        if entry["error"] is None:
+            statuses[job.name] = "complete"
+        else:
+            statuses[job.name] = f"failed: {entry['error']}"
+        logger.info(
+            f"  {job.name:30} {entry['done']:4d}/{entry['num_frames']} frames "
+            f"- {statuses[job.name]}"
+        )
+    return statuses
+
+
+def _submit_batch_job(
+    generator: "CosmicSpiralGenerator",
+    entry: Dict[str, Any],
+    executor: ProcessPoolExecutor,
+    pending: Dict[Future, Dict[str, Any]],
+    max_in_flight: int,
+) -> None:
+    """Queue the frames of the loaded batch job, collecting as slots free up"""
+    job = entry["job"]
+
+    # A frame is submitted once the state after it is known, so its
+    # manifest entry is complete whenever it finishes
+    states = generator.compute_frame_states(entry["num_frames"])
+    start_state = next(states)
+    for frame, state in enumerate(states):
+        if entry["error"] is not None:
+            break
+        entry["manifest"].set_frame_state(frame, state)
+        future = executor.submit(_render_batch_frame, job.name, frame, start_state)
+        pending[future] = entry
+        start_state = state
+        while len(pending) >= generator._get_parallel_limit(max_in_flight):
+            _collect_batch_frames(generator, pending)
+
+
+def _collect_batch_frames(
+    generator: "CosmicSpiralGenerator", pending: Dict[Future, Dict[str, Any]]
+) -> None:
+    """Wait for at least one batch frame and record its job's progress"""
+    logger = generator.logger
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        entry = pending.pop(future)
+        job = entry["job"]
+        try:
+            frame_number, record = future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            if entry["error"] is None:
+                entry["error"] = _describe_error(e)
+                logger.error(f"[{job.name}] failed: {entry['error']}")
+            continue
+        if entry["error"] is not None:
+            continue
+
+        entry["manifest"].complete_frame(
+            frame_number,
+            generator._get_frame_filename(frame_number, entry["output_dir"]),
+        )
+        entry["done"] += 1
+        logger.info(
+            f"[{job.name}] Frame {frame_number+1:3d}: "
+            f"{record['stages']['total']:.2f}s "
+            f"({entry['done']}/{entry['num_frames']} done)"
+        )
+        if entry["done"] == entry["num_frames"]:
+            logger.info(
+                f"[{job.name}] complete in "
+                f"{(time.time() - entry['start_time'])/60:.1f} minutes"
+            )
+
+
+def _describe_error(error: Exception) -> str:
+    """Get the first line of an error message for per-job reports"""
+    lines = str(error).strip().splitlines()
+    return lines[0] if lines else type(error).__name__
+
+
+# Per-process generator and batch jobs known to this worker:
+# name -> (plan, output dir, timestamp)
+_worker_generator: Optional["CosmicSpiralGenerator"] = None
+_batch_job_specs: Dict[str, Tuple[RenderPlan, str, str]] = {}
+
+
+def _init_batch_worker(
+    output_config: Dict[str, Any],
+    job_specs: Dict[str, Tuple[RenderPlan, str, str]],
+    log_level: int,
+    render_modes: Dict[str, Any],
+) -> None:
+    """Initialize a long-lived batch worker that renders frames of any job"""
+    global _worker_generator, _batch_job_specs
+    generator = cosmic_generator.CosmicSpiralGenerator(
+        config={"presets": {}, "output": output_config}
+    )
+    # The parent reports progress per job
+    generator.logger.setLevel(max(log_level, logging.WARNING))
+    for mode, enabled in render_modes.items():
+        setattr(generator, mode, enabled)
+
+    # Frames already run one per process; keep kernels single-threaded
+    # unless a CPU budget leaves each worker several cores
+    numba.set_num_threads(
+        min(generator.kernel_threads or 1, numba.config.NUMBA_NUM_THREADS)
+    )
+
+    # Warm up with the first job whose kernels compile; a job with
+    # unsupported settings must fail its own frames, not the whole pool
+    for plan, _, _ in job_specs.values():
+        try:
+            generator._use_plan(plan)
+            compile_time = generator.warm_up_kernels()
+        except Exception:
+            continue
+        generator.logger.debug(f"Worker JIT warm-up: {compile_time:.2f}s")
+        break
+
+    _batch_job_specs = job_specs
+    _worker_generator = generator
+
+
+def _render_batch_frame(
+    job_name: str, frame_number: int, state: Tuple[float, float, float]
+) -> Tuple[int, Dict[str, Any]]:
+    """Render one frame of a batch job in a worker process"""
+    generator = _worker_generator
+    if generator is None:
+        raise RuntimeError("Batch worker not initialized")
+
+    # Switch presets when the worker moves on to another job
+    plan, output_dir, timestamp = _batch_job_specs[job_name]
+    if generator.output_dir != output_dir:
+        generator._use_plan(plan)
+        generator.output_dir = output_dir
+        generator.timestamp = timestamp
+
+        pool = generator.buffer_pool
+        if pool is None or pool.shape[:2] != (plan.height, plan.width):
+            generator.buffer_pool = generator._create_buffer_pool(1)
+
+    generator.x, generator.u, generator.v = state
+    return frame_number, generator.render_frame(frame_number)
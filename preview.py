@@ -0,0 +1,124 @@
+"""
+Fast low-resolution previews of a preset
+"""
+
+import copy
+import time
+from math import ceil, sqrt
+from typing import TYPE_CHECKING, Any, Dict
+
+from render_plan import RenderPlan
+
+if TYPE_CHECKING:
+    from cosmic_generator import CosmicSpiralGenerator
+
+# Initial kernel throughput guess used to size the first preview frame
+PREVIEW_ITERATIONS_PER_SECOND = 5_000_000
+
+
+def make_preview_preset(preset: Dict[str, Any], scale: float) -> Dict[str, Any]:
+    """Copy a preset with width, height and scale_factor scaled"""
+    preset = copy.deepcopy(preset)
+    video_config = preset["video"]
+    video_config["width"] = max(2, int(video_config["width"] * scale) // 2 * 2)
+    video_config["height"] = max(2, int(video_config["height"] * scale) // 2 * 2)
+    preset["mathematical"]["scale_factor"] *= scale
+    return preset
+
+
+def generate_preview(
+    generator: "CosmicSpiralGenerator",
+    preset_name: str,
+    scale: float = 0.25,
+    target_frame_seconds: float = 0.5,
+    time_budget: float = 30.0,
+    stream: bool = False,
+) -> None:
+    """Render a fast low-resolution preview of a preset
+
+    Width, height and scale_factor are scaled together, every k-th frame
+    is rendered so the whole animation fits the time budget, and the
+    i/j loops are subsampled, retuned after every frame, to hit the
+    target seconds per frame. The mathematical state carries over
+    between rendered frames, so skipped frames are approximated.
+    """
+    if not 0 < scale <= 1:
+        raise ValueError("Preview scale must be in (0, 1]")
+    if target_frame_seconds <= 0 or time_budget <= 0:
+        raise ValueError("Preview timings must be positive")
+
+    logger = generator.logger
+    generator.load_preset(preset_name)
+    preview_preset = make_preview_preset(generator.current_preset, scale)
+    generator._use_plan(
+        RenderPlan(
+            preview_preset, generator.config_manager.get_output_config(), preset_name
+        ),
+        preview_preset,
+    )
+    generator._setup_output_directory(create=not stream, tag="preview")
+
+    video_config = generator.current_preset["video"]
+    num_frames = video_config["num_frames"]
+    n = generator.current_preset["mathematical"]["n"]
+
+    frame_stride = max(1, ceil(num_frames * target_frame_seconds / time_budget))
+    saved_modes = (
+        generator.sample_step,
+        generator.sparse_frames,
+        generator.raw_frames,
+        generator.delta_frames,
+    )
+    generator.sparse_frames = generator.raw_frames = generator.delta_frames = False
+    step = n / sqrt(target_frame_seconds * PREVIEW_ITERATIONS_PER_SECOND)
+    generator.sample_step = max(1, ceil(step))
+
+    logger.info(
+        f"Previewing every {frame_stride} of {num_frames} frames at "
+        f"{video_config['width']}x{video_config['height']} "
+        f"(target {target_frame_seconds:.2f}s per frame, {time_budget:.0f}s budget)"
+    )
+    if not stream:
+        logger.info(f"Output directory: {generator.output_dir}")
+    logger.info("")
+
+    # Reset mathematical state
+    generator.x = generator.u = generator.v = 0.0
+
+    start_time = time.time()
+    frames_rendered = 0
+    try:
+        with generator._frame_outputs(stream, 1):
+            for frame in range(0, num_frames, frame_stride):
+                if frames_rendered and time.time() - start_time >= time_budget:
+                    logger.info("Preview time budget reached")
+                    break
+
+                frame_start = time.time()
+                generator.render_frame(frame)
+                frame_time = time.time() - frame_start
+                frames_rendered += 1
+
+                # Render time scales with (n / sample_step)^2
+                correction = min(2.0, max(0.5, sqrt(frame_time / target_frame_seconds)))
+                step = max(1.0, step * correction)
+                generator.sample_step = round(step)
+                logger.debug(f"Preview sample step: {generator.sample_step}")
+    finally:
+        (
+            generator.sample_step,
+            generator.sparse_frames,
+            generator.raw_frames,
+            generator.delta_frames,
+        ) = saved_modes
+
+    total_time = time.time() - start_time
+    logger.info("")
+    logger.info(f"Preview complete! {frames_rendered} frames in {total_time:.1f}s")
+    if stream:
+        video_file = generator.config_manager.get_video_filename(
+            generator.current_preset_name, generator.timestamp
+        )
+        logger.info(f"Preview video saved to: {video_file}")
+    else:
+        logger.info(f"Preview frames saved to: {generator.output_dir}/")
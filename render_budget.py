@@ -0,0 +1,201 @@
+"""
+Memory and CPU budgets: sizing render parallelism to fit a share of a machine
+"""
+
+import os
+import time
+import multiprocessing
+from typing import Any, Dict, NamedTuple, Optional
+import numpy as np
+
+from frame_buffers import get_process_private_mb, get_rss_mb
+
+# Resident memory of a render process once NumPy, OpenCV, Numba and the
+# compiled kernels are loaded (measured on Linux x86-64)
+PROCESS_BASELINE_MB = 160.0
+
+# Writing a frame file needs about this fraction of the frame again
+ENCODE_SCRATCH_FRACTION = 0.5
+
+# Bytes per sparse frame point besides its color (pixel index, bookkeeping)
+SPARSE_POINT_BYTES = 8
+
+# The governor lets more frames in flight again below this share of the budget
+RELAX_FRACTION = 0.8
+
+# The governor measures memory at most this often, in seconds
+UPDATE_SECONDS = 1.0
+
+_MB = 1024 * 1024
+
+
+class RenderCost(NamedTuple):
+    """Estimated cost of rendering one frame of a preset"""
+
+    # One dense output frame
+    frame_mb: float
+    # A render process working on one frame (baseline, buffers, scratch)
+    process_mb: float
+    # Recurrence iterations per frame (the CPU cost)
+    iterations: int
+    sparse_frames: bool
+
+
+class ResourcePlan(NamedTuple):
+    """Parallelism chosen to fit a render into its budgets"""
+
+    workers: int
+    # Frames queued for writing or encoding
+    max_in_flight: int
+    # Numba threads per rendering process
+    kernel_threads: int
+    estimated_mb: float
+
+
+def estimate_render_cost(
+    preset: Dict[str, Any],
+    frame_dtype: np.dtype,
+    accumulate: bool = False,
+    sparse_frames: bool = False,
+) -> RenderCost:
+    """Estimate the memory and CPU cost of a frame from a normalized preset"""
+    video_config = preset["video"]
+    n = preset["mathematical"]["n"]
+    pixels = video_config["width"] * video_config["height"]
+    frame_dtype = np.dtype(frame_dtype)
+
+    frame_mb = pixels * 3 * frame_dtype.itemsize / _MB
+    process_mb = PROCESS_BASELINE_MB + frame_mb * (1 + ENCODE_SCRATCH_FRACTION)
+    if accumulate:
+        # float32 sums of every pixel
+        process_mb += pixels * 3 * 4 / _MB
+    if sparse_frames:
+        # At most one point per iteration or pixel
+        points = min(n * n, pixels)
+        process_mb += points * (SPARSE_POINT_BYTES + 3 * frame_dtype.itemsize) / _MB
+    return RenderCost(frame_mb, process_mb, n * n, sparse_frames)
+
+
+def estimate_render_memory(
+    cost: RenderCost, workers: int, max_in_flight: int, sink_frames: bool
+) -> float:
+    """Estimate the peak resident memory of a render and its workers in MB
+
+    sink_frames: frames are encoded or archived in the rendering process,
+    as in streamed and delta archive renders.
+    """
+    if workers <= 1:
+        # Buffers queued for writing, plus the one being encoded
+        return cost.process_mb + cost.frame_mb * (max_in_flight + int(sink_frames))
+
+    parent_mb = PROCESS_BASELINE_MB
+    if sink_frames:
+        # Shared ring slots (dense) or rasterizing buffers (sparse) the
+        # encoder reads, as sized by the generator
+        slots = max_in_flight + 2
+        if not cost.sparse_frames:
+            slots += workers * 2
+        parent_mb += cost.frame_mb * slots
+    return parent_mb + workers * cost.process_mb
+
+
+def plan_resources(
+    cost: RenderCost,
+    workers: int,
+    max_in_flight: int,
+    memory_budget_mb: Optional[float] = None,
+    cpu_budget: Optional[int] = None,
+    sink_frames: bool = False,
+    parallel_kernel: bool = False,
+) -> ResourcePlan:
+    """Choose workers, frames in flight and kernel threads within the budgets
+
+    max_in_flight is the configured number of frames queued for writing or
+    encoding. Workers are capped at the CPU budget (default: every core). Frames in
+    flight are given up before workers, since fewer queued frames only
+    cost overlap while fewer workers cost throughput. The multi-threaded
+    kernel gets the cores the workers leave. Raises ValueError when even
+    one worker with one frame in flight does not fit.
+    """
+    if memory_budget_mb is not None and memory_budget_mb <= 0:
+        raise ValueError("Memory budget must be positive")
+    if cpu_budget is not None and cpu_budget < 1:
+        raise ValueError("CPU budget must be at least one core")
+
+    cpus = min(cpu_budget or os.cpu_count() or 1, os.cpu_count() or 1)
+    workers = max(1, min(workers, cpus))
+    # As many queued frames as workers, like an unbudgeted render
+    max_in_flight = max(1, max_in_flight, workers)
+
+    if memory_budget_mb is not None:
+        while (
+            estimate_render_memory(cost, workers, max_in_flight, sink_frames)
+            > memory_budget_mb
+        ):
+            if max_in_flight > 1 and (max_in_flight > workers or workers == 1):
+                max_in_flight -= 1
+            elif workers > 1:
+                workers -= 1
+            else:
+                raise ValueError(
+                    f"Memory budget of {memory_budget_mb:,.0f} MB is below the "
+                    f"{estimate_render_memory(cost, 1, 1, sink_frames):,.0f} MB "
+                    "a single render process needs for this preset"
+                )
+
+    kernel_threads = max(1, cpus // workers) if parallel_kernel else 1
+    return ResourcePlan(
+        workers,
+        max_in_flight,
+        kernel_threads,
+        estimate_render_memory(cost, workers, max_in_flight, sink_frames),
+    )
+
+
+class MemoryGovernor:
+    """Lowers the frames a parallel render keeps in flight while over budget
+
+    update() adds up the resident memory of this process and the private
+    memory of its child processes (shared frame rings are counted once,
+    here). Over the budget, one frame fewer may be in flight, down to one;
+    once usage falls below RELAX_FRACTION of the budget, the limit grows
+    back towards max_in_flight. Memory is measured at most every
+    UPDATE_SECONDS, so each step can take effect. Without /proc, the limit
+    stays fixed.
+    """
+
+    def __init__(self, memory_budget_mb: float, max_in_flight: int):
+        self.memory_budget_mb = memory_budget_mb
+        self.max_in_flight = max(1, max_in_flight)
+        self.limit = self.max_in_flight
+        self._last_update = 0.0
+
+        # Metrics
+        self.peak_mb = 0.0
+        self.reductions = 0
+
+    def update(self) -> int:
+        """Measure the memory in use and get the frames allowed in flight"""
+        now = time.monotonic()
+        if now - self._last_update < UPDATE_SECONDS:
+            return self.limit
+        self._last_update = now
+        if get_process_private_mb(os.getpid()) is None:
+            return self.limit
+
+        children = (
+            get_process_private_mb(process.pid)
+            for process in multiprocessing.active_children()
+        )
+        # Children that just exited are left out
+        usage = get_rss_mb() + sum(child for child in children if child is not None)
+        self.peak_mb = max(self.peak_mb, usage)
+        if usage > self.memory_budget_mb and self.limit > 1:
+            self.limit -= 1
+            self.reductions += 1
+        elif (
+            usage < self.memory_budget_mb * RELAX_FRACTION
+            and self.limit < self.max_in_flight
+        ):
+            self.limit += 1
+        return self.limit
@@ -0,0 +1,655 @@
+"""
+Distributed rendering: a coordinator leasing frame ranges to render nodes
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import socket
+import logging
+import argparse
+import threading
+import multiprocessing
+import socketserver
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from cosmic_generator import CosmicSpiralGenerator
+from render_manifest import RenderManifest
+
+FARM_PROTOCOL_VERSION = 1
+
+DEFAULT_PORT = 7077
+
+# Render modes sent to nodes (the rest are local to a process)
+NODE_RENDER_MODES = (
+    "compute_precision",
+    "accumulate",
+    "accumulation_exposure",
+    "use_parallel_kernel",
+    "use_lookup_tables",
+    "sparse_frames",
+)
+
+# A frame range is given up after this many leases on it were lost
+MAX_LEASE_ATTEMPTS = 3
+
+# How long nodes wait before asking again when no lease is ready, in seconds
+RETRY_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+def encode_state(state: Tuple[float, float, float]) -> List[str]:
+    """Encode an (x, u, v) state exactly (hex floats) for a JSON message"""
+    return [float(value).hex() for value in state]
+
+
+def decode_state(values: List[str]) -> Tuple[float, float, float]:
+    """Decode a state encoded by encode_state"""
+    x, u, v = (float.fromhex(value) for value in values)
+    return x, u, v
+
+
+class FarmConnection:
+    """Newline-delimited JSON messages over a TCP connection"""
+
+    def __init__(self, sock: socket.socket):
+        self._file = sock.makefile("rwb")
+
+    def send(self, message: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(message).encode("utf-8") + b"\n")
+        self._file.flush()
+
+    def receive(self) -> Optional[Dict[str, Any]]:
+        """Get the next message, or None once the peer has disconnected"""
+        line = self._file.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a message and wait for the reply (error replies raise)"""
+        self.send(message)
+        reply = self.receive()
+        if reply is None:
+            raise ConnectionError("Coordinator closed the connection")
+        if reply["type"] == "error":
+            raise RuntimeError(reply["message"])
+        return reply
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class FrameLease:
+    """A contiguous frame range leased to one node"""
+
+    __slots__ = ("lease_id", "node", "start", "end", "next_frame", "deadline")
+
+    def __init__(self, lease_id: int, node: str, start: int, end: int, timeout: float):
+        self.lease_id = lease_id
+        self.node = node
+        self.start = start
+        self.end = end
+        # First frame of the range not reported yet
+        self.next_frame = start
+        self.deadline = time.time() + timeout
+
+
+class RenderCoordinator:
+    """Splits an animation into frame-range leases rendered by remote nodes
+
+    The coordinator runs the state-only pre-pass and leases ranges of up to
+    lease_frames frames, each with the exact starting state of its first
+    frame, as soon as that state is known. Nodes render a range serially
+    (bit-identical to a single-machine render), write the frame files into
+    the shared output directory and report every frame, which renews the
+    lease. Ranges whose node disconnects or stops reporting for
+    lease_timeout seconds go back to the queue from their first missing
+    frame. Progress is kept in the render manifest, so an interrupted
+    distributed render can be resumed.
+    """
+
+    def __init__(
+        self,
+        generator: CosmicSpiralGenerator,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        lease_frames: int = 8,
+        lease_timeout: float = 300.0,
+    ):
+        if lease_frames < 1:
+            raise ValueError("Leases need at least one frame")
+        if lease_timeout <= 0:
+            raise ValueError("Lease timeout must be positive")
+
+        self.generator = generator
+        self.host = host
+        self.port = port
+        self.lease_frames = lease_frames
+        self.lease_timeout = lease_timeout
+
+        # Per-node frame counts and render seconds
+        self.node_frames: Dict[str, int] = {}
+        self.node_seconds: Dict[str, float] = {}
+
+        self._job: Dict[str, Any] = {}
+        self._num_frames = 0
+        self._states: Dict[int, Tuple[float, float, float]] = {}
+        self._done: Set[int] = set()
+        # Unleased ranges as sorted (start, end) pairs
+        self._pending: List[Tuple[int, int]] = []
+        self._leases: Dict[int, FrameLease] = {}
+        self._attempts: Dict[int, int] = {}
+        self._next_lease_id = 0
+        self._error: Optional[str] = None
+        self._condition = threading.Condition()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether every frame is complete"""
+        return len(self._done) == self._num_frames
+
+    def render(
+        self,
+        preset_name: str,
+        resume_dir: Optional[str] = None,
+        local_nodes: int = 0,
+    ) -> None:
+        """Render a preset on the nodes that connect, until every frame is done
+
+        local_nodes render node processes are started on this machine.
+        """
+        generator = self.generator
+        if generator.raw_frames or generator.delta_frames:
+            raise ValueError("Distributed renders write frame files")
+        generator.load_preset(preset_name)
+        num_frames = generator._get_plan().num_frames
+
+        if resume_dir is not None:
+            generator.manifest = generator._resume_manifest(resume_dir)
+            generator.output_dir = resume_dir
+            generator.timestamp = generator.manifest.timestamp
+        else:
+            generator._setup_output_directory()
+            generator.manifest = RenderManifest(
+                generator.output_dir,
+                generator.current_preset_name,
+                generator._get_job_hash(),
+                num_frames,
+                generator.timestamp,
+            )
+            generator.manifest.save()
+        manifest = generator.manifest
+
+        first_frame, start_state = 0, (0.0, 0.0, 0.0)
+        if manifest.frames:
+            verified, damaged = manifest.verify_frames()
+            first_frame, start_state = manifest.get_resume_point(verified)
+            self._done = set(verified)
+            logger.info(
+                f"Resuming at frame {first_frame+1}: {len(verified)} of "
+                f"{num_frames} frames verified"
+            )
+            if damaged:
+                logger.warning(f"Re-rendering {len(damaged)} missing or damaged frames")
+
+        self._num_frames = num_frames
+        self._pending = self._split_ranges(
+            [frame for frame in range(num_frames) if frame not in self._done]
+        )
+        self._job = {
+            "type": "job",
+            "config": generator.config_manager.config,
+            "preset": generator.current_preset_name,
+            "overrides": generator.preset_overrides,
+            # Digest of the compiled plan: a node that compiles the preset
+            # differently (other code version) refuses the job
+            "plan": generator._get_plan().digest,
+            "output_dir": os.path.abspath(generator.output_dir),
+            "timestamp": generator.timestamp,
+            "modes": {mode: getattr(generator, mode) for mode in NODE_RENDER_MODES},
+        }
+
+        self._start_server()
+        logger.info(
+            f"Coordinating {num_frames - len(self._done)} frames on "
+            f"{self.host}:{self.port} ({self.lease_frames}-frame leases)"
+        )
+        logger.info(f"Output directory: {generator.output_dir}")
+        logger.info("")
+
+        nodes = [
+            multiprocessing.get_context("spawn").Process(
+                target=run_render_node,
+                args=("127.0.0.1" if self.host in ("", "0.0.0.0") else self.host,),
+                kwargs={
+                    "port": self.port,
+                    "config_file": generator.config_manager.config_file,
+                    "name": f"{socket.gethostname()}-{index + 1}",
+                    "threads": 1,
+                    "log_level": logging.WARNING,
+                },
+                daemon=True,
+            )
+            for index in range(local_nodes)
+        ]
+        for node in nodes:
+            node.start()
+
+        start_time = time.time()
+        try:
+            self._run_prepass(first_frame, start_state)
+            with self._condition:
+                while not self.finished and self._error is None:
+                    self._condition.wait(RETRY_SECONDS)
+                    self._expire_leases()
+                if self._error is not None:
+                    raise RuntimeError(self._error)
+        finally:
+            self._stop_server()
+            for node in nodes:
+                node.join(timeout=10)
+                if node.is_alive():
+                    node.terminate()
+            generator.manifest = None
+
+        total_time = time.time() - start_time
+        self._log_summary(total_time)
+        generator.x, generator.u, generator.v = self._states[num_frames]
+        generator._print_completion_info()
+
+    def _split_ranges(self, frames: List[int]) -> List[Tuple[int, int]]:
+        """Group frames into contiguous ranges of at most lease_frames"""
+        ranges: List[Tuple[int, int]] = []
+        for frame in frames:
+            if ranges and ranges[-1][1] == frame:
+                if frame - ranges[-1][0] < self.lease_frames:
+                    ranges[-1] = (ranges[-1][0], frame + 1)
+                    continue
+            ranges.append((frame, frame + 1))
+        return ranges
+
+    def _run_prepass(
+        self, first_frame: int, start_state: Tuple[float, float, float]
+    ) -> None:
+        """Compute the starting states, releasing ranges as they become known"""
+        prepass_start = time.time()
+        states = self.generator.compute_frame_states(
+            self._num_frames, first_frame, start_state
+        )
+        for frame, state in zip(range(first_frame, self._num_frames + 1), states):
+            with self._condition:
+                self._states[frame] = state
+                if self._error is not None:
+                    return
+        logger.debug(f"State pre-pass time: {time.time() - prepass_start:.3f}s")
+
+    # Requests from nodes (called with the lock held)
+
+    def _hello(self, message: Dict[str, Any], node: str) -> Dict[str, Any]:
+        if message.get("version") != FARM_PROTOCOL_VERSION:
+            return {"type": "error", "message": "Render farm protocol mismatch"}
+        logger.info(f"Node {node} connected")
+        return self._job
+
+    def _lease(self, node: str) -> Dict[str, Any]:
+        """Lease the first pending range whose starting state is known"""
+        self._expire_leases()
+        if self._error is not None or self.finished:
+            return {"type": "done"}
+
+        for index, (start, end) in enumerate(self._pending):
+            if start in self._states:
+                del self._pending[index]
+                lease = FrameLease(
+                    self._next_lease_id, node, start, end, self.lease_timeout
+                )
+                self._next_lease_id += 1
+                self._leases[lease.lease_id] = lease
+                logger.debug(f"Leased frames {start+1}-{end} to {node}")
+                return {
+                    "type": "lease",
+                    "lease": lease.lease_id,
+                    "start": start,
+                    "end": end,
+                    "state": encode_state(self._states[start]),
+                }
+        return {"type": "wait", "seconds": RETRY_SECONDS}
+
+    def _frame(self, message: Dict[str, Any], node: str) -> Dict[str, Any]:
+        """Record a frame reported by a node"""
+        frame_number = message["frame"]
+        generator = self.generator
+        filename = generator._get_frame_filename(frame_number)
+        if frame_number not in self._done:
+            if not os.path.exists(filename):
+                return {
+                    "type": "error",
+                    "message": f"{filename} not found on the coordinator; "
+                    "nodes must write to a shared output directory",
+                }
+            state = decode_state(message["state"])
+            expected = self._states.get(frame_number + 1)
+            if expected is not None and state != expected:
+                logger.warning(
+                    f"Frame {frame_number+1} from {node} ends in a different state "
+                    "than the pre-pass (different kernel build or settings?)"
+                )
+
+            generator.manifest.set_frame_state(frame_number, state)
+            generator.manifest.complete_frame(frame_number, filename)
+            self._done.add(frame_number)
+            seconds = message["record"]["stages"]["total"]
+            self.node_frames[node] = self.node_frames.get(node, 0) + 1
+            self.node_seconds[node] = self.node_seconds.get(node, 0.0) + seconds
+            logger.info(
+                f"Frame {frame_number+1:3d}/{self._num_frames}: {seconds:.2f}s on {node}"
+            )
+            self._condition.notify_all()
+
+        lease = self._leases.get(message["lease"])
+        if lease is None:
+            # Expired and handed to another node
+            return {"type": "cancel"}
+        lease.next_frame = frame_number + 1
+        lease.deadline = time.time() + self.lease_timeout
+        if lease.next_frame >= lease.end:
+            del self._leases[lease.lease_id]
+        return {"type": "ok"}
+
+    def _expire_leases(self, node: Optional[str] = None) -> None:
+        """Requeue leases past their deadline (or all leases of a lost node)"""
+        now = time.time()
+        for lease in list(self._leases.values()):
+            if lease.node != node and (node is not None or lease.deadline > now):
+                continue
+            del self._leases[lease.lease_id]
+            remaining = [
+                frame
+                for frame in range(lease.next_frame, lease.end)
+                if frame not in self._done
+            ]
+            if not remaining:
+                continue
+
+            attempts = self._attempts.get(remaining[0], 0) + 1
+            self._attempts[remaining[0]] = attempts
+            if attempts >= MAX_LEASE_ATTEMPTS:
+                self._error = (
+                    f"Frame {remaining[0]+1} failed on {attempts} leases; "
+                    "check the node logs"
+                )
+                self._condition.notify_all()
+                return
+            logger.warning(
+                f"Lease of frames {remaining[0]+1}-{lease.end} on {lease.node} "
+                f"{'lost' if node is not None else 'timed out'}; requeued"
+            )
+            for frame_range in self._split_ranges(remaining):
+                bisect.insort(self._pending, frame_range)
+
+    def _node_lost(self, node: str) -> None:
+        """Requeue the leases of a node that disconnected"""
+        self._expire_leases(node)
+        self._condition.notify_all()
+
+    def _start_server(self) -> None:
+        """Serve node connections on a background thread"""
+        coordinator = self
+
+        class NodeHandler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                connection = FarmConnection(self.request)
+                node = f"{self.client_address[0]}:{self.client_address[1]}"
+                try:
+                    while True:
+                        message = connection.receive()
+                        if message is None:
+                            return
+                        with coordinator._condition:
+                            if message["type"] == "hello":
+                                node = message.get("node") or node
+                                reply = coordinator._hello(message, node)
+                            elif message["type"] == "lease":
+                                reply = coordinator._lease(node)
+                            elif message["type"] == "frame":
+                                reply = coordinator._frame(message, node)
+                            else:
+                                reply = {"type": "error", "message": "Unknown request"}
+                        connection.send(reply)
+                except (ConnectionError, OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Node {node}: {e}")
+                finally:
+                    with coordinator._condition:
+                        coordinator._node_lost(node)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer(
+            (self.host, self.port), NodeHandler
+        )
+        self._server.daemon_threads = True
+        # Port 0 binds a free port
+        self.port = self._server.server_address[1]
+        threading.Thread(
+            target=self._server.serve_forever, name="farm-coordinator", daemon=True
+        ).start()
+
+    def _stop_server(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _log_summary(self, total_time: float) -> None:
+        """Log the overall and per-node throughput"""
+        frames = sum(self.node_frames.values())
+        logger.info("")
+        logger.info(
+            f"Distributed render complete! {frames} frames in "
+            f"{total_time/60:.1f} minutes ({frames / max(total_time, 1e-9):.2f} "
+            "frames/s)"
+        )
+        for node in sorted(self.node_frames):
+            logger.info(
+                f"  {node:24} {self.node_frames[node]:4d} frames, "
+                f"{self.node_seconds[node] / self.node_frames[node]:.2f}s per frame"
+            )
+        logger.info("")
+
+
+def run_render_node(
+    host: str,
+    port: int = DEFAULT_PORT,
+    config_file: str = "config_presets.json",
+    name: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    threads: Optional[int] = None,
+    log_level: int = logging.INFO,
+) -> int:
+    """Render leased frame ranges for a coordinator until it is done
+
+    The preset, settings and output directory come from the coordinator;
+    output_dir overrides where this node finds the shared directory.
+    Frames are rendered into a private staging directory and moved into
+    place, so partial files never appear under a frame's name. Returns the
+    number of frames rendered.
+    """
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    generator = CosmicSpiralGenerator(config_file)
+    generator.logger.setLevel(log_level)
+
+    connection = FarmConnection(socket.create_connection((host, port)))
+    staging_dir = None
+    frames_rendered = 0
+    try:
+        job = connection.request(
+            {"type": "hello", "version": FARM_PROTOCOL_VERSION, "node": name}
+        )
+        generator.config_manager.config = job["config"]
+        for mode, value in job["modes"].items():
+            setattr(generator, mode, value)
+        generator.load_preset(job["preset"], job["overrides"])
+        if generator._get_plan().digest != job["plan"]:
+            raise RuntimeError(
+                f"Render plan of {job['preset']} differs from the coordinator's"
+            )
+        generator.timestamp = job["timestamp"]
+
+        output_dir = output_dir or job["output_dir"]
+        staging_dir = os.path.join(output_dir, f".node_{name}")
+        os.makedirs(staging_dir, exist_ok=True)
+        generator.output_dir = staging_dir
+        generator.buffer_pool = generator._create_buffer_pool(1)
+
+        if threads is not None:
+            # Imported here: the coordinator never runs kernels itself
+            import numba
+
+            numba.set_num_threads(threads)
+        compile_time = generator.warm_up_kernels()
+        generator.logger.debug(f"Node JIT warm-up: {compile_time:.2f}s")
+
+        while True:
+            reply = connection.request({"type": "lease"})
+            if reply["type"] == "done":
+                break
+            if reply["type"] == "wait":
+                time.sleep(reply["seconds"])
+                continue
+
+            generator.x, generator.u, generator.v = decode_state(reply["state"])
+            for frame_number in range(reply["start"], reply["end"]):
+                record = generator.render_frame(frame_number)
+                os.replace(
+                    generator._get_frame_filename(frame_number),
+                    generator._get_frame_filename(frame_number, output_dir),
+                )
+                frames_rendered += 1
+                answer = connection.request(
+                    {
+                        "type": "frame",
+                        "lease": reply["lease"],
+                        "frame": frame_number,
+                        "state": encode_state((generator.x, generator.u, generator.v)),
+                        "record": record,
+                    }
+                )
+                if answer["type"] == "cancel":
+                    break
+    finally:
+        connection.close()
+        if staging_dir is not None:
+            try:
+                os.rmdir(staging_dir)
+            except OSError:
+                pass
+    return frames_rendered
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Parse HOST:PORT (or PORT, on 127.0.0.1)"""
+    host, separator, port = address.rpartition(":")
+    try:
+        return (host if separator else "127.0.0.1"), int(port)
+    except ValueError:
+        raise ValueError(f"Invalid address '{address}' (expected HOST:PORT)")
+
+
+def main():
+    """Render farm entry point"""
+    parser = argparse.ArgumentParser(
+        description="Lux Spiral Cosmos - distributed rendering over TCP"
+    )
+    parser.add_argument(
+        "--config", default="config_presets.json", help="Preset configuration file"
+    )
+    parser.add_argument(
+        "--debug", action="store_true", help="Show lease and timing details"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinate = commands.add_parser(
+        "coordinate", help="Lease the frames of a preset to render nodes"
+    )
+    coordinate.add_argument("preset", help="Preset to render")
+    coordinate.add_argument(
+        "--listen",
+        default=f"127.0.0.1:{DEFAULT_PORT}",
+        help=f"HOST:PORT nodes connect to (default: 127.0.0.1:{DEFAULT_PORT}; "
+        "use 0.0.0.0 for other machines)",
+    )
+    coordinate.add_argument(
+        "--lease-frames",
+        type=int,
+        default=8,
+        help="Frames per lease (default: 8)",
+    )
+    coordinate.add_argument(
+        "--lease-timeout",
+        type=float,
+        default=300.0,
+        help="Seconds without a frame report before a lease is reassigned "
+        "(default: 300)",
+    )
+    coordinate.add_argument(
+        "--local-nodes",
+        type=int,
+        default=0,
+        help="Render node processes to start on this machine (default: 0)",
+    )
+    coordinate.add_argument(
+        "--resume",
+        metavar="OUTPUT_DIR",
+        help="Continue an interrupted render in OUTPUT_DIR from its manifest",
+    )
+
+    node = commands.add_parser("node", help="Render frames for a coordinator")
+    node.add_argument("address", help="Coordinator HOST:PORT")
+    node.add_argument("--name", help="Node name in the coordinator log")
+    node.add_argument(
+        "--output-dir",
+        help="Path of the shared output directory on this node "
+        "(default: the coordinator's path)",
+    )
+    node.add_argument(
+        "--threads", type=int, help="Kernel threads (default: Numba's default)"
+    )
+    args = parser.parse_args()
+
+    log_level = logging.DEBUG if args.debug else logging.INFO
+    logging.basicConfig(level=log_level, format="%(message)s")
+    config_file = os.path.abspath(args.config)
+    try:
+        if args.command == "node":
+            host, port = parse_address(args.address)
+            frames = run_render_node(
+                host,
+                port,
+                config_file,
+                name=args.name,
+                output_dir=args.output_dir,
+                threads=args.threads,
+                log_level=log_level,
+            )
+            logger.info(f"Node finished: {frames} frames rendered")
+            return
+
+        host, port = parse_address(args.listen)
+        generator = CosmicSpiralGenerator(config_file)
+        if args.debug:
+            generator.set_debug_mode(True)
+        coordinator = RenderCoordinator(
+            generator, host, port, args.lease_frames, args.lease_timeout
+        )
+        coordinator.render(args.preset, args.resume, args.local_nodes)
+    except (FileNotFoundError, ValueError, RuntimeError, ConnectionError) as e:
+        logger.error(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
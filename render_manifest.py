@@ -0,0 +1,170 @@
+"""
+Job manifest for resumable frame renders
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Set, Tuple
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def hash_file(filename: str) -> str:
+    """Get the SHA-256 digest of a file"""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RenderManifest:
+    """Progress record of a frame render, kept in its output directory
+
+    For each completed frame the manifest stores the frame file's size and
+    SHA-256 digest together with the (x, u, v) state after that frame, so
+    an interrupted render can continue from its last durable frame with
+    bit-identical results. The state of a frame is recorded when it is
+    rendered, and the frame is marked complete only once its file has been
+    written. The manifest is rewritten atomically after every frame and is
+    safe to update from writer threads.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        preset_name: str,
+        preset_hash: str,
+        num_frames: int,
+        timestamp: str,
+    ):
+        self.output_dir = output_dir
+        self.preset_name = preset_name
+        self.preset_hash = preset_hash
+        self.num_frames = num_frames
+        self.timestamp = timestamp
+        self.frames: Dict[int, Dict[str, Any]] = {}
+
+        self._states: Dict[int, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        """Path of the manifest file"""
+        return os.path.join(self.output_dir, MANIFEST_FILENAME)
+
+    @classmethod
+    def load(cls, output_dir: str) -> "RenderManifest":
+        """Load the manifest of an earlier render"""
+        path = os.path.join(output_dir, MANIFEST_FILENAME)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No render manifest found in {output_dir}")
+
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported render manifest version in {path}")
+
+        manifest = cls(
+            output_dir,
+            data["preset"],
+            data["preset_hash"],
+            data["num_frames"],
+            data["timestamp"],
+        )
+        manifest.frames = {int(frame): entry for frame, entry in data["frames"].items()}
+        return manifest
+
+    def save(self) -> None:
+        """Write the manifest atomically"""
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "preset": self.preset_name,
+            "preset_hash": self.preset_hash,
+            "num_frames": self.num_frames,
+            "timestamp": self.timestamp,
+            "frames": {str(frame): self.frames[frame] for frame in sorted(self.frames)},
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def set_frame_state(
+        self, frame_number: int, state: Tuple[float, float, float]
+    ) -> None:
+        """Record the state after a frame, kept until the frame is complete"""
+        with self._lock:
+            self._states[frame_number] = state
+
+    def complete_frame(self, frame_number: int, filename: str) -> None:
+        """Mark a frame as written and save the manifest
+
+        The state after the frame must have been recorded (set_frame_state).
+        """
+        entry = {
+            "file": os.path.basename(filename),
+            "size": os.path.getsize(filename),
+            "sha256": hash_file(filename),
+        }
+        with self._lock:
+            state = self._states.pop(frame_number, None)
+            if state is None:
+                raise RuntimeError(
+                    f"Frame {frame_number} completed before the state after it "
+                    "was recorded"
+                )
+            entry["state"] = list(state)
+            self.frames[frame_number] = entry
+            self._save()
+
+    def get_frame_state(self, frame_number: int) -> Tuple[float, float, float]:
+        """Get the recorded state after a completed frame"""
+        x, u, v = self.frames[frame_number]["state"]
+        return x, u, v
+
+    def verify_frames(self) -> Tuple[Set[int], List[int]]:
+        """Check completed frame files against their size and digest
+
+        Returns the verified frame numbers and the frames whose files are
+        missing or damaged; the latter are dropped from the manifest.
+        """
+        verified: Set[int] = set()
+        damaged: List[int] = []
+        for frame_number, entry in sorted(self.frames.items()):
+            filename = os.path.join(self.output_dir, entry["file"])
+            if (
+                os.path.exists(filename)
+                and os.path.getsize(filename) == entry["size"]
+                and hash_file(filename) == entry["sha256"]
+            ):
+                verified.add(frame_number)
+            else:
+                damaged.append(frame_number)
+
+        for frame_number in damaged:
+            del self.frames[frame_number]
+        return verified, damaged
+
+    def get_resume_point(
+        self, verified: Set[int]
+    ) -> Tuple[int, Tuple[float, float, float]]:
+        """Get the first frame that is not verified and its starting state
+
+        Returns num_frames and the final state once every frame is verified.
+        """
+        first_frame = 0
+        while first_frame < self.num_frames and first_frame in verified:
+            first_frame += 1
+        if first_frame == 0:
+            return 0, (0.0, 0.0, 0.0)
+        return first_frame, self.get_frame_state(first_frame - 1)
@@ -0,0 +1,252 @@
+"""
+Render plans: presets compiled into validated, immutable per-render values
+"""
+
+import hashlib
+import json
+from math import isfinite, pi, sin
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+
+from frame_writer import get_imwrite_params
+
+PLAN_VERSION = 2
+
+REQUIRED_SECTIONS = ("video", "hdr", "mathematical", "spiral_pulse", "colors")
+
+
+# Kinds of plan fields: integers of at least 1 and finite floats that are
+# positive, non-negative or any value
+FIELD_KINDS: Dict[str, Tuple[Callable[[Any], bool], str]] = {
+    "count": (lambda value: value >= 1, "at least 1"),
+    "positive": (lambda value: value > 0, "positive"),
+    "nonnegative": (lambda value: value >= 0, "non-negative"),
+    "number": (lambda value: True, "finite"),
+}
+
+# Preset fields of a plan: (section, key, plan attribute, kind)
+PLAN_FIELDS = (
+    ("video", "width", "width", "count"),
+    ("video", "height", "height", "count"),
+    ("video", "num_frames", "num_frames", "count"),
+    ("video", "fps", "fps", "count"),
+    ("mathematical", "n", "n", "count"),
+    ("mathematical", "r_denominator", "r_denominator", "positive"),
+    ("mathematical", "time_speed", "time_speed", "number"),
+    ("mathematical", "scale_factor", "scale_factor", "positive"),
+    ("hdr", "max_nits", "max_nits", "positive"),
+    ("hdr", "hdr_boost", "hdr_boost", "nonnegative"),
+    ("hdr", "cosmic_core_boost", "cosmic_core_boost", "nonnegative"),
+    ("spiral_pulse", "size_min", "size_min", "positive"),
+    ("spiral_pulse", "size_max", "size_max", "positive"),
+    ("spiral_pulse", "pulse_speed", "pulse_speed", "number"),
+    ("colors", "speed", "color_speed", "number"),
+    ("colors", "red_base", "red_base", "number"),
+    ("colors", "red_variation", "red_variation", "number"),
+    ("colors", "green_base", "green_base", "number"),
+    ("colors", "green_variation", "green_variation", "number"),
+    ("colors", "blue_base", "blue_base", "number"),
+    ("colors", "blue_variation", "blue_variation", "number"),
+    ("colors", "saturation", "saturation", "nonnegative"),
+)
+
+# Output settings of a plan: (output config key, plan attribute, default)
+OUTPUT_FIELDS = (
+    ("use_tiff_16bit", "use_16bit", True),
+    ("linear_float_frames", "linear_float_frames", False),
+    ("compression", "compression", "lzw"),
+    ("png_compression_level", "png_compression_level", 1),
+)
+
+# Plan attributes derived from the fields when compiling (never pickled)
+DERIVED_ATTRIBUTES = (
+    "r",
+    "size_base",
+    "size_variation",
+    "frame_dtype",
+    "frame_extension",
+    "imwrite_params",
+    "frame_times",
+    "size_multipliers",
+    "digest",
+)
+
+# Peak brightness the PQ curve encodes
+MAX_PQ_NITS = 10000.0
+
+
+def find_preset_problems(preset: Dict[str, Any]) -> List[str]:
+    """Check a preset's sections, fields, number types and ranges
+
+    Returns a description of each problem (none for a valid preset).
+    """
+    for section in REQUIRED_SECTIONS:
+        if not isinstance(preset.get(section), dict):
+            return [f"Missing required section: {section}"]
+
+    problems = []
+    for section, key, _, kind in PLAN_FIELDS:
+        if key not in preset[section]:
+            problems.append(f"Missing {section} parameter: {key}")
+            continue
+        value = preset[section][key]
+        check, expected = FIELD_KINDS[kind]
+        if kind == "count":
+            if not isinstance(value, int) or isinstance(value, bool):
+                problems.append(f"{section}.{key} must be an integer, got {value!r}")
+                continue
+        elif (
+            not isinstance(value, (int, float))
+            or isinstance(value, bool)
+            or not isfinite(value)
+        ):
+            problems.append(f"{section}.{key} must be a finite number, got {value!r}")
+            continue
+        if not check(value):
+            problems.append(f"{section}.{key} must be {expected}, got {value!r}")
+
+    if not problems:
+        if preset["hdr"]["max_nits"] > MAX_PQ_NITS:
+            problems.append(f"hdr.max_nits must be at most {MAX_PQ_NITS:g}")
+        pulse = preset["spiral_pulse"]
+        if pulse["size_min"] > pulse["size_max"]:
+            problems.append("spiral_pulse.size_min must not exceed size_max")
+    return problems
+
+
+def _frozen_array(values: List[float]) -> np.ndarray:
+    """Make a float64 array that cannot be made writable again"""
+    return np.frombuffer(np.array(values, dtype=np.float64).tobytes())
+
+
+class RenderPlan:
+    """A preset and output settings compiled into the values a render needs
+
+    Fields are validated (types and ranges), and values every frame needs
+    are derived once: the rotation r, the pulse base and variation, the
+    frame type, file extension and cv2.imwrite parameters, and the time
+    and spiral size multiplier of every frame, in frozen arrays computed
+    with the same float operations the kernels always used, so frames stay
+    bit-identical. Plans hold only immutable values, not the preset dict.
+    They pickle as their fields alone and derive the rest again when
+    unpickled, so they are compact to send to worker processes.
+    """
+
+    __slots__ = (
+        "preset_name",
+        *(attribute for _, _, attribute, _ in PLAN_FIELDS),
+        *(attribute for _, attribute, _ in OUTPUT_FIELDS),
+        *DERIVED_ATTRIBUTES,
+    )
+
+    def __init__(
+        self,
+        preset: Dict[str, Any],
+        output_config: Dict[str, Any],
+        preset_name: str = "",
+    ):
+        problems = find_preset_problems(preset)
+        if problems:
+            raise ValueError(
+                f"Invalid preset configuration: {preset_name or 'preset'} "
+                f"({'; '.join(problems)})"
+            )
+
+        fields: Dict[str, Any] = {"preset_name": preset_name}
+        for section, key, attribute, kind in PLAN_FIELDS:
+            value = preset[section][key]
+            fields[attribute] = value if kind == "count" else float(value)
+        for key, attribute, default in OUTPUT_FIELDS:
+            fields[attribute] = output_config.get(key, default)
+        self._compile(fields)
+
+    def _compile(self, fields: Dict[str, Any]) -> None:
+        """Set the fields and derive the other attributes from them"""
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+        if self.linear_float_frames:
+            frame_dtype = np.dtype(np.float32)
+        else:
+            frame_dtype = np.dtype(np.uint16 if self.use_16bit else np.uint8)
+        extension = "tiff" if self.use_16bit or frame_dtype == np.float32 else "png"
+        frame_times = [
+            frame_number * self.time_speed for frame_number in range(self.num_frames)
+        ]
+        derived = {
+            "r": 2 * pi / self.r_denominator,
+            "size_base": (self.size_max + self.size_min) / 2.0,
+            "size_variation": (self.size_max - self.size_min) / 2.0,
+            "frame_dtype": frame_dtype,
+            "frame_extension": extension,
+            "imwrite_params": tuple(
+                get_imwrite_params(
+                    extension, self.compression, self.png_compression_level
+                )
+            ),
+        }
+        # The digest covers every field but the name, which does not change frames
+        state = self.__getstate__()
+        del state["preset_name"]
+        derived["digest"] = hashlib.sha256(
+            json.dumps({"version": PLAN_VERSION, **state}, sort_keys=True).encode(
+                "utf-8"
+            )
+        ).hexdigest()
+        for name, value in derived.items():
+            object.__setattr__(self, name, value)
+
+        object.__setattr__(self, "frame_times", _frozen_array(frame_times))
+        object.__setattr__(
+            self,
+            "size_multipliers",
+            _frozen_array([self.size_multiplier(t) for t in frame_times]),
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Render plans are immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Render plans are immutable")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name not in DERIVED_ATTRIBUTES
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._compile(state)
+
+    def __repr__(self) -> str:
+        return (
+            f"RenderPlan({self.preset_name!r}, {self.width}x{self.height}, "
+            f"{self.num_frames} frames, n={self.n}, {self.digest[:12]})"
+        )
+
+    def section(self, section: str) -> Dict[str, Any]:
+        """Get the preset fields of a section as a new dict"""
+        return {
+            key: getattr(self, attribute)
+            for field_section, key, attribute, _ in PLAN_FIELDS
+            if field_section == section
+        }
+
+    def to_preset(self) -> Dict[str, Any]:
+        """Rebuild a preset dict of the plan's fields (e.g. to adjust and recompile)"""
+        return {section: self.section(section) for section in REQUIRED_SECTIONS}
+
+    def size_multiplier(self, t: float) -> float:
+        """Get the spiral size multiplier (pulsing) at time t"""
+        return self.size_base + self.size_variation * sin(t * self.pulse_speed * 2 * pi)
+
+    def frame_parameters(self, frame_number: int) -> Tuple[float, float]:
+        """Get the time and spiral size multiplier of a frame"""
+        if 0 <= frame_number < self.num_frames:
+            return (
+                float(self.frame_times[frame_number]),
+                float(self.size_multipliers[frame_number]),
+            )
+        t = frame_number * self.time_speed
+        return t, self.size_multiplier(t)
@@ -0,0 +1,81 @@
+"""
+Sparse point-list frame representation
+"""
+
+from typing import Optional
+import numpy as np
+
+
+class SparseFrame:
+    """A frame stored as packed (pixel index, B, G, R) entries
+
+    Each pixel appears at most once, holding the last point written to it;
+    every other pixel is black. For low-coverage presets this is much
+    smaller than a dense frame to keep in memory, store or send between
+    processes, and it is only rasterized where a dense image is needed.
+    """
+
+    __slots__ = ("width", "height", "pixel_index", "colors")
+
+    def __init__(
+        self, width: int, height: int, pixel_index: np.ndarray, colors: np.ndarray
+    ):
+        if pixel_index.shape[0] != colors.shape[0]:
+            raise ValueError("Sparse frame indices and colors differ in length")
+
+        self.width = width
+        self.height = height
+        self.pixel_index = pixel_index
+        self.colors = colors
+
+    @classmethod
+    def from_dense(cls, img_array: np.ndarray) -> "SparseFrame":
+        """Build a sparse frame from the non-black pixels of a dense frame"""
+        height, width = img_array.shape[:2]
+        flat = img_array.reshape(-1, 3)
+        pixel_index = np.flatnonzero(flat.any(axis=1)).astype(np.int32)
+        return cls(width, height, pixel_index, flat[pixel_index])
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Channel type of the frame (uint8 or uint16)"""
+        return self.colors.dtype
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the packed entries in bytes"""
+        return self.pixel_index.nbytes + self.colors.nbytes
+
+    @property
+    def dense_nbytes(self) -> int:
+        """Size of the equivalent dense frame in bytes"""
+        return self.width * self.height * 3 * self.colors.dtype.itemsize
+
+    def to_dense(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rasterize into a dense BGR image, reusing out if given"""
+        shape = (self.height, self.width, 3)
+        if out is None:
+            out = np.zeros(shape, dtype=self.colors.dtype)
+        else:
+            if out.shape != shape or out.dtype != self.colors.dtype:
+                raise ValueError("Output buffer does not match the sparse frame")
+            out.fill(0)
+
+        out.reshape(-1, 3)[self.pixel_index] = self.colors
+        return out
+
+    def save(self, filename: str) -> None:
+        """Store the frame as an uncompressed .npz file"""
+        np.savez(
+            filename,
+            size=np.array([self.width, self.height], dtype=np.int32),
+            pixel_index=self.pixel_index,
+            colors=self.colors,
+        )
+
+    @classmethod
+    def load(cls, filename: str) -> "SparseFrame":
+        """Load a frame stored with save()"""
+        with np.load(filename) as data:
+            width, height = (int(value) for value in data["size"])
+            return cls(width, height, data["pixel_index"], data["colors"])
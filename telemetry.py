@@ -0,0 +1,244 @@
+"""
+Per-frame render telemetry: JSON Lines records, summaries and Prometheus metrics
+"""
+
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, IO, List, Optional
+import numpy as np
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Per-frame stage timings, in seconds
+FRAME_STAGES = ("setup", "buffer_wait", "math", "save", "write", "total")
+
+METRICS_PREFIX = "lux_spiral"
+
+
+def summarize_stages(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Get p50/p95/max of each stage timing over frame records"""
+    summary: Dict[str, Dict[str, float]] = {}
+    for stage in FRAME_STAGES:
+        values = [
+            record["stages"][stage] for record in records if stage in record["stages"]
+        ]
+        if values:
+            summary[stage] = {
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "max": float(max(values)),
+                "sum": float(sum(values)),
+                "count": len(values),
+            }
+    return summary
+
+
+class RenderTelemetry:
+    """Collects one record per frame and exports it for monitoring
+
+    A frame record holds its stage timings, pixels processed, bytes
+    written, buffer wait and RSS. Records are appended to a JSON Lines file
+    as frames finish, followed by a summary record with p50/p95/max per
+    stage when the render closes. With a metrics port, the running totals
+    and stage quantiles are also served as Prometheus text on /metrics.
+
+    Frames written by the asynchronous writer are recorded once their file
+    is on disk, so "write" is the time from hand-off until written.
+    """
+
+    def __init__(
+        self,
+        jsonl_path: Optional[str] = None,
+        metrics_port: Optional[int] = None,
+        metrics_host: str = "127.0.0.1",
+    ):
+        self.jsonl_path = jsonl_path
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host
+        self.records: List[Dict[str, Any]] = []
+        self.job: Dict[str, Any] = {}
+
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._file: Optional[IO[str]] = None
+        self._server: Optional["ThreadingHTTPServer"] = None
+        self._lock = threading.Lock()
+
+    def start(self, **job: Any) -> None:
+        """Start recording a render, described by job fields (preset, size)"""
+        self.job = job
+        self.records = []
+        self._pending = {}
+        if self.jsonl_path is not None:
+            self._file = open(self.jsonl_path, "a")
+            self._write({"type": "job", "time": time.time(), **job})
+        if self.metrics_port is not None and self._server is None:
+            self._start_metrics_server()
+
+    def record_frame(
+        self, frame_number: int, record: Dict[str, Any], wait_for_write: bool = False
+    ) -> None:
+        """Add the render-side record of a frame
+
+        With wait_for_write, the record is emitted by frame_written().
+        """
+        record = {"type": "frame", "frame": frame_number, **record}
+        if not wait_for_write:
+            self._emit(record)
+            return
+
+        record["handoff_time"] = time.time()
+        with self._lock:
+            written = self._pending.pop(frame_number, None)
+            if written is None:
+                self._pending[frame_number] = record
+                return
+        self._emit(self._merge_write(record, written))
+
+    def frame_written(self, frame_number: int, bytes_written: int) -> None:
+        """Complete a frame record once its file has been written"""
+        written = {"bytes_written": bytes_written, "written_time": time.time()}
+        with self._lock:
+            record = self._pending.pop(frame_number, None)
+            if record is None:
+                self._pending[frame_number] = written
+                return
+        self._emit(self._merge_write(record, written))
+
+    @staticmethod
+    def _merge_write(record: Dict[str, Any], written: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the write stage and file size to a frame record"""
+        handoff_time = record.pop("handoff_time")
+        record["bytes_written"] = written["bytes_written"]
+        record["stages"]["write"] = max(0.0, written["written_time"] - handoff_time)
+        return record
+
+    def _emit(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.records.append(record)
+            self._write(record)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._file is not None:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def summary(self) -> Dict[str, Any]:
+        """Get totals and p50/p95/max per stage over the recorded frames"""
+        with self._lock:
+            records = list(self.records)
+        return {
+            "type": "summary",
+            "frames": len(records),
+            "pixels_processed": sum(r.get("pixels_processed", 0) for r in records),
+            "bytes_written": sum(r.get("bytes_written", 0) for r in records),
+            "peak_rss_mb": max((r.get("rss_mb", 0.0) for r in records), default=0.0),
+            "stages": summarize_stages(records),
+        }
+
+    def close(self) -> Dict[str, Any]:
+        """Write the summary record and stop exporting; returns the summary"""
+        summary = self.summary()
+        with self._lock:
+            self._write(summary)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        return summary
+
+    def prometheus_text(self) -> str:
+        """Render the current metrics in the Prometheus text format"""
+        summary = self.summary()
+        with self._lock:
+            last = self.records[-1] if self.records else None
+
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[str]) -> None:
+            lines.append(f"# HELP {METRICS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRICS_PREFIX}_{name} {kind}")
+            lines.extend(f"{METRICS_PREFIX}_{sample}" for sample in samples)
+
+        metric(
+            "frames_total",
+            "counter",
+            "Frames rendered",
+            [f"frames_total {summary['frames']}"],
+        )
+        metric(
+            "pixels_processed_total",
+            "counter",
+            "Points landing inside the frame",
+            [f"pixels_processed_total {summary['pixels_processed']}"],
+        )
+        metric(
+            "bytes_written_total",
+            "counter",
+            "Frame bytes written to files or the encoder",
+            [f"bytes_written_total {summary['bytes_written']}"],
+        )
+
+        samples = []
+        for stage, stats in summary["stages"].items():
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("1", "max")):
+                samples.append(
+                    f'frame_stage_seconds{{stage="{stage}",quantile="{quantile}"}} '
+                    f"{stats[key]:.6f}"
+                )
+            samples.append(
+                f'frame_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}'
+            )
+            samples.append(
+                f'frame_stage_seconds_count{{stage="{stage}"}} {stats["count"]}'
+            )
+        metric("frame_stage_seconds", "summary", "Per-frame stage time", samples)
+
+        if last is not None:
+            metric(
+                "last_frame",
+                "gauge",
+                "Number of the last recorded frame",
+                [f"last_frame {last['frame']}"],
+            )
+            metric(
+                "rss_megabytes",
+                "gauge",
+                "Resident set size when the last frame was rendered",
+                [f"rss_megabytes {last.get('rss_mb', 0.0):.1f}"],
+            )
+        return "\n".join(lines) + "\n"
+
+    def _start_metrics_server(self) -> None:
+        """Serve /metrics on a background thread"""
+        # Imported here: only long renders with a metrics port need it
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(
+            (self.metrics_host, self.metrics_port), MetricsHandler
+        )
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, name="metrics-server", daemon=True
+        ).start()
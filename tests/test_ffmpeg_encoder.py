@@ -0,0 +1,113 @@
+"""
+Tests of the streaming encoder against a stand-in for ffmpeg
+"""
+
+import hashlib
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from config_manager import ConfigManager
+from ffmpeg_encoder import FFmpegStreamEncoder
+
+CONFIG_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "config_presets.json",
+)
+
+# Stand-ins run as `python -c SCRIPT <ffmpeg arguments>`
+CHECKSUM_SCRIPT = (
+    "import hashlib, sys; "
+    "print(hashlib.sha256(sys.stdin.buffer.read()).hexdigest(), flush=True)"
+)
+EARLY_EXIT_SCRIPT = "import sys; sys.stdin.buffer.read(1000); sys.exit({status})"
+
+VIDEO = {"width": 64, "height": 48, "fps": 30}
+
+# Longest a failing encoder may take to raise
+TIMEOUT_SECONDS = 30
+
+
+def stream_args(script: str, use_16bit: bool):
+    """Get the stream command with ffmpeg_binary pointed at a stand-in script"""
+    config_manager = ConfigManager(CONFIG_FILE)
+    config_manager.config["output"]["ffmpeg_binary"] = [sys.executable, "-c", script]
+    preset_name = config_manager.get_preset_names()[0]
+    return config_manager.get_ffmpeg_stream_args(preset_name, "test", VIDEO, use_16bit)
+
+
+def make_frames(count: int, dtype, height: int, width: int):
+    """Make distinct frames of random pixels"""
+    rng = np.random.default_rng(1)
+    return [
+        rng.integers(0, np.iinfo(dtype).max, (height, width, 3), dtype=dtype)
+        for _ in range(count)
+    ]
+
+
+def run_with_timeout(target) -> None:
+    """Run target in a thread, failing if it does not return in time"""
+    errors = []
+
+    def run():
+        try:
+            target()
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(TIMEOUT_SECONDS)
+    assert not thread.is_alive(), "encoder hung"
+    if errors:
+        raise errors[0]
+
+
+@pytest.mark.parametrize("dtype", [np.uint16, np.uint8])
+def test_stream_writes_frames_in_order(capfd, dtype):
+    frames = make_frames(5, dtype, VIDEO["height"], VIDEO["width"])
+    done = []
+    encoder = FFmpegStreamEncoder(
+        stream_args(CHECKSUM_SCRIPT, dtype == np.uint16),
+        max_queued_frames=2,
+        on_frame_done=done.append,
+    )
+    encoder.start()
+    for frame_number, frame in enumerate(frames):
+        encoder.submit(frame_number, frame)
+    encoder.close()
+
+    expected = hashlib.sha256(
+        b"".join(
+            frame.astype(frame.dtype.newbyteorder("<")).tobytes() for frame in frames
+        )
+    ).hexdigest()
+    assert capfd.readouterr().out.split() == [expected]
+    assert encoder.frames_written == len(frames)
+    assert encoder.bytes_written == sum(frame.nbytes for frame in frames)
+    assert [id(frame) for frame in done] == [id(frame) for frame in frames]
+
+
+@pytest.mark.parametrize("status", [0, 3])
+def test_stream_raises_when_ffmpeg_exits_early(status):
+    # Frames well beyond the pipe buffer, so writes fail once it has exited
+    frames = make_frames(4, np.uint16, 480, 640)
+    encoder = FFmpegStreamEncoder(
+        stream_args(EARLY_EXIT_SCRIPT.format(status=status), True),
+        max_queued_frames=2,
+    )
+    encoder.start()
+
+    def encode():
+        try:
+            for frame_number in range(40):
+                encoder.submit(frame_number, frames[frame_number % len(frames)])
+            encoder.close()
+        finally:
+            encoder.abort()
+
+    with pytest.raises(RuntimeError):
+        run_with_timeout(encode)